@@ -1,41 +1,412 @@
 # ai_processor.py
+import hashlib
+import os
+import tempfile
+
 import cv2
 import mediapipe as mp
 import numpy as np
+import requests
 from tensorflow.lite import Interpreter
 
+from .landmark_cache import CHUNK_SIZE, hash_file
+
+# Landmark tensor layout: frames x 33 x (x, y, z, visibility)
+NUM_LANDMARKS = 33
+LANDMARK_DIMS = 4
+
+# Part of the landmark cache key; bump when the pose model or its settings change
+POSE_MODEL_VERSION = f"mediapipe-{mp.__version__}-pose-full"
+
+MISSING_POSE = np.full((NUM_LANDMARKS, LANDMARK_DIMS), np.nan, dtype=np.float32)
+
+# Per-channel colour histogram bins kept for each decoded frame (cheat_detection.py)
+HISTOGRAM_BINS = 16
+
+
+def frame_histogram(frame):
+    """Normalised BGR histogram of a frame, computed while it is decoded anyway"""
+    histogram = np.concatenate([
+        cv2.calcHist([frame], [channel], None, [HISTOGRAM_BINS], [0, 256]) for channel in range(3)
+    ]).ravel()
+    return histogram / (frame.shape[0] * frame.shape[1])
+
+
+def frame_dhash(frame):
+    """64-bit difference hash of a frame: which pixels of a 9x8 thumbnail outshine their right neighbour"""
+    thumbnail = cv2.cvtColor(cv2.resize(frame, (9, 8), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+    return np.packbits(thumbnail[:, 1:] > thumbnail[:, :-1]).view('>u8')[0]
+
+
+def fetch_video(source, directory=None):
+    """Return (local_path, sha256, is_temporary) for a video path or URL
+
+    Remote videos are streamed to a temporary file in directory (the system
+    temp directory by default) and hashed on the way in.
+    """
+    if os.path.exists(source):
+        return source, hash_file(source), False
+
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(suffix='.mp4', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f, requests.get(source, stream=True, timeout=30) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                f.write(chunk)
+                digest.update(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest(), True
+
+
+class SamplingPolicy:
+    """Which frames to run pose estimation on, and at what resolution
+
+    Configured per test through FitnessTest.ai_model_config['sampling'], e.g.
+    {"target_fps": 15, "max_resolution": 640, "coarse_to_fine": true, "coarse_fps": 5}
+    """
+
+    DEFAULTS = {
+        'target_fps': 15,
+        'max_resolution': 640,  # longest side in pixels
+        'coarse_to_fine': False,
+        'coarse_fps': 5,
+        'window_padding': 0.5,  # seconds kept around the detected movement
+    }
+
+    # Short, event-critical tests scan sparsely and then sample the movement densely
+    TEST_DEFAULTS = {
+        'vertical_jump': {'target_fps': 60, 'coarse_to_fine': True, 'coarse_fps': 6},
+    }
+
+    def __init__(self, **options):
+        values = dict(self.DEFAULTS, **options)
+        self.target_fps = float(values['target_fps'])
+        self.max_resolution = int(values['max_resolution'])
+        self.coarse_to_fine = bool(values['coarse_to_fine'])
+        self.coarse_fps = float(values['coarse_fps'])
+        self.window_padding = float(values['window_padding'])
+
+    @classmethod
+    def for_test(cls, test_name, config=None):
+        options = dict(cls.TEST_DEFAULTS.get(test_name, {}))
+        options.update((config or {}).get('sampling', {}))
+        return cls(**{k: v for k, v in options.items() if k in cls.DEFAULTS})
+
+    def stride_for(self, fps, sample_fps):
+        """Keep every n-th frame to get as close to sample_fps as possible"""
+        return max(int(round(fps / sample_fps)), 1)
+
+    def scale_for(self, frame_size):
+        longest = max(frame_size)
+        if longest <= self.max_resolution or longest == 0:
+            return 1.0
+        return self.max_resolution / longest
+
+    def cache_variant(self):
+        """Part of the landmark cache key, since sampling changes the output"""
+        variant = f"fps{self.target_fps:g}-res{self.max_resolution}"
+        if self.coarse_to_fine:
+            variant += f"-c2f{self.coarse_fps:g}-pad{self.window_padding:g}"
+        return variant
+
+
+class PoseSequence:
+    """Pose landmarks for every decoded frame of a recording"""
+
+    def __init__(self, landmarks, timestamps, fps, frame_size, frame_indices=None, histograms=None,
+                 frame_hashes=None):
+        self.landmarks = landmarks  # float32 (frames, 33, 4), NaN where no pose was found
+        self.timestamps = timestamps  # seconds from the start of the video, one per frame
+        self.fps = fps  # native frame rate of the video
+        self.frame_size = frame_size  # (width, height) of the original frames
+        # Source frame number of each sample; frames may be skipped by the sampling policy
+        if frame_indices is None:
+            frame_indices = np.arange(len(landmarks))
+        self.frame_indices = frame_indices
+        # float32 (frames, 3 * HISTOGRAM_BINS); None for landmarks cached before histograms were kept
+        self.histograms = histograms
+        # uint64 difference hash of each frame (fingerprints.py); None like histograms
+        self.frame_hashes = frame_hashes
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def to_arrays(self):
+        arrays = {
+            'landmarks': self.landmarks,
+            'timestamps': self.timestamps,
+            'fps': np.float64(self.fps),
+            'frame_size': np.asarray(self.frame_size, dtype=np.int32),
+            'frame_indices': self.frame_indices,
+        }
+        if self.histograms is not None:
+            arrays['histograms'] = self.histograms
+        if self.frame_hashes is not None:
+            arrays['frame_hashes'] = self.frame_hashes
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(
+            arrays['landmarks'],
+            arrays['timestamps'],
+            float(arrays['fps']),
+            tuple(int(v) for v in arrays['frame_size']),
+            frame_indices=arrays.get('frame_indices'),
+            histograms=arrays.get('histograms'),
+            frame_hashes=arrays.get('frame_hashes')
+        )
+
+    @property
+    def sample_fps(self):
+        """Effective frame rate after sampling"""
+        if len(self.timestamps) < 2:
+            return self.fps
+        step = np.median(np.diff(self.timestamps))
+        return float(1.0 / step) if step > 0 else self.fps
+
+    @property
+    def detected(self):
+        """Boolean mask of frames where a pose was detected"""
+        return ~np.isnan(self.landmarks[:, 0, 0])
+
+    @property
+    def detection_rate(self):
+        if len(self) == 0:
+            return 0.0
+        return float(self.detected.mean())
+
+    def points(self, landmark, detected_only=True):
+        """(frames, 2) array of x/y positions for a single landmark"""
+        points = self.landmarks[:, int(landmark), :2]
+        if detected_only:
+            points = points[self.detected]
+        return points
+
+    def times(self, detected_only=True):
+        if detected_only:
+            return self.timestamps[self.detected]
+        return self.timestamps
+
+
 class VideoAnalyzer:
-    def __init__(self):
+    # FitnessTest.name -> analyzer method
+    ANALYZERS = {
+        'vertical_jump': 'analyze_vertical_jump',
+        'situps': 'analyze_situps',
+        'shuttle_run': 'analyze_shuttle_run',
+        'flexibility': 'analyze_flexibility',
+    }
+
+    # Frames a recording may have queued on a shared estimator at once
+    MAX_FRAMES_IN_FLIGHT = 64
+
+    def __init__(self, cache=None, estimator=None, pose=True):
         self.mp_pose = mp.solutions.pose
-        self.pose = self.mp_pose.Pose()
         self.mp_drawing = mp.solutions.drawing_utils
-    
-    def analyze_vertical_jump(self, video_path):
-        """Analyze vertical jump performance"""
+        self.cache = cache
+
+        # A shared BatchedPoseEstimator replaces the per-analyzer MediaPipe graph;
+        # pose=False skips loading it where only cached landmarks are scored
+        self.estimator = estimator
+        self.pose = self.mp_pose.Pose() if estimator is None and pose else None
+
+    @property
+    def model_version(self):
+        if self.estimator is not None:
+            return self.estimator.model_version
+        return POSE_MODEL_VERSION
+
+    def reset(self):
+        """Drop pose tracking state carried over from previous frames"""
+        if self.pose is not None:
+            self.pose.reset()
+
+    def extract_landmarks(self, video_path, content_hash=None, policy=None):
+        """Landmarks for a video, served from the landmark cache when possible"""
+        policy = policy or SamplingPolicy()
+        if self.cache is None or content_hash is None:
+            return self._extract_landmarks(video_path, policy)
+
+        sequence = self.cached_landmarks(content_hash, policy)
+        if sequence is None:
+            sequence = self._extract_landmarks(video_path, policy)
+            self.store_landmarks(content_hash, policy, sequence)
+        return sequence
+
+    def _cache_key(self, content_hash, policy):
+        return self.cache.key(content_hash, f"{self.model_version}:{policy.cache_variant()}")
+
+    def cached_landmarks(self, content_hash, policy):
+        """Previously extracted landmarks for this video and policy, or None"""
+        if self.cache is None:
+            return None
+        cached = self.cache.get(self._cache_key(content_hash, policy))
+        return PoseSequence.from_arrays(cached) if cached is not None else None
+
+    def store_landmarks(self, content_hash, policy, sequence):
+        if self.cache is not None:
+            self.cache.put(self._cache_key(content_hash, policy), sequence.to_arrays())
+
+    def _extract_landmarks(self, video_path, policy):
+        """Decode the video once and run pose estimation on the sampled frames"""
+        # Tracking state from the previous video would bias the first frames
+        self.reset()
+
         cap = cv2.VideoCapture(video_path)
-        jump_heights = []
-        
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            frame_size = (
+                int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            )
+            scale = policy.scale_for(frame_size)
+
+            if not policy.coarse_to_fine:
+                frames = self._decode(cap, policy.stride_for(fps, policy.target_fps), scale)
+            else:
+                # Sparse pass over the whole clip to locate the movement
+                frames = self._decode(cap, policy.stride_for(fps, policy.coarse_fps), scale)
+                window = self._motion_window(frames, fps, policy)
+
+                # Dense pass only inside the movement window
+                if window is not None:
+                    self.reset()
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, window[0])
+                    dense = self._decode(
+                        cap, policy.stride_for(fps, policy.target_fps), scale,
+                        first_frame=window[0], last_frame=window[1]
+                    )
+                    frames = self._merge_frames(frames, dense)
+        finally:
+            cap.release()
+
+        indices, timestamps, landmarks, histograms, hashes = frames
+        return PoseSequence(
+            landmarks, timestamps, fps, frame_size,
+            frame_indices=indices, histograms=histograms, frame_hashes=hashes
+        )
+
+    def _decode(self, cap, stride, scale, first_frame=0, last_frame=None):
+        """Run pose estimation on every stride-th frame from the capture's position"""
+        indices, timestamps, landmarks, histograms, hashes = [], [], [], [], []
+        frame_index = first_frame
+        # Entries before `resolved` are arrays; later ones may still be Futures
+        resolved = 0 if self.estimator is not None else None
+
+        while cap.isOpened() and (last_frame is None or frame_index <= last_frame):
+            # grab() skips colour conversion and copying for frames we drop
+            if not cap.grab():
                 break
-                
-            # Process frame with MediaPipe
-            results = self.pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            
-            if results.pose_landmarks:
-                # Extract hip position for jump height calculation
-                hip = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_HIP]
-                jump_heights.append(hip.y)
-        
-        cap.release()
-        
+
+            if (frame_index - first_frame) % stride == 0:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                if scale < 1.0:
+                    frame = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+                indices.append(frame_index)
+                timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+                histograms.append(frame_histogram(frame))
+                hashes.append(frame_dhash(frame))
+                landmarks.append(self._estimate(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+
+                # Bound the frames held for a batched estimator
+                if resolved is not None and len(landmarks) - resolved > self.MAX_FRAMES_IN_FLIGHT:
+                    landmarks[resolved] = landmarks[resolved].result()
+                    resolved += 1
+            frame_index += 1
+
+        if self.estimator is not None:
+            landmarks[resolved:] = [future.result() for future in landmarks[resolved:]]
+
+        return (
+            np.asarray(indices, dtype=np.int64),
+            np.asarray(timestamps, dtype=np.float64),
+            np.asarray(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, LANDMARK_DIMS),
+            np.asarray(histograms, dtype=np.float32).reshape(-1, 3 * HISTOGRAM_BINS),
+            np.asarray(hashes, dtype=np.uint64)
+        )
+
+    def _estimate(self, frame_rgb):
+        """Landmarks for one frame, or a Future when batching across recordings"""
+        if self.estimator is not None:
+            return self.estimator.submit(frame_rgb)
+
+        # Process frame with MediaPipe
+        results = self.pose.process(frame_rgb)
+        if not results.pose_landmarks:
+            return MISSING_POSE
+        return [(lm.x, lm.y, lm.z, lm.visibility) for lm in results.pose_landmarks.landmark]
+
+    def _motion_window(self, frames, fps, policy):
+        """(first_frame, last_frame) around the movement found in a sparse pass"""
+        indices, _, landmarks, _, _ = frames
+        hips = [self.mp_pose.PoseLandmark.LEFT_HIP, self.mp_pose.PoseLandmark.RIGHT_HIP]
+        hip_y = landmarks[:, hips, 1].mean(axis=1)
+        detected = ~np.isnan(hip_y)
+        if detected.sum() < 2:
+            return None
+
+        displacement = np.abs(hip_y[detected] - np.median(hip_y[detected]))
+        threshold = max(0.02, 0.3 * displacement.max())
+        active = indices[detected][displacement > threshold]
+        if len(active) == 0:
+            return None
+
+        padding = int(policy.window_padding * fps)
+        return max(int(active[0]) - padding, 0), int(active[-1]) + padding
+
+    def _merge_frames(self, coarse, dense):
+        """Combine two sampling passes into one frame-ordered set"""
+        indices = np.concatenate([dense[0], coarse[0]])
+        # Dense samples come first so they win when both passes hit a frame
+        indices, keep = np.unique(indices, return_index=True)
+        timestamps = np.concatenate([dense[1], coarse[1]])[keep]
+        landmarks = np.concatenate([dense[2], coarse[2]])[keep]
+        histograms = np.concatenate([dense[3], coarse[3]])[keep]
+        hashes = np.concatenate([dense[4], coarse[4]])[keep]
+        return indices, timestamps, landmarks, histograms, hashes
+
+    def analyze(self, test_name, video_path, content_hash=None, config=None):
+        """Extract landmarks once and score them with the test's analyzer"""
+        policy = SamplingPolicy.for_test(test_name, config)
+        sequence = self.extract_landmarks(video_path, content_hash, policy)
+        return self.run_analyzer(test_name, sequence)
+
+    def run_analyzer(self, test_name, sequence):
+        method_name = self.ANALYZERS.get(test_name)
+        if method_name is None:
+            raise ValueError(f"No AI analyzer available for test '{test_name}'")
+        return getattr(self, method_name)(sequence)
+
+    def _as_sequence(self, source):
+        if isinstance(source, PoseSequence):
+            return source
+        return self.extract_landmarks(source)
+
+    def analyze_vertical_jump(self, source):
+        """Analyze vertical jump performance"""
+        sequence = self._as_sequence(source)
+
+        # Extract hip position for jump height calculation
+        jump_heights = sequence.points(self.mp_pose.PoseLandmark.LEFT_HIP)[:, 1]
+        times = sequence.times()
+        if len(jump_heights) == 0:
+            raise ValueError('No pose detected in video')
+
         # Calculate max jump height
-        baseline = np.median(jump_heights[:30])  # Standing position
-        max_height = min(jump_heights)  # Lowest y-value = highest jump
+        standing = times <= times[0] + 1.0  # First second, independent of sampling rate
+        baseline = float(np.median(jump_heights[standing]))  # Standing position
+        max_height = float(jump_heights.min())  # Lowest y-value = highest jump
         jump_height_cm = (baseline - max_height) * 180  # Convert to cm (approximate)
-        
+
         return {
+            'score': jump_height_cm,
             'jump_height': jump_height_cm,
             'confidence': 0.85,
             'analysis_data': {
@@ -44,39 +415,192 @@ class VideoAnalyzer:
                 'total_frames': len(jump_heights)
             }
         }
-    
-    def analyze_situps(self, video_path):
+
+    def analyze_situps(self, source):
         """Count sit-ups and validate form"""
-        cap = cv2.VideoCapture(video_path)
-        rep_count = 0
-        positions = []
-        
-        while cap.isOpened():
-            ret, frame = cap.read()
-            if not ret:
-                break
-                
-            results = self.pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-            
-            if results.pose_landmarks:
-                # Calculate torso angle
-                shoulder = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_SHOULDER]
-                hip = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_HIP]
-                knee = results.pose_landmarks.landmark[self.mp_pose.PoseLandmark.LEFT_KNEE]
-                
-                angle = self.calculate_angle(shoulder, hip, knee)
-                positions.append(angle)
-        
-        cap.release()
-        
+        sequence = self._as_sequence(source)
+
+        # Calculate torso angle for all frames at once
+        shoulder = sequence.points(self.mp_pose.PoseLandmark.LEFT_SHOULDER)
+        hip = sequence.points(self.mp_pose.PoseLandmark.LEFT_HIP)
+        knee = sequence.points(self.mp_pose.PoseLandmark.LEFT_KNEE)
+
+        positions = self.calculate_angle(shoulder, hip, knee)
+
         # Count complete repetitions
-        rep_count = self.count_repetitions(positions, threshold_up=160, threshold_down=90)
-        
+        reps = self.count_repetitions(
+            positions, threshold_up=160, threshold_down=90, timestamps=sequence.times()
+        )
+        rep_count = reps['count']
+
         return {
+            'score': rep_count,
             'rep_count': rep_count,
             'confidence': 0.90,
             'analysis_data': {
-                'angle_sequence': positions,
-                'total_frames': len(positions)
+                'angle_sequence': positions.tolist(),
+                'total_frames': len(positions),
+                'repetitions': reps['repetitions'],
+                'mean_form_quality': reps['mean_form_quality']
+            }
+        }
+
+    def calculate_angle(self, a, b, c):
+        """Angle at b in degrees between b->a and b->c, for one point or (frames, 2) arrays"""
+        b = np.asarray(b, dtype=np.float64)
+        ba = np.asarray(a, dtype=np.float64) - b
+        bc = np.asarray(c, dtype=np.float64) - b
+
+        norms = np.linalg.norm(ba, axis=-1) * np.linalg.norm(bc, axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cosine = np.einsum('...i,...i->...', ba, bc) / norms
+        return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+    def count_repetitions(self, angles, threshold_up, threshold_down, timestamps=None, smoothing=5):
+        """Count extend -> flex -> extend cycles in a joint angle series
+
+        Uses hysteresis: a frame is 'extended' at or above threshold_up,
+        'flexed' at or below threshold_down, and keeps the previous state in
+        between, so jitter around a single threshold is never counted.
+        """
+        angles = np.asarray(angles, dtype=np.float64)
+        if timestamps is None:
+            timestamps = np.arange(len(angles), dtype=np.float64)
+
+        # Degenerate poses give NaN angles; they carry no state information
+        valid = ~np.isnan(angles)
+        angles, timestamps = angles[valid], np.asarray(timestamps)[valid]
+        empty = {'count': 0, 'repetitions': [], 'mean_form_quality': None}
+        if len(angles) == 0:
+            return empty
+
+        # Moving average with edge padding so the ends are not pulled towards zero
+        if smoothing > 1 and len(angles) >= smoothing:
+            padded = np.pad(angles, (smoothing // 2, smoothing - 1 - smoothing // 2), mode='edge')
+            angles = np.convolve(padded, np.ones(smoothing) / smoothing, mode='valid')
+
+        # 1 = extended, 0 = flexed, -1 = undecided; forward fill the undecided frames
+        state = np.where(angles >= threshold_up, 1, np.where(angles <= threshold_down, 0, -1))
+        last_decided = np.maximum.accumulate(np.where(state >= 0, np.arange(len(state)), 0))
+        state = np.where(state[last_decided] >= 0, state[last_decided], -1)
+
+        # Split into constant-state segments
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(state)) + 1])
+        segment_state = state[starts]
+        segment_min = np.minimum.reduceat(angles, starts)
+        segment_max = np.maximum.reduceat(angles, starts)
+
+        # First frame of each segment that hits the segment minimum
+        segment_id = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(angles))))
+        at_min = np.flatnonzero(angles == segment_min[segment_id])
+        _, first = np.unique(segment_id[at_min], return_index=True)
+        segment_argmin = at_min[first]
+
+        # A rep ends when an extended segment follows a flexed one that followed an extended one
+        k = np.arange(2, len(starts))
+        k = k[(segment_state[k] == 1) & (segment_state[k - 1] == 0) & (segment_state[k - 2] == 1)]
+        if len(k) == 0:
+            return empty
+
+        depth_margin = threshold_down - segment_min[k - 1]
+        extension_margin = segment_max[k - 2] - threshold_up
+
+        # Reps that only just cross the thresholds score 0.5; clear margins approach 1.0
+        quality = (
+            np.clip(0.5 + depth_margin / 40, 0, 1) + np.clip(0.5 + extension_margin / 40, 0, 1)
+        ) / 2
+
+        start_times = timestamps[starts[k - 1] - 1]  # last extended frame before flexing
+        bottom_times = timestamps[segment_argmin[k - 1]]
+        end_times = timestamps[starts[k]]
+
+        repetitions = [
+            {
+                'start_time': float(start),
+                'bottom_time': float(bottom),
+                'end_time': float(end),
+                'min_angle': float(min_angle),
+                'form_quality': float(q)
+            }
+            for start, bottom, end, min_angle, q in zip(
+                start_times, bottom_times, end_times, segment_min[k - 1], quality
+            )
+        ]
+
+        return {
+            'count': len(repetitions),
+            'repetitions': repetitions,
+            'mean_form_quality': float(quality.mean())
+        }
+
+    def analyze_shuttle_run(self, source):
+        """Time the shuttle run from the athlete's horizontal hip trajectory"""
+        sequence = self._as_sequence(source)
+
+        left_hip = sequence.points(self.mp_pose.PoseLandmark.LEFT_HIP)
+        right_hip = sequence.points(self.mp_pose.PoseLandmark.RIGHT_HIP)
+        times = sequence.times()
+        if len(times) < 2:
+            raise ValueError('No pose detected in video')
+
+        # Smooth the mid-hip x position to suppress landmark jitter
+        hip_x = (left_hip[:, 0] + right_hip[:, 0]) / 2
+        window = max(int(round(sequence.sample_fps / 10)), 1)
+        # Edge padding keeps the ends from being pulled towards zero, which would read as motion
+        padded = np.pad(hip_x, (window // 2, window - 1 - window // 2), mode='edge')
+        hip_x = np.convolve(padded, np.ones(window) / window, mode='valid')
+
+        velocity = np.gradient(hip_x, times)
+        moving = np.abs(velocity) > 0.05  # frame widths per second
+        if not moving.any():
+            raise ValueError('No running movement detected in video')
+
+        start, end = np.flatnonzero(moving)[[0, -1]]
+        run_time = float(times[end] - times[start])
+
+        # Direction changes while moving are the turns at each line
+        direction = np.sign(velocity[start:end + 1][moving[start:end + 1]])
+        turns = int(np.count_nonzero(np.diff(direction)))
+
+        return {
+            'score': run_time,
+            'run_time': run_time,
+            'confidence': 0.80,
+            'analysis_data': {
+                'start_time': float(times[start]),
+                'end_time': float(times[end]),
+                'turns_detected': turns,
+                'total_frames': len(times)
             }
-        }
\ No newline at end of file
+        }
+
+    def analyze_flexibility(self, source):
+        """Measure sit-and-reach distance from wrist and toe positions"""
+        sequence = self._as_sequence(source)
+
+        wrist = sequence.points(self.mp_pose.PoseLandmark.LEFT_WRIST)
+        toe = sequence.points(self.mp_pose.PoseLandmark.LEFT_FOOT_INDEX)
+        hip = sequence.points(self.mp_pose.PoseLandmark.LEFT_HIP)
+        ankle = sequence.points(self.mp_pose.PoseLandmark.LEFT_ANKLE)
+        if len(wrist) == 0:
+            raise ValueError('No pose detected in video')
+
+        # Reach direction is from the hips towards the feet
+        direction = np.sign(np.median(toe[:, 0] - hip[:, 0])) or 1.0
+        reach = (wrist[:, 0] - toe[:, 0]) * direction
+
+        # Normalise by leg length so camera distance does not matter
+        leg_length = np.median(np.linalg.norm(hip - ankle, axis=1))
+        best = int(np.argmax(reach))
+        reach_cm = float(reach[best] / leg_length) * 90  # Convert to cm (approximate leg length)
+
+        return {
+            'score': reach_cm,
+            'reach_distance': reach_cm,
+            'confidence': 0.80,
+            'analysis_data': {
+                'best_reach_frame': best,
+                'leg_length_normalized': float(leg_length),
+                'total_frames': len(reach)
+            }
+        }
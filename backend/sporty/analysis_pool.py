@@ -0,0 +1,128 @@
+# analysis_pool.py
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+from multiprocessing import util
+
+from django.db import connections
+
+# Per-process state, set up by _init_worker
+_analyzer = None
+
+# A worker that crashed or was killed never hands its CPU back, so its
+# replacement stops waiting for a free one after this long and runs unpinned
+CPU_WAIT_SECONDS = 5
+
+
+def _forget_connections():
+    """Drop DB connections inherited through fork without ending their sessions
+
+    close() would tell the server the parent's session is over. Closing only
+    this process's copy of the socket leaves the parent's connection working.
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is None:
+            continue
+        try:
+            os.close(connection.connection.fileno())
+        except (AttributeError, OSError, TypeError):
+            pass
+        connection.connection = None
+
+
+def _init_worker(free_cpus):
+    """Pin the worker to a free CPU and load its VideoAnalyzer once"""
+    global _analyzer
+
+    # Connections inherited through fork must not be shared with the parent
+    _forget_connections()
+
+    try:
+        cpu = free_cpus.get(timeout=CPU_WAIT_SECONDS)
+    except queue.Empty:
+        logging.warning(f"No free CPU for analysis worker {os.getpid()}; running unpinned")
+    else:
+        if hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {cpu})
+        # Hand the CPU back when the worker is recycled
+        util.Finalize(None, free_cpus.put, args=(cpu,), exitpriority=10)
+
+    from .benchmarks import benchmark_index
+    from .tasks import get_analyzer
+    _analyzer = get_analyzer()
+    benchmark_index.load()
+
+
+def _run_analysis(recording_id):
+    from .tasks import analyze_recording
+    analyze_recording(recording_id, _analyzer)
+    return recording_id
+
+
+class AnalysisPool:
+    """Pool of CPU-pinned processes, each holding a warm VideoAnalyzer
+
+    Workers are replaced after max_jobs_per_process recordings to contain
+    memory growth in the pose graph. submit() blocks once max_pending jobs
+    are in flight so callers cannot queue unbounded work.
+    """
+
+    def __init__(self, processes, max_jobs_per_process, max_pending):
+        if hasattr(os, 'sched_getaffinity'):
+            cpus = sorted(os.sched_getaffinity(0))
+        else:
+            cpus = list(range(os.cpu_count() or 1))
+
+        # One slot per process; more processes than CPUs share CPUs round robin
+        free_cpus = multiprocessing.Queue()
+        for i in range(processes):
+            free_cpus.put(cpus[i % len(cpus)])
+
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._max_pending = max_pending
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        # Fork without open connections. Workers recycled later are forked by the
+        # pool's handler thread, which holds none of the caller's connections.
+        connections.close_all()
+        self._pool = multiprocessing.Pool(
+            processes=processes,
+            initializer=_init_worker,
+            initargs=(free_cpus,),
+            maxtasksperchild=max_jobs_per_process,
+        )
+
+    def free_slots(self):
+        """How many more recordings submit() would take without blocking"""
+        with self._pending_lock:
+            return self._max_pending - self._pending
+
+    def _release(self):
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def submit(self, recording_id, timeout=None):
+        """Dispatch a recording; returns False if no slot freed up within timeout"""
+        if not self._slots.acquire(timeout=timeout):
+            return False
+        with self._pending_lock:
+            self._pending += 1
+
+        def release(result):
+            self._release()
+
+        def failed(error):
+            self._release()
+            logging.error(f"Analysis worker crashed on recording {recording_id}: {error}")
+
+        self._pool.apply_async(
+            _run_analysis, (recording_id,), callback=release, error_callback=failed
+        )
+        return True
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
@@ -0,0 +1,24 @@
+# apps.py
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+class SportyConfig(AppConfig):
+    name = 'sporty'
+
+    def ready(self):
+        from .benchmarks import benchmark_index, invalidate_benchmarks
+        from .models import AgeBenchmark, AthleteProfile
+        from .stats import count_deleted_athlete, count_new_athlete
+
+        post_save.connect(invalidate_benchmarks, sender=AgeBenchmark,
+                          dispatch_uid='sporty.benchmarks.save')
+        post_delete.connect(invalidate_benchmarks, sender=AgeBenchmark,
+                            dispatch_uid='sporty.benchmarks.delete')
+        # Ready before the first request or task instead of on the first lookup
+        benchmark_index.preload()
+
+        post_save.connect(count_new_athlete, sender=AthleteProfile,
+                          dispatch_uid='sporty.stats.athlete_save')
+        post_delete.connect(count_deleted_athlete, sender=AthleteProfile,
+                            dispatch_uid='sporty.stats.athlete_delete')
@@ -13,4 +13,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sporty.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up
+from .status_channel import EVENTS_PATH, stream_status
+
+
+async def application(scope, receive, send):
+    """Django, plus analysis status streams served outside the Django request cycle"""
+    if scope['type'] == 'http':
+        match = EVENTS_PATH.match(scope['path'])
+        if match:
+            return await stream_status(scope, receive, send, match['recording_id'])
+    await django_application(scope, receive, send)
@@ -0,0 +1,171 @@
+# benchmarks.py
+import threading
+import time
+import warnings
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import accumulate
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .models import AgeBenchmark, PlatformStat
+from .stats import increment
+
+# PlatformStat counter bumped on every benchmark change; the stamp lives in the
+# database so every process sees it, whatever the cache backend
+VERSION_STAT = 'benchmark_index_version'
+
+
+def _current_version():
+    return PlatformStat.objects.filter(name=VERSION_STAT).values_list('value', flat=True).first()
+
+
+class BenchmarkIndex:
+    """Process-local AgeBenchmark lookup by (test, gender, age)
+
+    Benchmarks are held per test and gender as age bands sorted by age_min,
+    and a lookup is a bisect over the band starts. Where a test's bands
+    overlap, the lookup scans them in id order instead, matching the first
+    band the database query would return. Saving or deleting an AgeBenchmark
+    drops the local copy and bumps a version stamp in platform_stats. Other
+    processes compare against the stamp at most every
+    BENCHMARK_INDEX_CHECK_SECONDS and reload when it moved. Bulk queryset
+    updates send no signals; call invalidate_benchmarks() after them.
+    """
+
+    def __init__(self):
+        self._bands = {}
+        self._version = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self):
+        # Read the stamp first, so a change made while loading triggers another reload
+        version = _current_version()
+        grouped = defaultdict(list)
+        for benchmark in AgeBenchmark.objects.order_by('fitness_test_id', 'gender', 'age_min', 'id'):
+            grouped[(benchmark.fitness_test_id, benchmark.gender)].append(benchmark)
+
+        bands = {}
+        for key, benchmarks in grouped.items():
+            # A band overlaps if it starts before an earlier band has ended
+            reach = list(accumulate((benchmark.age_max for benchmark in benchmarks), max))
+            overlapping = any(benchmark.age_min <= end for benchmark, end in zip(benchmarks[1:], reach))
+            if overlapping:
+                bands[key] = (None, sorted(benchmarks, key=lambda benchmark: benchmark.id))
+            else:
+                bands[key] = ([benchmark.age_min for benchmark in benchmarks], benchmarks)
+
+        self._bands = bands
+        self._version = version
+        self._checked_at = time.monotonic()
+        self._loaded = True
+
+    def preload(self):
+        """Load at process start; left to the first lookup if the table is not there yet"""
+        try:
+            with warnings.catch_warnings():
+                # Deliberate: a small read-only table, read once before serving
+                warnings.simplefilter('ignore', RuntimeWarning)
+                self.load()
+        except DatabaseError:
+            pass
+        finally:
+            # Web and Celery workers fork after startup and must not share this connection
+            connection.close()
+
+    def invalidate(self):
+        self._loaded = False
+
+    def _refresh(self):
+        with self._lock:
+            if not self._loaded:
+                self.load()
+            elif time.monotonic() - self._checked_at >= settings.BENCHMARK_INDEX_CHECK_SECONDS:
+                self._checked_at = time.monotonic()
+                if _current_version() != self._version:
+                    self.load()
+
+    def lookup(self, fitness_test_id, age, gender):
+        """Benchmark whose age band contains age, or None"""
+        try:
+            age = int(age)
+        except (TypeError, ValueError):
+            return None
+
+        self._refresh()
+        bands = self._bands.get((fitness_test_id, gender))
+        if not bands:
+            return None
+
+        starts, benchmarks = bands
+        if starts is None:
+            return next((benchmark for benchmark in benchmarks
+                         if benchmark.age_min <= age <= benchmark.age_max), None)
+
+        i = bisect_right(starts, age) - 1
+        if i >= 0 and benchmarks[i].age_max >= age:
+            return benchmarks[i]
+        return None
+
+
+benchmark_index = BenchmarkIndex()
+
+
+def points_for(benchmark, score, lower_is_better=False):
+    """Gamification points a score earns against a benchmark"""
+    thresholds = [
+        (benchmark.excellent_threshold, benchmark.excellent_points),
+        (benchmark.good_threshold, benchmark.good_points),
+        (benchmark.average_threshold, benchmark.average_points),
+    ]
+    for threshold, points in thresholds:
+        if (score <= threshold) if lower_is_better else (score >= threshold):
+            return points
+    return benchmark.below_average_points
+
+
+def benchmark_comparison(recording):
+    """Get benchmark comparison for the recording"""
+    try:
+        benchmark = benchmark_index.lookup(
+            recording.fitness_test_id,
+            recording.athlete.age,
+            recording.athlete.gender
+        )
+        
+        if benchmark and recording.final_score:
+            score = float(recording.final_score)
+            
+            # Determine performance category
+            if score >= benchmark.excellent_threshold:
+                category = 'Excellent'
+            elif score >= benchmark.good_threshold:
+                category = 'Good'
+            elif score >= benchmark.average_threshold:
+                category = 'Average'
+            else:
+                category = 'Below Average'
+            
+            return {
+                'athlete_score': score,
+                'benchmark_excellent': float(benchmark.excellent_threshold),
+                'benchmark_good': float(benchmark.good_threshold),
+                'benchmark_average': float(benchmark.average_threshold),
+                'benchmark_below_average': float(benchmark.below_average_threshold),
+                'performance_category': category,
+                'percentile': recording.percentile,
+                'points_earned': recording.points_earned
+            }
+    except Exception:
+        pass
+    
+    return None
+
+
+def invalidate_benchmarks(**kwargs):
+    """Signal receiver; also safe to call directly after bulk changes"""
+    benchmark_index.invalidate()
+    increment(VERSION_STAT)
@@ -0,0 +1,11 @@
+# celery.py
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sporty.settings')
+
+app = Celery('sporty')
+# CELERY_* Django settings, including the analysis stage routes
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()
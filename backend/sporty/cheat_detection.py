@@ -0,0 +1,170 @@
+# cheat_detection.py
+import numpy as np
+
+# MediaPipe Pose landmark indices
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+# Overridable per test through FitnessTest.ai_model_config['cheat_detection']
+DEFAULTS = {
+    'cut_distance': 0.5,  # histogram L1 distance (0-2) between neighbouring samples
+    'cut_ratio': 5.0,  # and this many times the clip's median distance
+    'jitter': 0.25,  # median deviation of frame intervals from their median, relative
+    'speed_deviation': 0.15,  # median frame interval off the container frame rate, relative
+    'max_body_speed': 15.0,  # hip travel in torso lengths per second
+    'scale_jump': 0.35,  # relative torso length change between neighbouring samples
+    'suspicious_score': 0.6,
+}
+
+
+def thresholds_for(config=None):
+    options = (config or {}).get('cheat_detection', {})
+    return dict(DEFAULTS, **{k: v for k, v in options.items() if k in DEFAULTS})
+
+
+def make_flag(kind, severity, message, timestamps=(), **details):
+    """Entry of TestRecording.cheat_flags"""
+    return dict({
+        'type': kind,
+        'severity': round(float(min(severity, 1.0)), 4),
+        'message': message,
+        'timestamps': [round(float(t), 3) for t in timestamps],
+    }, **details)
+
+
+def _neighbours(sequence):
+    """Mask of sample pairs that are consecutive at the clip's usual stride
+
+    Coarse-to-fine sampling leaves longer gaps outside the movement window;
+    differences across those are not comparable.
+    """
+    gaps = np.diff(sequence.frame_indices)
+    if len(gaps) == 0:
+        return np.zeros(0, dtype=bool), gaps
+    return (gaps > 0) & (gaps <= 1.5 * np.median(gaps)), gaps
+
+
+def check_cuts(sequence, thresholds):
+    """Splices and cuts: the frame histogram jumps between neighbouring samples"""
+    if sequence.histograms is None or len(sequence) < 3:
+        return None
+    adjacent, _ = _neighbours(sequence)
+    distance = np.abs(np.diff(sequence.histograms, axis=0)).sum(axis=1)
+    baseline = np.median(distance[adjacent]) if adjacent.any() else 0.0
+    cuts = adjacent & (distance > max(thresholds['cut_distance'], thresholds['cut_ratio'] * baseline))
+    if not cuts.any():
+        return None
+    return make_flag(
+        'frame_cut', 0.5 + 0.2 * cuts.sum(),
+        f"{cuts.sum()} abrupt scene change(s), the video may be edited",
+        sequence.timestamps[1:][cuts]
+    )
+
+
+def check_timestamps(sequence, thresholds):
+    """Altered playback speed or dropped frames, from the frame timestamps"""
+    if len(sequence) < 3:
+        return []
+    adjacent, gaps = _neighbours(sequence)
+    intervals = np.diff(sequence.timestamps)
+    flags = []
+
+    backwards = intervals <= 0
+    if backwards.any():
+        flags.append(make_flag(
+            'timestamp_order', 1.0, 'Frame timestamps go backwards',
+            sequence.timestamps[1:][backwards]
+        ))
+
+    valid = adjacent & ~backwards
+    if valid.sum() < 2 or not sequence.fps:
+        return flags
+    # Interval of each pair relative to what the container frame rate implies
+    ratio = intervals[valid] / (gaps[valid] / sequence.fps)
+    median = np.median(ratio)
+
+    speed = abs(median - 1.0)
+    if speed > thresholds['speed_deviation']:
+        flags.append(make_flag(
+            'playback_speed', 0.5 * speed / thresholds['speed_deviation'],
+            f"Frames are {median:.2f}x as far apart as the frame rate implies"
+        ))
+
+    jitter = np.median(np.abs(ratio - median)) / median
+    if jitter > thresholds['jitter']:
+        uneven = np.abs(ratio - median) / median > 2 * thresholds['jitter']
+        flags.append(make_flag(
+            'timestamp_jitter', 0.5 * jitter / thresholds['jitter'],
+            'Frame intervals are irregular, frames may have been dropped or retimed',
+            sequence.timestamps[1:][valid][uneven]
+        ))
+    return flags
+
+
+def check_motion(sequence, thresholds):
+    """Implausible hip speeds, and the tracked body changing size mid-jump (another person)"""
+    detected = sequence.detected
+    if detected.sum() < 3:
+        return []
+    adjacent, _ = _neighbours(sequence)
+
+    # Pixel coordinates, so x and y are on the same scale
+    points = sequence.landmarks[:, :, :2] * np.asarray(sequence.frame_size, dtype=np.float32)
+    hips = points[:, [LEFT_HIP, RIGHT_HIP]].mean(axis=1)
+    shoulders = points[:, [LEFT_SHOULDER, RIGHT_SHOULDER]].mean(axis=1)
+    torso = np.linalg.norm(shoulders - hips, axis=1)
+    body = np.nanmedian(torso[detected])
+    if not body > 0:
+        return []
+
+    pairs = adjacent & detected[1:] & detected[:-1]
+    intervals = np.diff(sequence.timestamps)
+    pairs &= intervals > 0
+    shift = np.linalg.norm(np.diff(hips, axis=0), axis=1)
+    flags = []
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        speed = np.where(pairs, shift / body / intervals, 0.0)
+        scale = np.where(pairs, np.abs(np.log(torso[1:] / torso[:-1])), 0.0)
+        # In the smaller body's torso lengths, as either body may be the athlete
+        jump = np.where(pairs, shift / np.fmin(torso[1:], torso[:-1]), 0.0)
+
+    fast = speed > thresholds['max_body_speed']
+    # A different person is detected: the body jumps and changes size at once
+    swapped = (scale > np.log1p(thresholds['scale_jump'])) & (jump > 1.0)
+    fast &= ~swapped
+
+    if swapped.any():
+        flags.append(make_flag(
+            'multiple_people', 0.4 * swapped.sum(),
+            'The tracked person changes mid-video, someone else may be in frame',
+            sequence.timestamps[1:][swapped]
+        ))
+    if fast.any():
+        flags.append(make_flag(
+            'implausible_velocity', 0.3 * fast.sum(),
+            f"Body moves faster than {thresholds['max_body_speed']:g} torso lengths per second",
+            sequence.timestamps[1:][fast]
+        ))
+    return flags
+
+
+def detect_cheating(sequence, config=None, extra_flags=()):
+    """Integrity checks over the landmarks and frame histograms already extracted for scoring
+
+    Returns {'score', 'flags', 'is_suspicious'}. Each flag carries a
+    severity in [0, 1]; the score combines them, and any extra_flags found
+    elsewhere (fingerprints.py), as independent evidence.
+    """
+    thresholds = thresholds_for(config)
+    flags = list(extra_flags)
+    flags += [flag for flag in [check_cuts(sequence, thresholds)] if flag]
+    flags += check_timestamps(sequence, thresholds)
+    flags += check_motion(sequence, thresholds)
+
+    score = 1.0 - float(np.prod([1.0 - flag['severity'] for flag in flags]))
+    return {
+        'score': round(score, 4),
+        'flags': flags,
+        'is_suspicious': score >= thresholds['suspicious_score'],
+    }
@@ -0,0 +1,139 @@
+# fast_serializers.py
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from .serializers import AssessmentSessionSerializer, LeaderboardSerializer, TestRecordingSerializer
+
+# Field types whose database value is already what the serializer returns
+_PASSTHROUGH = (
+    serializers.CharField, serializers.ChoiceField, serializers.IntegerField,
+    serializers.BooleanField, serializers.JSONField, serializers.ReadOnlyField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+def _iso_datetimes(tz):
+    """DateTimeField.to_representation for ISO 8601 output in timezone tz"""
+    def convert(value):
+        value = value.astimezone(tz) if timezone.is_aware(value) else timezone.make_aware(value, tz)
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+    return convert
+
+
+def _is_plain_iso_datetime(field):
+    return (isinstance(field, serializers.DateTimeField)
+            and settings.USE_TZ
+            and not hasattr(field, 'timezone')
+            and str(getattr(field, 'format', api_settings.DATETIME_FORMAT)).lower() == ISO_8601)
+
+
+class FastSerializer:
+    """Read-only list serializer built from values_list() rows
+
+    Compiled once from a DRF ModelSerializer into a row-mapping function, so
+    the output matches the serializer exactly: the same keys in the same
+    order, and the same value formats. Decimals and dates are formatted by
+    the DRF field itself. Each SerializerMethodField needs a replacement in
+    method_fields, as name -> (source columns, function of those columns).
+    As in DRF, a dotted source through a null relation leaves its key out
+    of the row.
+    """
+
+    def __init__(self, serializer_class, method_fields=None):
+        self.serializer_class = serializer_class
+        self.method_fields = method_fields or {}
+        self._columns = None
+        self._source = None
+        self._converters = None
+
+    def _column(self, lookup):
+        if lookup not in self._columns:
+            self._columns.append(lookup)
+        return self._columns.index(lookup)
+
+    def _compile(self):
+        self._columns, converters, lines = [], {}, []
+
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            key = repr(name)
+
+            if isinstance(field, serializers.SerializerMethodField):
+                if name not in self.method_fields:
+                    raise ImproperlyConfigured(
+                        f"{self.serializer_class.__name__}.{name} needs a fast replacement"
+                    )
+                columns, function = self.method_fields[name]
+                converters[f"m{len(converters)}"] = function
+                args = ', '.join(f"row[{self._column(column)}]" for column in columns)
+                lines.append(f"    item[{key}] = m{len(converters) - 1}({args})")
+                continue
+
+            if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+                raise ImproperlyConfigured(f"{self.serializer_class.__name__}.{name} is not supported")
+
+            parts = field.source.split('.')
+            index = self._column('__'.join(parts))
+            if _is_plain_iso_datetime(field):
+                value = f"datetime(row[{index}])"
+            elif isinstance(field, serializers.UUIDField) and field.uuid_format == 'hex_verbose':
+                value = f"str(row[{index}])"
+            elif isinstance(field, _PASSTHROUGH) and not isinstance(field, serializers.DecimalField):
+                value = f"row[{index}]"
+            else:
+                converters[f"c{len(converters)}"] = field.to_representation
+                value = f"c{len(converters) - 1}(row[{index}])"
+
+            if value == f"row[{index}]":
+                line = f"item[{key}] = {value}"
+            else:
+                line = f"item[{key}] = None if row[{index}] is None else {value}"
+            # Nullable links on a dotted path; DRF skips the field when one is empty
+            guards = [self._column('__'.join(parts[:depth + 1])) for depth in range(len(parts) - 1)]
+            if guards:
+                condition = ' and '.join(f"row[{guard}] is not None" for guard in guards)
+                lines.append(f"    if {condition}:\n        {line}")
+            else:
+                lines.append(f"    {line}")
+
+        self._source = 'def map_row(row):\n    item = {}\n' + '\n'.join(lines) + '\n    return item\n'
+        self._converters = converters
+
+    def mapper(self):
+        """Row function for the current timezone"""
+        if self._source is None:
+            self._compile()
+        namespace = dict(self._converters, datetime=_iso_datetimes(timezone.get_current_timezone()))
+        exec(self._source, namespace)
+        return namespace['map_row']
+
+    def serialize(self, queryset):
+        """List of row dicts, as serializer_class(queryset, many=True).data would give"""
+        map_row = self.mapper()
+        return [map_row(row) for row in queryset.values_list(*self._columns)]
+
+
+def _rank_change(previous_rank, current_rank):
+    return previous_rank - current_rank if previous_rank else 0
+
+
+def _progress_percentage(completed_tests, total_tests):
+    if total_tests > 0:
+        return round((completed_tests / total_tests) * 100, 2)
+    return 0
+
+
+fast_leaderboards = FastSerializer(LeaderboardSerializer, {
+    'rank_change': (['previous_rank', 'current_rank'], _rank_change),
+})
+fast_sessions = FastSerializer(AssessmentSessionSerializer, {
+    'progress_percentage': (['completed_tests', 'total_tests'], _progress_percentage),
+})
+fast_recordings = FastSerializer(TestRecordingSerializer)
@@ -0,0 +1,171 @@
+# fingerprints.py
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .cheat_detection import make_flag
+from .models import FingerprintBucket, VideoFingerprint
+
+# Frame hashes kept per video; lookups probe with every sampled frame, so a
+# trimmed copy still meets the keyframes it contains
+KEYFRAMES = 8
+# Each 64-bit hash is bucketed by its two 32-bit halves: a copy a few bits
+# away nearly always keeps one half intact
+BAND_MASK = np.uint64(0xFFFFFFFF)
+MAX_FRAME_DISTANCE = 10  # bits of 64
+MIN_MATCHING_KEYFRAMES = 3
+MAX_POSE_DISTANCE = 8  # bits of 64
+# Candidates compared per lookup, most shared buckets first
+MAX_CANDIDATES = 200
+MAX_LOOKALIKES_LISTED = 10
+# Hashes of near-uniform frames (black, blown out) say nothing about the video
+MIN_HASH_BITS, MAX_HASH_BITS = 8, 56
+
+# Joints (MediaPipe Pose indices) whose motion makes up the pose signatures
+TRAJECTORY_JOINTS = [11, 12, 13, 14, 15, 16, 23, 24, 25, 26, 27, 28]
+WINDOW_SECONDS = 1.0
+WINDOW_STEPS = 16
+# Fixed seed: signatures must compare across processes and releases
+HYPERPLANES = np.random.RandomState(25).standard_normal((64, len(TRAJECTORY_JOINTS) * 2 * WINDOW_STEPS))
+
+
+def _bit_counts(values):
+    """Set bits of each uint64"""
+    octets = np.ascontiguousarray(values, dtype='>u8').view(np.uint8)
+    return np.unpackbits(octets.reshape(*np.shape(values), 8), axis=-1).sum(axis=-1)
+
+
+def _informative(hashes):
+    """Positions of frames whose hash is neither near-empty nor near-full"""
+    counts = _bit_counts(hashes)
+    return np.flatnonzero((counts >= MIN_HASH_BITS) & (counts <= MAX_HASH_BITS))
+
+
+def _bands(hashes):
+    """Bucket keys of the hashes in band 0 (high halves) and band 1 (low halves)"""
+    return [int(h) for h in hashes >> np.uint64(32)], [int(h) for h in hashes & BAND_MASK]
+
+
+def pose_signatures(sequence, positions):
+    """SimHash of the joints' motion around each frame position, 0 where too few poses were found
+
+    Joints are taken relative to the hips and in torso lengths, so the
+    signatures survive cropping, rescaling and re-encoding. Anchored on
+    matched frames rather than the clip's ends, they survive trimming too.
+    """
+    signatures = np.zeros(len(positions), dtype=np.uint64)
+    detected = sequence.detected
+    if detected.sum() < 2:
+        return signatures
+
+    points = sequence.landmarks[:, :, :2] * np.asarray(sequence.frame_size, dtype=np.float32)
+    hips = points[:, [23, 24]].mean(axis=1)
+    torso = np.nanmedian(np.linalg.norm(points[:, [11, 12]].mean(axis=1) - hips, axis=1))
+    if not torso > 0:
+        return signatures
+    relative = ((points[:, TRAJECTORY_JOINTS] - hips[:, None]) / torso).reshape(len(points), -1)
+    times = sequence.timestamps
+
+    for i, position in enumerate(positions):
+        centre = times[position]
+        near = detected & (np.abs(times - centre) <= WINDOW_SECONDS / 2)
+        if near.sum() < WINDOW_STEPS // 4:
+            continue
+        grid = np.linspace(centre - WINDOW_SECONDS / 2, centre + WINDOW_SECONDS / 2, WINDOW_STEPS)
+        motion = np.stack([np.interp(grid, times[near], column) for column in relative[near].T])
+        bits = HYPERPLANES @ (motion - motion.mean(axis=1, keepdims=True)).ravel() > 0
+        signatures[i] = np.packbits(bits).view('>u8')[0]
+    return signatures
+
+
+def keyframes(sequence):
+    """Positions of up to KEYFRAMES evenly spaced informative frames"""
+    if sequence.frame_hashes is None:
+        return np.zeros(0, dtype=int)
+    positions = _informative(sequence.frame_hashes)
+    if len(positions) == 0:
+        return positions
+    return positions[np.linspace(0, len(positions) - 1, min(KEYFRAMES, len(positions))).round().astype(int)]
+
+
+def find_duplicates(recording, sequence):
+    """cheat_flags entries for other athletes' videos of this test that this one nearly copies
+
+    Only recordings sharing an LSH bucket with one of this video's frames
+    are compared, those sharing the most first, so a lookup reads a handful
+    of rows whatever the corpus size. Matching frames alone can be the same
+    venue and camera and only earn one zero-severity 'similar_frames' note;
+    the same motion around the matching frames as well makes it the same
+    performance.
+    """
+    if sequence.frame_hashes is None:
+        return []
+    positions = _informative(sequence.frame_hashes)
+    probes, first = np.unique(sequence.frame_hashes[positions], return_index=True)
+    positions = positions[first]
+    if len(probes) == 0:
+        return []
+
+    high, low = _bands(probes)
+    candidates = FingerprintBucket.objects.filter(Q(band=0, key__in=high) | Q(band=1, key__in=low)).filter(
+        fingerprint__fitness_test_id=recording.fitness_test_id
+    ).exclude(
+        fingerprint__athlete_id=recording.athlete_id
+    ).values('fingerprint_id').annotate(hits=Count('id')).order_by('-hits').values_list(
+        'fingerprint_id', flat=True
+    )[:MAX_CANDIDATES]
+
+    flags, lookalikes = [], []
+    for fingerprint in VideoFingerprint.objects.filter(id__in=list(candidates)):
+        stored = np.frombuffer(bytes(fingerprint.keyframe_hashes), dtype='>u8').astype(np.uint64)
+        distances = _bit_counts(stored[:, None] ^ probes[None, :])
+        matched = distances.min(axis=1) <= MAX_FRAME_DISTANCE
+        if matched.sum() < min(MIN_MATCHING_KEYFRAMES, len(stored)):
+            continue
+
+        # Compare the motion around each matched keyframe with the motion around its match here
+        theirs = np.frombuffer(bytes(fingerprint.pose_signatures), dtype='>u8').astype(np.uint64)[matched]
+        ours = pose_signatures(sequence, positions[distances[matched].argmin(axis=1)])
+        comparable = (theirs != 0) & (ours != 0)
+        alike = int((_bit_counts(theirs ^ ours)[comparable] <= MAX_POSE_DISTANCE).sum())
+        if not (alike > 0 and alike * 2 >= comparable.sum()):
+            lookalikes.append(str(fingerprint.recording_id))
+            continue
+
+        flags.append(make_flag(
+            'duplicate_video', 0.9, 'Near duplicate of another athlete\'s recording',
+            recording_id=str(fingerprint.recording_id),
+            athlete_id=str(fingerprint.athlete_id),
+            matching_keyframes=int(matched.sum()),
+            matching_motion=alike
+        ))
+
+    if lookalikes:
+        # Every athlete filmed at one venue with a fixed camera shares frames; noted for
+        # reviewers, but no evidence of copying on its own
+        flags.append(make_flag(
+            'similar_frames', 0.0, f"Frames resemble {len(lookalikes)} other athletes' recordings",
+            recording_ids=lookalikes[:MAX_LOOKALIKES_LISTED]
+        ))
+    return flags
+
+
+def index_recording(recording, sequence):
+    """Store (or replace) the recording's fingerprint and its LSH buckets"""
+    positions = keyframes(sequence)
+    if len(positions) == 0:
+        return None
+    hashes = sequence.frame_hashes[positions]
+    with transaction.atomic():
+        fingerprint, _ = VideoFingerprint.objects.update_or_create(recording_id=recording.id, defaults={
+            'athlete_id': recording.athlete_id,
+            'fitness_test_id': recording.fitness_test_id,
+            'keyframe_hashes': hashes.astype('>u8').tobytes(),
+            'pose_signatures': pose_signatures(sequence, positions).astype('>u8').tobytes(),
+        })
+        fingerprint.buckets.all().delete()
+        FingerprintBucket.objects.bulk_create([
+            FingerprintBucket(fingerprint=fingerprint, band=band, key=key)
+            for band, keys in enumerate(_bands(hashes)) for key in keys
+        ])
+    return fingerprint
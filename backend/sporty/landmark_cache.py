@@ -0,0 +1,99 @@
+# landmark_cache.py
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+from django.conf import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    """SHA-256 of a file's content, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class LandmarkCache:
+    """On-disk cache of extracted pose landmarks with LRU eviction by total size
+
+    Entries are compressed .npz files named after the video content hash and
+    the pose model version, so a retry or re-score of the same video never
+    reruns pose inference. File mtimes double as the LRU clock.
+    """
+
+    def __init__(self, directory=None, max_bytes=None):
+        self.directory = directory or getattr(
+            settings, 'LANDMARK_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'sporty_landmarks')
+        )
+        self.max_bytes = max_bytes or getattr(settings, 'LANDMARK_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, content_hash, model_version):
+        return hashlib.sha256(f"{content_hash}:{model_version}".encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """Return the cached arrays for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return arrays
+
+    def put(self, key, arrays):
+        """Store arrays under key, then evict old entries if over budget"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            # Atomic so concurrent workers never read a half-written entry
+            os.replace(tmp_path, self._path(key))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until under max_bytes"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.npz'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        if total <= self.max_bytes:
+            return
+
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
@@ -0,0 +1,117 @@
+# management/commands/check_query_counts.py
+import time
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from sporty.models import (
+    AssessmentSession, AthleteBadge, AthleteProfile, Badge, FitnessTest, Leaderboard, TestRecording
+)
+from sporty.views import (
+    AssessmentSessionViewSet, AthleteProfileViewSet, LeaderboardViewSet, TestRecordingViewSet
+)
+
+# (name, view, url, maximum queries); budgets must not grow with the number of rows.
+# Paginated endpoints count one query for the (cached) total.
+BUDGETS = [
+    ('national_rankings', LeaderboardViewSet.as_view({'get': 'national_rankings'}),
+     '/leaderboards/national_rankings/?limit=100', 2),
+    ('state_rankings', LeaderboardViewSet.as_view({'get': 'state_rankings'}),
+     '/leaderboards/state_rankings/?state=Kerala&limit=100', 2),
+    ('leaderboards list', LeaderboardViewSet.as_view({'get': 'list'}), '/leaderboards/', 2),
+    ('test recordings list', TestRecordingViewSet.as_view({'get': 'list'}), '/test-recordings/', 2),
+    ('sessions list', AssessmentSessionViewSet.as_view({'get': 'list'}), '/assessment-sessions/', 2),
+    ('talent_summary', AthleteProfileViewSet.as_view({'get': 'talent_summary'}),
+     '/athletes/{athlete}/talent_summary/', 5),
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Check that list and ranking endpoints run a fixed number of queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100,
+                            help='Athletes to create in the throwaway fixture')
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            # Paginated endpoints build absolute next links from the request's host
+            with transaction.atomic(), override_settings(ALLOWED_HOSTS=['testserver']):
+                athlete = self.create_fixture(options['rows'])
+                failures = self.run_checks(athlete)
+                # Never keep the fixture
+                raise Rollback()
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Query budget exceeded: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('All endpoints within their query budgets'))
+
+    def create_fixture(self, rows):
+        tag = uuid.uuid4().hex[:8]
+        test = FitnessTest.objects.create(
+            name=f"qc_{tag}", display_name='Query check', description='', instructions='',
+            measurement_unit='reps'
+        )
+        badge = Badge.objects.create(name=f"Query check {tag}", description='', badge_type='special',
+                                     criteria={})
+
+        athletes = []
+        for i in range(rows):
+            athlete = AthleteProfile.objects.create(
+                auth_user_id=uuid.uuid4(), full_name=f"Athlete {i}", date_of_birth=date(2010, 1, 1),
+                age=15, gender='male', height=160, weight=50, phone_number='0', address='',
+                state='Kerala', district='Kochi', pin_code='682001', location_category='urban',
+                aadhaar_number=f"{uuid.uuid4().int % 10 ** 12:012d}"
+            )
+            session = AssessmentSession.objects.create(athlete=athlete, status='completed')
+            recording = TestRecording.objects.create(
+                session=session, fitness_test=test, athlete=athlete, original_video_url='https://x/v.mp4',
+                processing_status='completed', final_score=i, percentile=i % 100
+            )
+            AthleteBadge.objects.create(athlete=athlete, badge=badge, test_recording=recording)
+            for leaderboard_type in ('national', 'state'):
+                Leaderboard.objects.create(
+                    athlete=athlete, leaderboard_type=leaderboard_type, fitness_test=test,
+                    current_rank=rows - i, previous_rank=rows - i + 1,
+                    best_score=i, total_points=0, state='Kerala', district='Kochi'
+                )
+            athletes.append(athlete)
+        return athletes[-1]
+
+    def run_checks(self, athlete):
+        factory = APIRequestFactory()
+        # Officials see every row, which is the worst case for each endpoint
+        user = SimpleNamespace(id=athlete.auth_user_id, is_authenticated=True, is_sai_official=True)
+
+        failures = []
+        for name, view, url, budget in BUDGETS:
+            request = factory.get(url.format(athlete=athlete.id))
+            force_authenticate(request, user=user)
+            kwargs = {'pk': str(athlete.id)} if '{athlete}' in url else {}
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                response = view(request, **kwargs)
+                response.render()
+                elapsed = (time.perf_counter() - started) * 1000
+
+            ok = response.status_code == 200 and len(queries) <= budget
+            self.stdout.write(
+                f"{'ok  ' if ok else 'FAIL'} {name:<22} {len(queries):>4} queries "
+                f"(budget {budget})  {elapsed:7.1f} ms  HTTP {response.status_code}"
+            )
+            if not ok:
+                failures.append(name)
+        return failures
@@ -0,0 +1,168 @@
+# management/commands/check_query_plans.py
+import random
+import re
+import uuid
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Avg, Max
+from django.utils import timezone
+
+from sporty.models import AssessmentSession, AthleteProfile, FitnessTest, Leaderboard, TestRecording
+from sporty.rankings import partition_key
+
+# Tables big enough that a sequential scan on them is a regression
+HOT_TABLES = ['leaderboards', 'test_recordings', 'assessment_sessions', 'athlete_profiles']
+SEQ_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot view queries on a seeded dataset and fail on sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--athletes', type=int, default=20000)
+        parser.add_argument('--verbose-plans', action='store_true')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('check_query_plans needs PostgreSQL; other planners differ too much')
+
+        failures = []
+        try:
+            with transaction.atomic():
+                sample = self.seed(options['athletes'])
+                with connection.cursor() as cursor:
+                    for table in HOT_TABLES:
+                        cursor.execute(f'ANALYZE {table}')
+                failures = self.check(sample, options['verbose_plans'])
+                # Never keep the seeded rows
+                raise Rollback()
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"Sequential scans in: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS('No sequential scans on hot tables'))
+
+    def seed(self, count):
+        """Bulk-insert athletes with sessions, recordings and leaderboard rows"""
+        rng = random.Random(0)
+        tag = uuid.uuid4().hex[:8]
+        tests = [
+            FitnessTest.objects.create(name=f"qp_{tag}_{i}", display_name=f"Plan check {i}", description='',
+                                       instructions='', measurement_unit='reps')
+            for i in range(4)
+        ]
+        states = [f"State {i}" for i in range(30)]
+        now = timezone.now()
+
+        athletes = AthleteProfile.objects.bulk_create([
+            AthleteProfile(
+                auth_user_id=uuid.uuid4(), full_name=f"Athlete {i}", date_of_birth=date(2010, 1, 1),
+                age=rng.randint(10, 20), gender=rng.choice(['male', 'female']), height=160, weight=50,
+                phone_number='0', address='', state=rng.choice(states), district='District',
+                pin_code='000000', location_category='rural', aadhaar_number=f"{uuid.uuid4().int % 10 ** 12:012d}",
+                overall_talent_score=rng.randint(0, 100)
+            )
+            for i in range(count)
+        ], batch_size=2000)
+        sessions = AssessmentSession.objects.bulk_create([
+            AssessmentSession(athlete=athlete, status=rng.choice(['in_progress', 'completed']))
+            for athlete in athletes
+        ], batch_size=2000)
+
+        recordings, leaderboards = [], []
+        for athlete, session in zip(athletes, sessions):
+            for test in tests:
+                recordings.append(TestRecording(
+                    session=session, fitness_test=test, athlete=athlete, original_video_url='https://x/v.mp4',
+                    processing_status=rng.choice(['completed'] * 8 + ['uploaded', 'failed']),
+                    final_score=rng.randint(0, 100), percentile=rng.randint(0, 100),
+                    video_sha256=uuid.uuid4().hex * 2
+                ))
+                for leaderboard_type, key in (
+                    ('national', partition_key('national', test.id)),
+                    ('state', partition_key('state', test.id, athlete.state)),
+                ):
+                    leaderboards.append(Leaderboard(
+                        athlete=athlete, leaderboard_type=leaderboard_type, fitness_test=test, partition_key=key,
+                        current_rank=rng.randint(1, count), best_score=0,
+                        total_points=0, age_group='U16', gender=athlete.gender, state=athlete.state
+                    ))
+        TestRecording.objects.bulk_create(recordings, batch_size=5000)
+        Leaderboard.objects.bulk_create(leaderboards, batch_size=5000)
+
+        # Spread creation times over a year so "this week" is a small slice
+        for model in (AthleteProfile, AssessmentSession, TestRecording):
+            table = model._meta.db_table
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET created_at = %s - random() * interval '365 days'", [now]
+                )
+
+        athlete = athletes[count // 2]
+        return {
+            'athlete': athlete,
+            'session': sessions[count // 2],
+            'test': tests[0],
+            'state': athlete.state,
+            'sha256': recordings[0].video_sha256,
+            'week_ago': now - timedelta(days=7),
+        }
+
+    def queries(self, s):
+        """The querysets each hot view runs, as built in views.py, tasks.py and stats.py"""
+        athlete, test = s['athlete'], s['test']
+        return [
+            ('national_rankings', Leaderboard.objects.filter(
+                partition_key=partition_key('national', test.id)).order_by('current_rank', 'id')[:101]),
+            ('national_rankings age group', Leaderboard.objects.filter(
+                partition_key=partition_key('national', test.id), age_group='U16', gender='male'
+            ).order_by('current_rank', 'id')[:101]),
+            ('national_rankings all tests', Leaderboard.objects.filter(
+                leaderboard_type='national').order_by('current_rank', 'id')[:101]),
+            ('state_rankings', Leaderboard.objects.filter(
+                partition_key=partition_key('state', test.id, s['state'])).order_by('current_rank', 'id')[:51]),
+            ('state_rankings all tests', Leaderboard.objects.filter(
+                leaderboard_type='state', state=s['state']).order_by('current_rank', 'id')[:51]),
+            ('athlete_rankings', Leaderboard.objects.filter(athlete=athlete)),
+            ('recordings list', TestRecording.objects.order_by('-created_at', '-id')[:51]),
+            ('recordings list (athlete)', TestRecording.objects.filter(
+                athlete__auth_user_id=athlete.auth_user_id).order_by('-created_at', '-id')[:51]),
+            ('sessions list (athlete)', AssessmentSession.objects.filter(
+                athlete__auth_user_id=athlete.auth_user_id).order_by('-created_at', '-id')[:51]),
+            ('start_assessment', AssessmentSession.objects.filter(
+                athlete=athlete, status__in=['created', 'in_progress'])),
+            ('talent score', AssessmentSession.objects.filter(
+                athlete=athlete, status='completed').values('athlete').annotate(avg=Avg('overall_score'))),
+            ('upload_video existing', TestRecording.objects.filter(session=s['session'], fitness_test=test)),
+            ('upload_video dedup', TestRecording.objects.filter(
+                video_sha256=s['sha256'], fitness_test=test, processing_status='completed')),
+            ('session score', TestRecording.objects.filter(session=s['session'], processing_status='completed')),
+            ('best_performances', TestRecording.objects.filter(
+                athlete=athlete, processing_status='completed').order_by('-percentile')[:5]),
+            ('personal_best_scores', TestRecording.objects.filter(
+                athlete=athlete, processing_status='completed').values('fitness_test').annotate(
+                best_score=Max('final_score'))),
+            ('claim_uploaded_recordings', TestRecording.objects.filter(
+                processing_status='uploaded').order_by('created_at').values_list('id', flat=True)[:16]),
+            ('new athletes this week', AthleteProfile.objects.filter(created_at__gte=s['week_ago'])),
+        ]
+
+    def check(self, sample, verbose):
+        failures = []
+        for name, queryset in self.queries(sample):
+            plan = queryset.explain()
+            scans = sorted({table for table in SEQ_SCAN.findall(plan) if table in HOT_TABLES})
+            ok = not scans
+            self.stdout.write(f"{'ok  ' if ok else 'FAIL'} {name}" + (f"  seq scan on {', '.join(scans)}" if scans else ''))
+            if verbose or not ok:
+                self.stdout.write('      ' + plan.replace('\n', '\n      '))
+            if not ok:
+                failures.append(name)
+        return failures
@@ -0,0 +1,20 @@
+# management/commands/pipeline_throughput.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sporty.stage_metrics import stage_throughput
+
+
+class Command(BaseCommand):
+    help = 'Recordings per minute, failures and mean time of each analysis pipeline stage'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutes', type=int, default=settings.PIPELINE_METRICS_MINUTES)
+
+    def handle(self, *args, **options):
+        # Counters live in the cache; workers and this command must share it (REDIS_URL)
+        for stage, metrics in stage_throughput(options['minutes']).items():
+            mean = f"{metrics['mean_seconds']:.3f} s" if metrics['mean_seconds'] is not None else '-'
+            self.stdout.write(
+                f"{stage:<8} {metrics['per_minute']:>8.2f}/min  {metrics['failed']:>5} failed  mean {mean}"
+            )
@@ -0,0 +1,42 @@
+# management/commands/run_analysis_pool.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from sporty.analysis_pool import AnalysisPool
+from sporty.tasks import claim_uploaded_recordings
+
+
+class Command(BaseCommand):
+    help = 'Analyze uploaded recordings in a pool of warm, CPU-pinned worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.ANALYSIS_POOL_PROCESSES)
+        parser.add_argument('--max-jobs-per-process', type=int,
+                            default=settings.ANALYSIS_POOL_MAX_JOBS_PER_PROCESS)
+        parser.add_argument('--max-pending', type=int, default=settings.ANALYSIS_POOL_MAX_PENDING)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        pool = AnalysisPool(
+            options['processes'],
+            options['max_jobs_per_process'],
+            options['max_pending'],
+        )
+        self.stdout.write(f"Analysis pool started with {options['processes']} processes")
+
+        try:
+            while True:
+                # Claim only what the pool can take now; the rest stays 'uploaded' for other workers
+                claimed = claim_uploaded_recordings(pool.free_slots())
+                for recording_id in claimed:
+                    # Blocks while the pool is full (backpressure)
+                    pool.submit(recording_id)
+
+                if not claimed:
+                    time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Shutting down analysis pool')
+        finally:
+            pool.close()
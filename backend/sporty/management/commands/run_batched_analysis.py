@@ -0,0 +1,60 @@
+# management/commands/run_batched_analysis.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from sporty.ai_processor import VideoAnalyzer
+from sporty.landmark_cache import LandmarkCache
+from sporty.pose_batcher import BatchedPoseEstimator
+from sporty.tasks import analyze_recording, claim_uploaded_recordings
+
+
+class Command(BaseCommand):
+    help = 'Analyze several recordings concurrently with pose inference batched across them'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', default=settings.POSE_BATCH_MODEL_PATH)
+        parser.add_argument('--detector', default=settings.POSE_BATCH_DETECTOR_PATH)
+        parser.add_argument('--batch-size', type=int, default=settings.POSE_BATCH_SIZE)
+        parser.add_argument('--max-wait-ms', type=int, default=settings.POSE_BATCH_MAX_WAIT_MS)
+        parser.add_argument('--concurrency', type=int, default=settings.ANALYSIS_BATCH_CONCURRENCY)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+
+    def handle(self, *args, **options):
+        estimator = BatchedPoseEstimator(
+            options['model'],
+            options['detector'],
+            batch_size=options['batch_size'],
+            max_wait_ms=options['max_wait_ms'],
+        )
+        cache = LandmarkCache()
+        slots = threading.BoundedSemaphore(options['concurrency'])
+
+        def run(recording_id):
+            try:
+                # Decoding happens per recording; inference is shared through the estimator
+                analyze_recording(recording_id, VideoAnalyzer(cache=cache, estimator=estimator))
+            finally:
+                close_old_connections()
+                slots.release()
+
+        self.stdout.write(
+            f"Batched analysis started: {options['concurrency']} recordings, "
+            f"batch size {options['batch_size']}"
+        )
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            try:
+                while True:
+                    claimed = claim_uploaded_recordings(options['concurrency'])
+                    for recording_id in claimed:
+                        slots.acquire()
+                        executor.submit(run, recording_id)
+
+                    if not claimed:
+                        time.sleep(options['poll_interval'])
+            except KeyboardInterrupt:
+                self.stdout.write('Shutting down batched analysis')
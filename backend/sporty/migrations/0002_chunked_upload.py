@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:46
+
+import django.core.serializers.json
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChunkedUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255)),
+                ('total_size', models.BigIntegerField(help_text='Expected size in bytes')),
+                ('received_size', models.BigIntegerField(default=0, help_text="Bytes received so far; the next chunk's offset")),
+                ('upload_data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('in_progress', 'In Progress'), ('completed', 'Completed'), ('expired', 'Expired')], default='in_progress', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('fitness_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='sporty.fitnesstest')),
+                ('recording', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='sporty.testrecording')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='sporty.assessmentsession')),
+            ],
+            options={
+                'db_table': 'chunked_uploads',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0002_chunked_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testrecording',
+            name='video_sha256',
+            field=models.CharField(blank=True, db_index=True, help_text='Content hash for deduplicating re-uploads', max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0003_recording_video_sha256'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardPartition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('participants', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'leaderboard_partitions',
+            },
+        ),
+        migrations.AddField(
+            model_name='leaderboard',
+            name='partition_key',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='leaderboard',
+            unique_together={('partition_key', 'athlete')},
+        ),
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['partition_key', 'best_score'], name='leaderboard_partition_score'),
+        ),
+    ]
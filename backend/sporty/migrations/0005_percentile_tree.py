@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0004_leaderboard_partitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PercentileTreeNode',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('age_group', models.CharField(max_length=20)),
+                ('gender', models.CharField(max_length=10)),
+                ('node', models.IntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+                ('fitness_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='sporty.fitnesstest')),
+            ],
+            options={
+                'db_table': 'percentile_tree_nodes',
+                'unique_together': {('fitness_test', 'age_group', 'gender', 'node')},
+            },
+        ),
+    ]
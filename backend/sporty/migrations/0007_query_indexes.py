@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:00
+
+from django.db import connection, migrations, models
+
+if connection.vendor == 'postgresql':
+    # Build the indexes without blocking writes to these tables
+    from django.contrib.postgres.operations import AddIndexConcurrently as AddIndex
+else:
+    AddIndex = migrations.AddIndex
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('sporty', '0006_platform_stats'),
+    ]
+
+    operations = [
+        AddIndex(
+            model_name='assessmentsession',
+            index=models.Index(fields=['athlete', 'status'], name='session_athlete_status'),
+        ),
+        AddIndex(
+            model_name='assessmentsession',
+            index=models.Index(fields=['athlete', '-created_at', '-id'], name='session_athlete_recent'),
+        ),
+        AddIndex(
+            model_name='assessmentsession',
+            index=models.Index(fields=['-created_at', '-id'], name='session_recent'),
+        ),
+        AddIndex(
+            model_name='athleteprofile',
+            index=models.Index(fields=['created_at'], name='athlete_created'),
+        ),
+        AddIndex(
+            model_name='athleteprofile',
+            index=models.Index(fields=['state'], include=('overall_talent_score',), name='athlete_state_score'),
+        ),
+        AddIndex(
+            model_name='chunkedupload',
+            index=models.Index(condition=models.Q(('status', 'in_progress')), fields=['updated_at'], name='chunked_upload_stale'),
+        ),
+        AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['partition_key', 'current_rank', 'id'], name='leaderboard_partition_rank'),
+        ),
+        AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['leaderboard_type', 'current_rank', 'id'], name='leaderboard_type_rank'),
+        ),
+        AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['leaderboard_type', 'state', 'current_rank', 'id'], name='leaderboard_state_rank'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(fields=['athlete', 'processing_status'], name='recording_athlete_status'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(fields=['session', 'fitness_test'], name='recording_session_test'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(fields=['-created_at', '-id'], name='recording_recent'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(fields=['athlete', '-created_at', '-id'], name='recording_athlete_recent'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(condition=models.Q(('processing_status', 'completed')), fields=['athlete', '-percentile'], name='recording_done_percentile'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(condition=models.Q(('processing_status', 'completed')), fields=['athlete', 'fitness_test'], include=('final_score',), name='recording_done_best'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(condition=models.Q(('processing_status', 'completed')), fields=['session'], name='recording_done_session'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(condition=models.Q(('processing_status', 'completed')), fields=['video_sha256', 'fitness_test'], name='recording_done_sha256'),
+        ),
+        AddIndex(
+            model_name='testrecording',
+            index=models.Index(condition=models.Q(('processing_status', 'uploaded')), fields=['created_at'], name='recording_uploaded_queue'),
+        ),
+    ]
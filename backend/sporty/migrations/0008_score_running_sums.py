@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:03
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_sums(apps, schema_editor):
+    """Start the running sums from the rows already scored"""
+    AssessmentSession = apps.get_model('sporty', 'AssessmentSession')
+    AthleteProfile = apps.get_model('sporty', 'AthleteProfile')
+    TestRecording = apps.get_model('sporty', 'TestRecording')
+
+    per_session = (TestRecording.objects.filter(processing_status='completed')
+                   .values('session').annotate(count=Count('id'), points=Sum('points_earned'),
+                                               percentile=Sum('percentile')))
+    for row in per_session.iterator():
+        AssessmentSession.objects.filter(id=row['session']).update(
+            scored_tests=row['count'], points_total=row['points'] or 0, percentile_total=row['percentile'] or 0
+        )
+
+    per_athlete = (AssessmentSession.objects
+                   .filter(status__in=['completed', 'submitted_to_sai', 'verified_by_sai'],
+                           overall_score__isnull=False, athlete__isnull=False)
+                   .values('athlete').annotate(count=Count('id'), total=Sum('overall_score')))
+    for row in per_athlete.iterator():
+        AthleteProfile.objects.filter(id=row['athlete']).update(
+            scored_sessions=row['count'], session_score_total=row['total']
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0007_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentsession',
+            name='percentile_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=9),
+        ),
+        migrations.AddField(
+            model_name='assessmentsession',
+            name='points_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='assessmentsession',
+            name='scored_tests',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='athleteprofile',
+            name='scored_sessions',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='athleteprofile',
+            name='session_score_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_sums, migrations.RunPython.noop),
+    ]
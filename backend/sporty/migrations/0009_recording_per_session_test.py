@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:05
+
+import logging
+
+from django.db import migrations
+from django.db.models import Case, Count, IntegerField, Sum, Value, When
+
+
+def drop_duplicate_recordings(apps, schema_editor):
+    """Keep one recording of each test in a session, so the constraint can be added
+
+    A completed (scored) recording wins over any other; among equals the newest is kept.
+    """
+    AssessmentSession = apps.get_model('sporty', 'AssessmentSession')
+    TestRecording = apps.get_model('sporty', 'TestRecording')
+
+    duplicated = list(TestRecording.objects.values('session', 'fitness_test')
+                      .annotate(count=Count('id')).filter(count__gt=1))
+    for row in duplicated:
+        ranked = TestRecording.objects.filter(session=row['session'], fitness_test=row['fitness_test']).annotate(
+            scored=Case(When(processing_status='completed', then=Value(0)), default=Value(1),
+                        output_field=IntegerField())
+        ).order_by('scored', '-created_at', '-id')
+        (kept, _), *dropped = ranked.values_list('id', 'processing_status')
+        for recording_id, processing_status in dropped:
+            logging.warning(f"Dropping duplicate recording {recording_id} ({processing_status}) "
+                            f"of session {row['session']}, keeping {kept}")
+        TestRecording.objects.filter(id__in=[recording_id for recording_id, _ in dropped]).delete()
+
+    # The running sums (0008) counted the deleted rows
+    for session_id in {row['session'] for row in duplicated}:
+        totals = TestRecording.objects.filter(session=session_id, processing_status='completed').aggregate(
+            count=Count('id'), points=Sum('points_earned'), percentile=Sum('percentile')
+        )
+        AssessmentSession.objects.filter(id=session_id).update(
+            scored_tests=totals['count'], points_total=totals['points'] or 0,
+            percentile_total=totals['percentile'] or 0
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0008_score_running_sums'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_recordings, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='testrecording',
+            name='recording_session_test',
+        ),
+        migrations.AlterUniqueTogether(
+            name='testrecording',
+            unique_together={('session', 'fitness_test')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0009_recording_per_session_test'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testrecording',
+            name='dispatched_at',
+            field=models.DateTimeField(blank=True, help_text='When the scheduler started its analysis', null=True),
+        ),
+    ]
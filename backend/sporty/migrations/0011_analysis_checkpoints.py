@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:13
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0010_recording_dispatched_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalysisCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('stage', models.CharField(choices=[('fetch', 'Fetch'), ('pose', 'Pose'), ('scoring', 'Scoring'), ('ranking', 'Ranking')], max_length=20)),
+                ('data', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('landmarks', models.BinaryField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('recording', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='sporty.testrecording')),
+            ],
+            options={
+                'db_table': 'analysis_checkpoints',
+                'unique_together': {('recording', 'stage')},
+            },
+        ),
+    ]
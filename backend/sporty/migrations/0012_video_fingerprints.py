@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0011_analysis_checkpoints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VideoFingerprint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('keyframe_hashes', models.BinaryField()),
+                ('pose_signatures', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='video_fingerprints', to='sporty.athleteprofile')),
+                ('fitness_test', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='sporty.fitnesstest')),
+                ('recording', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='fingerprint', to='sporty.testrecording')),
+            ],
+            options={
+                'db_table': 'video_fingerprints',
+            },
+        ),
+        migrations.CreateModel(
+            name='FingerprintBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.SmallIntegerField()),
+                ('key', models.BigIntegerField()),
+                ('fingerprint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='buckets', to='sporty.videofingerprint')),
+            ],
+            options={
+                'db_table': 'fingerprint_buckets',
+                'indexes': [models.Index(fields=['band', 'key'], name='fingerprint_bucket_lookup')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0012_video_fingerprints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testrecording',
+            name='stage_updated_at',
+            field=models.DateTimeField(blank=True, help_text='When an analysis stage last started or finished', null=True),
+        ),
+    ]
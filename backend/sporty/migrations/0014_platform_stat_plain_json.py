@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0013_recording_stage_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='platformstat',
+            name='data',
+            field=models.JSONField(default=dict),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0014_platform_stat_plain_json'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='leaderboard',
+            name='total_participants',
+        ),
+        migrations.AddField(
+            model_name='leaderboard',
+            name='partition',
+            field=models.ForeignObject(from_fields=['partition_key'], null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', serialize=False, to='sporty.leaderboardpartition', to_fields=['key']),
+        ),
+    ]
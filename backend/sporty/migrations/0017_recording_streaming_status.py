@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 04:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sporty', '0016_chunked_upload_claims'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='testrecording',
+            name='processing_status',
+            field=models.CharField(choices=[('streaming', 'Extracting Poses'), ('uploaded', 'Uploaded'), ('analyzing', 'AI Analyzing'), ('cheat_checking', 'Cheat Detection'), ('completed', 'Analysis Complete'), ('failed', 'Analysis Failed'), ('flagged', 'Flagged for Review'), ('manually_verified', 'Manually Verified')], default='uploaded', max_length=20),
+        ),
+    ]
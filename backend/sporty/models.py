@@ -1,5 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.core.serializers.json import DjangoJSONEncoder
+from django.conf import settings
+import os
 import uuid
 
 class AthleteProfile(models.Model):
@@ -52,6 +55,11 @@ class AthleteProfile(models.Model):
     # Talent Score & Ranking
     overall_talent_score = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     talent_grade = models.CharField(max_length=5, null=True, blank=True)  # A+, A, B+, B, C
+    
+    # Running sums over completed sessions; overall_talent_score is their mean.
+    # Written only by F() updates in scores.py, so other writers pass update_fields
+    scored_sessions = models.IntegerField(default=0)
+    session_score_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     national_ranking = models.IntegerField(null=True, blank=True)
     state_ranking = models.IntegerField(null=True, blank=True)
     
@@ -65,6 +73,12 @@ class AthleteProfile(models.Model):
 
     class Meta:
         db_table = 'athlete_profiles'
+        indexes = [
+            # Weekly sign-ups in platform stats
+            models.Index(fields=['created_at'], name='athlete_created'),
+            # Top states in platform stats
+            models.Index(fields=['state'], include=['overall_talent_score'], name='athlete_state_score'),
+        ]
 
 class FitnessTest(models.Model):
     """Standard SAI Fitness Tests"""
@@ -153,6 +167,12 @@ class AssessmentSession(models.Model):
     overall_grade = models.CharField(max_length=5, null=True, blank=True)
     percentile_rank = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
     
+    # Running sums over completed recordings, kept current by the analysis task.
+    # Written only by F() updates in scores.py, so other writers pass update_fields
+    scored_tests = models.IntegerField(default=0)
+    points_total = models.IntegerField(default=0)
+    percentile_total = models.DecimalField(max_digits=9, decimal_places=2, default=0)
+    
     # SAI Submission
     sai_submission_id = models.CharField(max_length=100, null=True, blank=True)
     sai_officer_notes = models.TextField(null=True, blank=True)
@@ -168,9 +188,17 @@ class AssessmentSession(models.Model):
 
     class Meta:
         db_table = 'assessment_sessions'
+        indexes = [
+            # start_assessment, talent score and the athlete's session list
+            models.Index(fields=['athlete', 'status'], name='session_athlete_status'),
+            models.Index(fields=['athlete', '-created_at', '-id'], name='session_athlete_recent'),
+            # Keyset pages of the session list
+            models.Index(fields=['-created_at', '-id'], name='session_recent'),
+        ]
 
 class TestRecording(models.Model):
     PROCESSING_STATUS_CHOICES = [
+        ('streaming', 'Extracting Poses'),
         ('uploaded', 'Uploaded'),
         ('analyzing', 'AI Analyzing'),
         ('cheat_checking', 'Cheat Detection'),
@@ -191,6 +219,8 @@ class TestRecording(models.Model):
     thumbnail_url = models.URLField(null=True, blank=True)
     video_duration = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
     video_size_mb = models.DecimalField(max_digits=6, decimal_places=2, null=True, blank=True)
+    video_sha256 = models.CharField(max_length=64, null=True, blank=True, db_index=True,
+                                    help_text="Content hash for deduplicating re-uploads")
     
     # Device Analysis (On-device results)
     device_analysis_score = models.DecimalField(max_digits=10, decimal_places=3, null=True, blank=True)
@@ -224,10 +254,71 @@ class TestRecording(models.Model):
     retry_count = models.IntegerField(default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
+    dispatched_at = models.DateTimeField(null=True, blank=True, help_text="When the scheduler started its analysis")
+    stage_updated_at = models.DateTimeField(null=True, blank=True, help_text="When an analysis stage last started or finished")
     processed_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = 'test_recordings'
+        # One recording per test in a session; concurrent first uploads of a test make one row
+        unique_together = ['session', 'fitness_test']
+        indexes = [
+            models.Index(fields=['athlete', 'processing_status'], name='recording_athlete_status'),
+            # Keyset pages of the recording list, for officials and for one athlete
+            models.Index(fields=['-created_at', '-id'], name='recording_recent'),
+            models.Index(fields=['athlete', '-created_at', '-id'], name='recording_athlete_recent'),
+            # Completed recordings: best performances, personal bests, session scores, dedup
+            models.Index(fields=['athlete', '-percentile'], condition=models.Q(processing_status='completed'),
+                         name='recording_done_percentile'),
+            models.Index(fields=['athlete', 'fitness_test'], include=['final_score'],
+                         condition=models.Q(processing_status='completed'), name='recording_done_best'),
+            models.Index(fields=['session'], condition=models.Q(processing_status='completed'),
+                         name='recording_done_session'),
+            models.Index(fields=['video_sha256', 'fitness_test'], condition=models.Q(processing_status='completed'),
+                         name='recording_done_sha256'),
+            # Analysis workers claiming new uploads
+            models.Index(fields=['created_at'], condition=models.Q(processing_status='uploaded'),
+                         name='recording_uploaded_queue'),
+        ]
+
+class ChunkedUpload(models.Model):
+    """Resumable video upload, assembled on disk from sequential chunks"""
+    STATUS_CHOICES = [
+        ('in_progress', 'In Progress'),
+        ('finalizing', 'Finalizing'),
+        ('completed', 'Completed'),
+        ('expired', 'Expired')
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    session = models.ForeignKey(AssessmentSession, on_delete=models.CASCADE)
+    fitness_test = models.ForeignKey(FitnessTest, on_delete=models.CASCADE)
+    
+    file_name = models.CharField(max_length=255)
+    total_size = models.BigIntegerField(help_text="Expected size in bytes")
+    received_size = models.BigIntegerField(default=0, help_text="Bytes received so far; the next chunk's offset")
+    writer = models.UUIDField(null=True, blank=True, help_text="Claim held by the request writing the next chunk")
+    
+    # Device analysis fields sent at init, applied to the recording on finalize
+    upload_data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='in_progress')
+    recording = models.ForeignKey('TestRecording', on_delete=models.SET_NULL, null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'chunked_uploads'
+        indexes = [
+            # cleanup_chunked_uploads
+            models.Index(fields=['updated_at'], condition=models.Q(status='in_progress'),
+                         name='chunked_upload_stale'),
+        ]
+    
+    @property
+    def file_path(self):
+        return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{self.id}.part")
 
 class Leaderboard(models.Model):
     """Gamified leaderboards for athlete engagement"""
@@ -246,7 +337,6 @@ class Leaderboard(models.Model):
     # Ranking Info
     current_rank = models.IntegerField()
     previous_rank = models.IntegerField(null=True, blank=True)
-    total_participants = models.IntegerField()
     
     # Score Info
     best_score = models.DecimalField(max_digits=10, decimal_places=3)
@@ -258,10 +348,110 @@ class Leaderboard(models.Model):
     state = models.CharField(max_length=100, null=True, blank=True)
     district = models.CharField(max_length=100, null=True, blank=True)
     
+    # Ranking partition this row belongs to, see rankings.py
+    partition_key = models.CharField(max_length=255, null=True, blank=True)
+    # Joined on partition_key, no column of its own; the partition counts its participants
+    partition = models.ForeignObject(
+        'LeaderboardPartition', on_delete=models.DO_NOTHING, from_fields=['partition_key'], to_fields=['key'],
+        null=True, related_name='+', serialize=False
+    )
+    
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'leaderboards'
+        unique_together = ['partition_key', 'athlete']
+        indexes = [
+            models.Index(fields=['partition_key', 'best_score'], name='leaderboard_partition_score'),
+            # Rank pages; every rank change rewrites these, so keep them few.
+            # One partition: national_rankings and state_rankings for a test
+            models.Index(fields=['partition_key', 'current_rank', 'id'], name='leaderboard_partition_rank'),
+            # Across tests: national_rankings and state_rankings without one
+            models.Index(fields=['leaderboard_type', 'current_rank', 'id'], name='leaderboard_type_rank'),
+            models.Index(fields=['leaderboard_type', 'state', 'current_rank', 'id'],
+                         name='leaderboard_state_rank'),
+        ]
+
+class LeaderboardPartition(models.Model):
+    """One ranking partition; its row is locked while the partition's ranks change"""
+    key = models.CharField(max_length=255, unique=True)
+    participants = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'leaderboard_partitions'
+
+class PercentileTreeNode(models.Model):
+    """One node of a Fenwick tree over quantized scores, see percentiles.py"""
+    fitness_test = models.ForeignKey(FitnessTest, on_delete=models.CASCADE)
+    age_group = models.CharField(max_length=20)
+    gender = models.CharField(max_length=10)
+    node = models.IntegerField()
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'percentile_tree_nodes'
+        unique_together = ['fitness_test', 'age_group', 'gender', 'node']
+
+class AnalysisCheckpoint(models.Model):
+    """Output of a finished analysis stage, so a retried or redelivered task resumes after it
+
+    The scoring and ranking rows double as idempotency keys: a stage whose
+    row exists has already applied its side effects for the recording.
+    """
+    STAGE_CHOICES = [
+        ('fetch', 'Fetch'),
+        ('pose', 'Pose'),
+        ('scoring', 'Scoring'),
+        ('ranking', 'Ranking')
+    ]
+    
+    recording = models.ForeignKey(TestRecording, on_delete=models.CASCADE, related_name='checkpoints')
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES)
+    data = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    # Compressed landmark arrays from the pose stage; dropped once analysis finishes
+    landmarks = models.BinaryField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'analysis_checkpoints'
+        unique_together = ['recording', 'stage']
+
+class VideoFingerprint(models.Model):
+    """Perceptual fingerprint of an analyzed video, for near-duplicate search (fingerprints.py)"""
+    recording = models.OneToOneField(TestRecording, on_delete=models.CASCADE, related_name='fingerprint')
+    athlete = models.ForeignKey(AthleteProfile, on_delete=models.CASCADE, related_name='video_fingerprints')
+    fitness_test = models.ForeignKey(FitnessTest, on_delete=models.CASCADE)
+    # 64-bit difference hashes of evenly spaced keyframes, as big-endian bytes
+    keyframe_hashes = models.BinaryField()
+    # 64-bit SimHash of the motion around each keyframe, 0 where no pose was found
+    pose_signatures = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'video_fingerprints'
+
+class FingerprintBucket(models.Model):
+    """LSH bucket entry: one band of one keyframe hash"""
+    fingerprint = models.ForeignKey(VideoFingerprint, on_delete=models.CASCADE, related_name='buckets')
+    band = models.SmallIntegerField()
+    key = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'fingerprint_buckets'
+        indexes = [
+            models.Index(fields=['band', 'key'], name='fingerprint_bucket_lookup'),
+        ]
+
+class PlatformStat(models.Model):
+    """Precomputed platform_stats value: a counter, or JSON for aggregates"""
+    name = models.CharField(max_length=50, unique=True)
+    value = models.BigIntegerField(default=0)
+    data = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'platform_stats'
 
 class Badge(models.Model):
     """Achievement badges for gamification"""
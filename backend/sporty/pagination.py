@@ -0,0 +1,133 @@
+# pagination.py
+import base64
+import hashlib
+import json
+import operator
+from functools import reduce
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def cached_count(queryset):
+    """COUNT(*) of a queryset, cached for PAGINATION_COUNT_CACHE_SECONDS"""
+    key = 'sporty:count:' + hashlib.md5(str(queryset.order_by().query).encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_SECONDS)
+    return count
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only cursor pagination on a unique ordering
+
+    The cursor holds the ordering values of the last row served, and the
+    next page is the rows strictly after it. With an index on the ordering
+    columns every page costs the same as the first. Cursor values are read
+    back from the serialized rows, so the ordering fields must be part of
+    the serializer output. The total is a cached COUNT(*) and may lag by a
+    few seconds.
+    """
+
+    ordering = ('-created_at', '-id')
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.unpaginated = queryset
+        self.next_cursor = None
+
+        position = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+        # One extra row tells whether there is a next page
+        return queryset[:self.page_size + 1]
+
+    def get_total(self):
+        return cached_count(self.unpaginated)
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def after(self, position):
+        """Rows strictly after position in self.ordering"""
+        conditions, equal = [], {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            op = 'lt' if field.startswith('-') else 'gt'
+            conditions.append(Q(**equal, **{f"{name}__{op}": value}))
+            equal[name] = value
+
+        # Lets the index range scan start at the leading column
+        leading = self.ordering[0]
+        bound = Q(**{f"{leading.lstrip('-')}__{'lte' if leading.startswith('-') else 'gte'}": position[0]})
+        return bound & reduce(operator.or_, conditions)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (TypeError, ValueError):
+            raise NotFound('Invalid cursor')
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound('Invalid cursor')
+        return position
+
+    def encode_cursor(self, item):
+        position = [item[field.lstrip('-')] for field in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(position, default=str).encode()).decode()
+
+    def get_page(self, data):
+        """Trim the extra row and remember where the next page starts"""
+        data = list(data)
+        if len(data) > self.page_size:
+            data = data[:self.page_size]
+            self.next_cursor = self.encode_cursor(data[-1])
+        return data
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        data = self.get_page(data)
+        return Response({
+            'count': self.get_total(),
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'count': {'type': 'integer'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class RankPagination(KeysetPagination):
+    ordering = ('current_rank', 'id')
+    page_size = 100
@@ -0,0 +1,132 @@
+# percentiles.py
+import math
+from decimal import Decimal
+
+from django.db.models import F
+
+from .models import PercentileTreeNode
+from .rankings import LOWER_IS_BETTER, age_group_for
+
+# (lowest, highest, step) of the score grid per test; scores outside are clamped.
+# Override with ai_model_config['percentile'] = {'min': ..., 'max': ..., 'step': ...}
+SCORE_GRIDS = {
+    'vertical_jump': (0, 120, 0.5),        # cm
+    'situps': (0, 100, 1),                 # reps
+    'shuttle_run': (5, 40, 0.05),          # seconds
+    'endurance_run': (180, 1800, 1),       # seconds
+    'agility': (5, 40, 0.05),              # seconds
+    'flexibility': (-30, 60, 0.5),         # cm
+}
+DEFAULT_GRID = (0, 1000, 1)
+
+PERCENTILE_PLACES = Decimal('0.01')
+
+
+def grade_for_score(score):
+    """Letter grade for a 0-100 score"""
+    if score >= 90: return 'A+'
+    elif score >= 80: return 'A'
+    elif score >= 70: return 'B+'
+    elif score >= 60: return 'B'
+    elif score >= 50: return 'C+'
+    else: return 'C'
+
+
+class ScoreDistribution:
+    """Score distribution for one (fitness test, age group, gender)
+
+    Scores are quantized onto a fixed grid and counted in a Fenwick tree
+    whose nodes are database rows, ordered so that bucket 1 holds the worst
+    scores. Adding a score increments the O(log n) nodes covering its bucket
+    in one UPDATE, and a percentile reads the O(log n) nodes of two prefix
+    sums in one SELECT. Every worker process therefore sees the same counts,
+    with no COUNT(*) over recordings.
+    """
+
+    def __init__(self, fitness_test, age_group, gender):
+        self.fitness_test = fitness_test
+        self.age_group = age_group
+        self.gender = gender
+
+        grid = fitness_test.ai_model_config.get('percentile', {})
+        default_min, default_max, default_step = SCORE_GRIDS.get(fitness_test.name, DEFAULT_GRID)
+        self.min_score = float(grid.get('min', default_min))
+        self.max_score = float(grid.get('max', default_max))
+        self.step = float(grid.get('step', default_step))
+        self.size = int(round((self.max_score - self.min_score) / self.step)) + 1
+        self.lower_is_better = fitness_test.name in LOWER_IS_BETTER
+
+    @classmethod
+    def for_athlete(cls, fitness_test, athlete):
+        return cls(fitness_test, age_group_for(athlete.age), athlete.gender)
+
+    @property
+    def nodes(self):
+        return PercentileTreeNode.objects.filter(
+            fitness_test=self.fitness_test, age_group=self.age_group, gender=self.gender
+        )
+
+    def bucket(self, score):
+        """1-based bucket of a score, worst scores first"""
+        index = int(round((float(score) - self.min_score) / self.step))
+        index = min(max(index, 0), self.size - 1)
+        if self.lower_is_better:
+            index = self.size - 1 - index
+        return index + 1
+
+    @staticmethod
+    def _update_path(i, size):
+        while i <= size:
+            yield i
+            i += i & -i
+
+    @staticmethod
+    def _prefix_path(i):
+        while i > 0:
+            yield i
+            i -= i & -i
+
+    def add(self, score):
+        """Count one more score"""
+        path = list(self._update_path(self.bucket(score), self.size))
+        PercentileTreeNode.objects.bulk_create(
+            [PercentileTreeNode(fitness_test=self.fitness_test, age_group=self.age_group,
+                                gender=self.gender, node=node) for node in path],
+            ignore_conflicts=True
+        )
+        self.nodes.filter(node__in=path).update(count=F('count') + 1)
+
+    def percentile(self, score):
+        """Percent of counted scores below this one, with ties counted as half"""
+        bucket = self.bucket(score)
+        below_path = list(self._prefix_path(bucket - 1))
+        upto_path = list(self._prefix_path(bucket))
+        total_path = list(self._prefix_path(self.size))
+
+        counts = dict(self.nodes.filter(
+            node__in=set(below_path + upto_path + total_path)
+        ).values_list('node', 'count'))
+
+        total = sum(counts.get(node, 0) for node in total_path)
+        if not total:
+            return None
+        below = sum(counts.get(node, 0) for node in below_path)
+        ties = sum(counts.get(node, 0) for node in upto_path) - below
+        return 100.0 * (below + 0.5 * ties) / total
+
+
+def calculate_performance_grade(score, fitness_test, athlete, record=True):
+    """Grade and percentile of a score within the athlete's age group and gender
+
+    With record=True the score is then added to the distribution.
+    """
+    distribution = ScoreDistribution.for_athlete(fitness_test, athlete)
+    percentile = distribution.percentile(score)
+    if record:
+        distribution.add(score)
+
+    if percentile is None:
+        # First score in the group; nothing to compare against yet
+        percentile = 50.0
+    percentile = Decimal(str(percentile)).quantize(PERCENTILE_PLACES)
+    return grade_for_score(percentile), percentile
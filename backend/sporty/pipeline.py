@@ -0,0 +1,298 @@
+# pipeline.py
+import io
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .ai_processor import PoseSequence, SamplingPolicy, fetch_video
+from .benchmarks import benchmark_index, points_for
+from .cheat_detection import detect_cheating
+from .models import AnalysisCheckpoint, TestRecording
+from .percentiles import calculate_performance_grade
+from .rankings import LOWER_IS_BETTER, update_leaderboards
+from .stage_metrics import measured
+from .status_channel import publish_status
+from . import fingerprints, scores, stats
+
+
+def fail(recording_id, error):
+    """Mark a recording failed after one of its stages raised"""
+    logging.error(f"Failed to process recording {recording_id}: {error}")
+    recording = TestRecording.objects.filter(id=recording_id).first()
+    if recording is None:
+        return
+    recording.processing_status = 'failed'
+    recording.processing_error = str(error)
+    recording.save(update_fields=['processing_status', 'processing_error'])
+    publish_status(recording)
+
+
+def heartbeat(recording_id):
+    """Stamp the recording as making progress, so requeue_stalled leaves it alone"""
+    TestRecording.objects.filter(id=recording_id).update(stage_updated_at=timezone.now())
+
+
+@contextmanager
+def beating(recording_id):
+    """Stamp the heartbeat every ANALYSIS_HEARTBEAT_SECONDS while the block runs"""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(settings.ANALYSIS_HEARTBEAT_SECONDS):
+            try:
+                heartbeat(recording_id)
+            except DatabaseError as e:
+                logging.warning(f"Heartbeat for recording {recording_id} failed: {e}")
+        connection.close()
+
+    thread = threading.Thread(target=beat, name='analysis-heartbeat', daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_stage(stage, recording_id, function, *args):
+    """Run and time one stage; a failure marks the recording failed and returns None
+
+    A long pose pass keeps its heartbeat going, so requeue_stalled never
+    takes back a recording that is still being analyzed.
+    """
+    heartbeat(recording_id)
+    try:
+        with measured(stage), beating(recording_id):
+            return function(recording_id, *args)
+    except Exception as e:
+        fail(recording_id, e)
+        return None
+    finally:
+        heartbeat(recording_id)
+
+
+def _policy(recording):
+    return SamplingPolicy.for_test(recording.fitness_test.name, recording.fitness_test.ai_model_config)
+
+
+def completed_stages(recording_id):
+    """Stages the recording has a checkpoint for"""
+    return set(AnalysisCheckpoint.objects.filter(recording_id=recording_id).values_list('stage', flat=True))
+
+
+def _save_checkpoint(recording_id, stage, data, landmarks=None):
+    AnalysisCheckpoint.objects.update_or_create(
+        recording_id=recording_id, stage=stage, defaults={'data': data, 'landmarks': landmarks}
+    )
+
+
+def _pack(sequence):
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **sequence.to_arrays())
+    return buffer.getvalue()
+
+
+def _unpack(landmarks):
+    with np.load(io.BytesIO(landmarks)) as data:
+        return PoseSequence.from_arrays({name: data[name] for name in data.files})
+
+
+def check_integrity(recording, sequence):
+    """Cheat detection and duplicate search on the landmarks being scored; fills the recording's cheat fields"""
+    if not recording.fitness_test.cheat_detection_enabled:
+        return
+    # Conditional, so a duplicate delivery cannot take back a completed status
+    if TestRecording.objects.filter(id=recording.id, processing_status='analyzing').update(
+        processing_status='cheat_checking'
+    ):
+        recording.processing_status = 'cheat_checking'
+        publish_status(recording)
+
+    if sequence is None:
+        # Reused analysis: the video, and so the verdict, is the original recording's
+        source = TestRecording.objects.filter(id=recording.ai_analysis_data['reused_from']).first()
+        if source is not None:
+            recording.cheat_detection_score = source.cheat_detection_score
+            recording.cheat_flags = source.cheat_flags
+            recording.is_suspicious = source.is_suspicious
+        return
+
+    report = detect_cheating(
+        sequence, recording.fitness_test.ai_model_config,
+        extra_flags=fingerprints.find_duplicates(recording, sequence)
+    )
+    recording.cheat_detection_score = Decimal(str(report['score']))
+    recording.cheat_flags = report['flags']
+    recording.is_suspicious = report['is_suspicious']
+
+
+def fetch(recording_id, analyzer, content_hash=None):
+    """I/O stage: mark the recording analyzing and download the video if pose must run
+
+    Returns (video_path, content_hash, is_temporary). video_path is None when
+    the pose stage can be skipped: the analysis is reused from a duplicate
+    upload, or landmarks are checkpointed or cached from a streaming upload
+    or an earlier attempt.
+    """
+    recording = TestRecording.objects.select_related('fitness_test').get(id=recording_id)
+    recording.processing_status = 'analyzing'
+    recording.save(update_fields=['processing_status'])
+    publish_status(recording)
+
+    if (recording.ai_analysis_data or {}).get('reused_from'):
+        return None, None, False
+
+    checkpoints = {
+        checkpoint.stage: checkpoint.data for checkpoint in AnalysisCheckpoint.objects.filter(
+            recording_id=recording_id, stage__in=['fetch', 'pose']
+        ).defer('landmarks')
+    }
+    if 'pose' in checkpoints:
+        return None, checkpoints['pose']['content_hash'], False
+
+    content_hash = content_hash or recording.video_sha256
+    if content_hash and analyzer.cached_landmarks(content_hash, _policy(recording)) is not None:
+        return None, content_hash, False
+
+    fetched = checkpoints.get('fetch')
+    if fetched and os.path.exists(fetched['video_path']):
+        # Downloaded by an attempt that died before pose finished
+        return fetched['video_path'], fetched['content_hash'], fetched['is_temporary']
+
+    video_path, content_hash, is_temporary = fetch_video(
+        recording.original_video_url, settings.ANALYSIS_SCRATCH_DIR
+    )
+    _save_checkpoint(recording_id, 'fetch', {
+        'video_path': video_path, 'content_hash': content_hash, 'is_temporary': is_temporary
+    })
+    return video_path, content_hash, is_temporary
+
+
+def pose(recording_id, analyzer, video_path, content_hash, is_temporary):
+    """CPU stage: decode and run pose estimation once
+
+    The landmarks are checkpointed in the database as well as cached on
+    local disk, so a retry on another node does not decode the video again.
+    """
+    recording = TestRecording.objects.select_related('fitness_test').get(id=recording_id)
+    checkpoint = AnalysisCheckpoint.objects.filter(recording_id=recording_id, stage='pose').first()
+    if checkpoint is not None:
+        sequence = _unpack(checkpoint.landmarks)
+    else:
+        try:
+            sequence = analyzer.extract_landmarks(video_path, content_hash, _policy(recording))
+        finally:
+            if is_temporary and os.path.exists(video_path):
+                os.remove(video_path)
+        _save_checkpoint(recording_id, 'pose', {'content_hash': content_hash}, landmarks=_pack(sequence))
+    return sequence
+
+
+def score(recording_id, analyzer, content_hash=None, sequence=None):
+    """Scoring stage: run the test's analyzer on the landmarks and grade the result
+
+    Grading, the recording's save and the session sums commit together with
+    the scoring checkpoint, so duplicate deliveries score a recording once.
+    """
+    recording = TestRecording.objects.select_related('fitness_test', 'athlete').get(id=recording_id)
+    if AnalysisCheckpoint.objects.filter(recording_id=recording_id, stage='scoring').exists():
+        return recording
+    test_name = recording.fitness_test.name
+
+    if (recording.ai_analysis_data or {}).get('reused_from'):
+        # Identical video was already analyzed for this test (see upload dedup)
+        results = {
+            'score': recording.ai_raw_score,
+            'confidence': recording.ai_confidence,
+            'analysis_data': recording.ai_analysis_data
+        }
+    else:
+        if sequence is None:
+            sequence = analyzer.cached_landmarks(content_hash or recording.video_sha256, _policy(recording))
+        if sequence is None:
+            checkpoint = AnalysisCheckpoint.objects.filter(recording_id=recording_id, stage='pose').first()
+            if checkpoint is None:
+                raise RuntimeError('No landmarks to score; the pose stage has not run')
+            sequence = _unpack(checkpoint.landmarks)
+        results = analyzer.run_analyzer(test_name, sequence)
+
+    check_integrity(recording, sequence)
+
+    # Update recording with results
+    recording.ai_raw_score = results['score']
+    recording.ai_confidence = results['confidence']
+    recording.ai_analysis_data = results['analysis_data']
+    recording.processing_status = 'completed'
+    recording.final_score = recording.ai_raw_score
+
+    # A re-analysis must not count the recording or its score twice
+    first_completion = recording.percentile is None
+    previous = None if first_completion else (recording.points_earned, recording.percentile)
+
+    benchmark = benchmark_index.lookup(
+        recording.fitness_test_id, recording.athlete.age, recording.athlete.gender
+    )
+    if benchmark:
+        recording.points_earned = points_for(
+            benchmark, Decimal(str(recording.final_score)), test_name in LOWER_IS_BETTER
+        )
+
+    with transaction.atomic():
+        # Idempotency key; a concurrent duplicate waits here, then finds the row
+        _, created = AnalysisCheckpoint.objects.get_or_create(
+            recording_id=recording_id, stage='scoring', defaults={'data': {'score': recording.final_score}}
+        )
+        if not created:
+            return TestRecording.objects.get(id=recording_id)
+
+        # Calculate grade and percentile
+        recording.performance_grade, recording.percentile = calculate_performance_grade(
+            recording.ai_raw_score,
+            recording.fitness_test,
+            recording.athlete,
+            record=first_completion
+        )
+        recording.save()
+        if sequence is not None:
+            fingerprints.index_recording(recording, sequence)
+        scores.add_recording_score(recording, previous)
+        if first_completion:
+            stats.increment('total_videos_analyzed')
+
+    publish_status(recording)
+    return recording
+
+
+def restore_scored(recording_id):
+    """Put back the completed status of a scored recording that was claimed again; True if it changed"""
+    recording = TestRecording.objects.filter(id=recording_id).first()
+    if recording is None or not TestRecording.objects.filter(
+        id=recording_id, processing_status__in=['uploaded', 'analyzing', 'cheat_checking']
+    ).update(processing_status='completed'):
+        return False
+    recording.processing_status = 'completed'
+    publish_status(recording)
+    return True
+
+
+def rank(recording_id):
+    """DB stage: session and talent scores, then leaderboards"""
+    if AnalysisCheckpoint.objects.filter(recording_id=recording_id, stage='ranking').exists():
+        return
+    recording = TestRecording.objects.select_related('fitness_test', 'athlete').get(id=recording_id)
+    # A no-op until the session is finished
+    scores.refresh_session_score(recording.session_id)
+    # Safe to repeat: an equal score is not a new personal best
+    update_leaderboards(recording)
+
+    with transaction.atomic():
+        AnalysisCheckpoint.objects.get_or_create(recording_id=recording_id, stage='ranking')
+        # Analysis is finished; only the idempotency keys are worth keeping
+        AnalysisCheckpoint.objects.filter(recording_id=recording_id, stage__in=['fetch', 'pose']).delete()
@@ -0,0 +1,234 @@
+# pose_batcher.py
+import hashlib
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+from tensorflow.lite import Interpreter
+
+from .ai_processor import LANDMARK_DIMS, MISSING_POSE, NUM_LANDMARKS
+
+# BlazePose landmark models emit 39 points (33 body + 6 auxiliary) x 5 values:
+# x, y, z in input pixels, then visibility and presence logits
+MODEL_POINTS = 39
+MODEL_VALUES = 5
+
+# BlazePose detector: an SSD whose anchors sit on these feature map strides,
+# each regressing a box and 4 keypoints (mid-hip first, then a point whose
+# offset from the hips gives the body's size and rotation)
+DETECTOR_STRIDES = [8, 16, 32, 32, 32]
+DETECTOR_COORDS = 12
+# The landmark model expects the detector's body circle, upright and 1.25x as wide
+ROI_SCALE = 1.25
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def _load(model_path, batch_size, num_threads):
+    """Interpreter with its batch dimension resized; returns it, its input index and (height, width)"""
+    interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+    input_details = interpreter.get_input_details()[0]
+    height, width = input_details['shape'][1:3]
+    # Enable the batch dimension; the models are exported with batch 1
+    interpreter.resize_tensor_input(input_details['index'], [batch_size, height, width, 3])
+    interpreter.allocate_tensors()
+    return interpreter, input_details['index'], (int(height), int(width))
+
+
+def _ssd_anchors(input_size, strides):
+    """Normalised (x, y) anchor centres in the detector's output order"""
+    anchors = []
+    layer = 0
+    while layer < len(strides):
+        # Consecutive layers with one stride share a feature map, two anchors per layer per cell
+        last = layer
+        while last < len(strides) and strides[last] == strides[layer]:
+            last += 1
+        cells = int(np.ceil(input_size / strides[layer]))
+        y, x = np.mgrid[0:cells, 0:cells]
+        centres = (np.stack([x.ravel(), y.ravel()], axis=1) + 0.5) / cells
+        anchors.append(np.repeat(centres, 2 * (last - layer), axis=0))
+        layer = last
+    return np.concatenate(anchors).astype(np.float32)
+
+
+class BatchedPoseEstimator:
+    """Runs the BlazePose detector and landmark TFLite models over frames pooled from many recordings
+
+    Any number of threads can submit() frames; a scheduler thread packs them
+    into fixed-size batches, runs the detector over the batch, crops each
+    detected body upright around the hips and runs the landmark model over
+    the crops, resolving each frame's Future with a (33, 4) landmark array.
+    A partial batch is flushed after max_wait_ms so a lone recording is never
+    stalled.
+    """
+
+    def __init__(self, model_path, detector_path, batch_size=16, max_wait_ms=10, num_threads=None,
+                 detection_threshold=0.5, presence_threshold=0.5):
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.detection_threshold = detection_threshold
+        self.presence_threshold = presence_threshold
+
+        digest = hashlib.sha256()
+        for path in (detector_path, model_path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+        self.model_version = f"tflite-{digest.hexdigest()[:16]}-b{batch_size}"
+
+        self.detector, self.detector_input, (self.detector_size, _) = _load(
+            detector_path, batch_size, num_threads
+        )
+        self.regressor_index, self.score_index = self._find_detector_outputs()
+        self.anchors = _ssd_anchors(self.detector_size, DETECTOR_STRIDES)
+
+        self.interpreter, self.input_index, (self.input_height, self.input_width) = _load(
+            model_path, batch_size, num_threads
+        )
+        self.landmark_index, self.presence_index = self._find_outputs()
+
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='pose-batcher', daemon=True)
+        self._thread.start()
+
+    def _find_detector_outputs(self):
+        regressor_index = score_index = None
+        for detail in self.detector.get_output_details():
+            if detail['shape'][-1] == DETECTOR_COORDS:
+                regressor_index = detail['index']
+            elif detail['shape'][-1] == 1:
+                score_index = detail['index']
+        if regressor_index is None or score_index is None:
+            raise ValueError('TFLite model has no BlazePose detector outputs')
+        return regressor_index, score_index
+
+    def _find_outputs(self):
+        landmark_index = presence_index = None
+        for detail in self.interpreter.get_output_details():
+            size = int(np.prod(detail['shape'][1:]))
+            if size == MODEL_POINTS * MODEL_VALUES:
+                landmark_index = detail['index']
+            elif size == 1 and presence_index is None:
+                presence_index = detail['index']
+        if landmark_index is None:
+            raise ValueError('TFLite model has no BlazePose landmark output')
+        return landmark_index, presence_index
+
+    def submit(self, frame_rgb):
+        """Queue an RGB frame; returns a Future for its landmarks"""
+        tensor, letterbox = self._preprocess(frame_rgb)
+        future = Future()
+        self._queue.put((frame_rgb, tensor, letterbox, future))
+        return future
+
+    def _preprocess(self, frame_rgb):
+        """Letterbox the frame into the detector input, keeping the aspect ratio"""
+        height, width = frame_rgb.shape[:2]
+        scale = min(self.detector_size / width, self.detector_size / height)
+        scaled_w, scaled_h = int(round(width * scale)), int(round(height * scale))
+        pad_x = (self.detector_size - scaled_w) // 2
+        pad_y = (self.detector_size - scaled_h) // 2
+
+        tensor = np.full((self.detector_size, self.detector_size, 3), -1.0, dtype=np.float32)
+        resized = cv2.resize(frame_rgb, (scaled_w, scaled_h), interpolation=cv2.INTER_AREA)
+        tensor[pad_y:pad_y + scaled_h, pad_x:pad_x + scaled_w] = resized / 127.5 - 1.0
+        return tensor, (pad_x, pad_y, scale)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                results = self._infer(batch)
+            except Exception as e:
+                logging.error(f"Batched pose inference failed: {e}")
+                for *_, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (*_, future), landmarks in zip(batch, results):
+                future.set_result(landmarks)
+
+    def _detect(self, batch):
+        """Per frame, the affine map from landmark-input pixels to frame pixels, None without a person"""
+        inputs = np.zeros((self.batch_size, self.detector_size, self.detector_size, 3), dtype=np.float32)
+        inputs[:len(batch)] = [tensor for _, tensor, _, _ in batch]
+        self.detector.set_tensor(self.detector_input, inputs)
+        self.detector.invoke()
+
+        regressors = self.detector.get_tensor(self.regressor_index)[:len(batch)]
+        scores = self.detector.get_tensor(self.score_index)[:len(batch)].reshape(len(batch), -1)
+        # One athlete per recording: the most confident detection is the one tracked
+        best = scores.argmax(axis=1)
+
+        rois = []
+        for i, (_, _, (pad_x, pad_y, scale), _) in enumerate(batch):
+            if _sigmoid(np.clip(scores[i, best[i]], -100, 100)) < self.detection_threshold:
+                rois.append(None)
+                continue
+            keypoints = regressors[i, best[i], 4:8].reshape(2, 2) + self.anchors[best[i]] * self.detector_size
+            hips, top = (keypoints - (pad_x, pad_y)) / scale
+            rois.append(self._roi(hips, top))
+        return rois
+
+    def _roi(self, hips, top):
+        """Affine map for a square crop centred on the hips, rotated so the body stands upright"""
+        dx, dy = top - hips
+        size = 2 * np.hypot(dx, dy) * ROI_SCALE
+        rotation = np.pi / 2 - np.arctan2(-dy, dx)
+        cos, sin = np.cos(rotation), np.sin(rotation)
+        linear = np.array([[cos, -sin], [sin, cos]]) * (size / self.input_width, size / self.input_height)
+        offset = hips - linear @ (self.input_width / 2, self.input_height / 2)
+        return np.hstack([linear, offset[:, None]])
+
+    def _infer(self, batch):
+        rois = self._detect(batch)
+        found = [i for i, roi in enumerate(rois) if roi is not None]
+        landmarks = np.repeat(MISSING_POSE[None], len(batch), axis=0)
+        if not found:
+            return landmarks
+
+        inputs = np.zeros((self.batch_size, self.input_height, self.input_width, 3), dtype=np.float32)
+        for slot, i in enumerate(found):
+            inputs[slot] = cv2.warpAffine(
+                batch[i][0], rois[i], (self.input_width, self.input_height),
+                flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_CONSTANT
+            ) / 255.0
+
+        self.interpreter.set_tensor(self.input_index, inputs)
+        self.interpreter.invoke()
+
+        raw = self.interpreter.get_tensor(self.landmark_index)[:len(found)]
+        raw = raw.reshape(len(found), MODEL_POINTS, MODEL_VALUES)[:, :NUM_LANDMARKS]
+        if self.presence_index is not None:
+            presence = self.interpreter.get_tensor(self.presence_index)[:len(found)].reshape(-1)
+        else:
+            presence = np.ones(len(found), dtype=np.float32)
+
+        # Crop pixels -> frame pixels through each ROI, then normalised to the frame
+        for slot, i in enumerate(found):
+            if presence[slot] < self.presence_threshold:
+                continue
+            height, width = batch[i][0].shape[:2]
+            roi = rois[i]
+            points = raw[slot, :, :2] @ roi[:, :2].T + roi[:, 2]
+            landmarks[i, :, 0] = points[:, 0] / width
+            landmarks[i, :, 1] = points[:, 1] / height
+            landmarks[i, :, 2] = raw[slot, :, 2] * np.hypot(*roi[:, 0]) / width
+            landmarks[i, :, 3] = _sigmoid(raw[slot, :, 3])
+        return landmarks
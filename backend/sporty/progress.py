@@ -0,0 +1,36 @@
+# progress.py
+from django.db import connection
+from django.utils import timezone
+
+from .models import AssessmentSession
+
+
+def count_uploaded_test(session_id):
+    """Count a newly uploaded test towards its session
+
+    One UPDATE ... RETURNING bumps completed_tests in the database, so
+    parallel uploads from one device never lose an increment and no row
+    lock outlives the statement. The upload that fills the session then
+    claims its completion with a conditional UPDATE, which succeeds for
+    exactly one caller.
+
+    Returns (completed_tests, total_tests, completed_now).
+    """
+    session_id = AssessmentSession._meta.pk.get_db_prep_value(session_id, connection)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {AssessmentSession._meta.db_table} "
+            "SET completed_tests = completed_tests + 1, "
+            "status = CASE WHEN status = 'created' THEN 'in_progress' ELSE status END "
+            "WHERE id = %s RETURNING completed_tests, total_tests",
+            [session_id]
+        )
+        row = cursor.fetchone()
+    if row is None:
+        raise AssessmentSession.DoesNotExist()
+
+    completed_tests, total_tests = row
+    completed_now = completed_tests >= total_tests and AssessmentSession.objects.filter(
+        id=session_id, status__in=['created', 'in_progress']
+    ).update(status='completed', completed_at=timezone.now()) == 1
+    return completed_tests, total_tests, completed_now
@@ -0,0 +1,100 @@
+# query_planning.py
+from collections import namedtuple
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+QueryPlan = namedtuple('QueryPlan', ['select_related', 'prefetch_related', 'only'])
+
+
+def _concrete_field_names(model):
+    return [field.name for field in model._meta.concrete_fields]
+
+
+def _collect(serializer, model, prefix, plan):
+    """Walk a serializer's fields, recording the relations it dereferences"""
+    for field in serializer.fields.values():
+        if field.source == '*':
+            continue
+
+        if isinstance(field, serializers.ListSerializer):
+            nested = field.child
+        elif isinstance(field, serializers.BaseSerializer):
+            nested = field
+        else:
+            nested = None
+
+        parts = field.source.split('.')
+        relations = parts if nested is not None else parts[:-1]
+        if not relations:
+            continue
+
+        # Follow the relation chain as far as it goes through real model fields
+        current, path, many = model, [], False
+        for name in relations:
+            try:
+                model_field = current._meta.get_field(name)
+            except FieldDoesNotExist:
+                break
+            if not model_field.is_relation:
+                break
+            path.append(name)
+            many = many or model_field.one_to_many or model_field.many_to_many
+            current = model_field.related_model
+        else:
+            lookup = '__'.join(prefix + path)
+            if many:
+                plan['prefetch_related'].add(lookup)
+            else:
+                plan['select_related'].add(lookup)
+                if nested is not None:
+                    plan['only'].update(f"{lookup}__{name}" for name in _concrete_field_names(current))
+                    _collect(nested, current, prefix + path, plan)
+                else:
+                    plan['only'].add(f"{lookup}__{parts[-1]}")
+
+
+@lru_cache(maxsize=None)
+def query_plan(serializer_class):
+    """The select_related / prefetch_related / only() a serializer class needs
+
+    Dotted sources ('athlete.full_name') and nested serializers are resolved
+    against the model. Forward relations are joined and restricted to the
+    columns that are read. Reverse and many-to-many relations are prefetched.
+    The serializer's own model keeps every column, since method fields may
+    read any of them.
+    """
+    model = serializer_class.Meta.model
+    plan = {'select_related': set(), 'prefetch_related': set(), 'only': set()}
+    _collect(serializer_class(), model, [], plan)
+
+    only = []
+    if plan['only']:
+        only = _concrete_field_names(model) + sorted(plan['only'])
+    return QueryPlan(sorted(plan['select_related']), sorted(plan['prefetch_related']), only)
+
+
+def plan_queryset(queryset, serializer_class):
+    """Apply the serializer's query plan to a queryset"""
+    plan = query_plan(serializer_class)
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+    if plan.prefetch_related:
+        queryset = queryset.prefetch_related(*plan.prefetch_related)
+    if plan.only:
+        queryset = queryset.only(*plan.only)
+    return queryset
+
+
+class QueryPlanningMixin:
+    """Plans list/retrieve querysets for the viewset's serializer class
+
+    Hooks filter_queryset() so it applies even when a viewset overrides
+    get_queryset(). Custom actions that build their own queryset call
+    plan_queryset() directly.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return plan_queryset(queryset, self.get_serializer_class())
@@ -0,0 +1,150 @@
+# rankings.py
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Leaderboard, LeaderboardPartition
+
+# Timed tests, where a smaller score ranks higher
+LOWER_IS_BETTER = {'shuttle_run', 'endurance_run', 'agility'}
+
+# (min age, max age, label), both ends inclusive
+AGE_GROUPS = [
+    (0, 11, 'U12'),
+    (12, 13, 'U14'),
+    (14, 15, 'U16'),
+    (16, 17, 'U18'),
+    (18, 200, 'open'),
+]
+
+SCORE_PLACES = Decimal('0.001')
+
+
+def age_group_for(age):
+    for age_min, age_max, label in AGE_GROUPS:
+        if age_min <= age <= age_max:
+            return label
+    return None
+
+
+def partition_key(leaderboard_type, fitness_test_id, *parts):
+    return ':'.join([leaderboard_type, str(fitness_test_id), *map(str, parts)])
+
+
+def partitions_for(athlete, fitness_test):
+    """(leaderboard_type, partition_key) of every ranking a result counts towards"""
+    test = fitness_test.id
+    age_group = age_group_for(athlete.age)
+    return [
+        ('national', partition_key('national', test)),
+        ('state', partition_key('state', test, athlete.state)),
+        ('district', partition_key('district', test, athlete.state, athlete.district)),
+        ('age_group', partition_key('age_group', test, age_group, athlete.gender)),
+    ]
+
+
+def partition_participants(key):
+    """Athletes ranked in a partition, read from its counter row"""
+    return LeaderboardPartition.objects.filter(key=key).values_list(
+        'participants', flat=True
+    ).first() or 0
+
+
+class PartitionRanking:
+    """Competition ranks (1 + number of strictly better scores) in one partition
+
+    Ranks are stored on the leaderboard rows, so the rank a score would take
+    comes from its nearest better neighbour on the (partition_key, best_score)
+    index instead of counting or sorting the partition. When a score improves,
+    only the rows it overtakes move down a place.
+    """
+
+    def __init__(self, key, lower_is_better=False):
+        self.key = key
+        self.lower_is_better = lower_is_better
+        self.rows = Leaderboard.objects.filter(partition_key=key)
+
+    def is_better(self, score, other):
+        return score < other if self.lower_is_better else score > other
+
+    def better_than(self, score):
+        lookup = 'best_score__lt' if self.lower_is_better else 'best_score__gt'
+        return self.rows.filter(**{lookup: score})
+
+    def worse_than(self, score):
+        lookup = 'best_score__gt' if self.lower_is_better else 'best_score__lt'
+        return self.rows.filter(**{lookup: score})
+
+    def rank_of(self, score):
+        """Rank a score would take in the partition"""
+        nearest_first = '-best_score' if self.lower_is_better else 'best_score'
+        neighbour = self.better_than(score).order_by(nearest_first).values(
+            'best_score', 'current_rank'
+        ).first()
+        if neighbour is None:
+            return 1
+        ties = self.rows.filter(best_score=neighbour['best_score']).count()
+        return neighbour['current_rank'] + ties
+
+    def overtake(self, athlete, score, old_score):
+        """Move down the rows that athlete passes by improving from old_score to score"""
+        overtaken = self.worse_than(score).exclude(athlete=athlete)
+        if old_score is not None:
+            # Rows already behind the old score keep their rank
+            lookup = 'best_score__lte' if self.lower_is_better else 'best_score__gte'
+            overtaken = overtaken.filter(**{lookup: old_score})
+        return overtaken.update(
+            previous_rank=F('current_rank'),
+            current_rank=F('current_rank') + 1
+        )
+
+
+def update_leaderboards(recording):
+    """Fold a scored recording into every leaderboard it counts towards"""
+    if recording.final_score is None:
+        return
+
+    athlete = recording.athlete
+    fitness_test = recording.fitness_test
+    score = Decimal(str(recording.final_score)).quantize(SCORE_PLACES)
+    lower_is_better = fitness_test.name in LOWER_IS_BETTER
+
+    for leaderboard_type, key in partitions_for(athlete, fitness_test):
+        LeaderboardPartition.objects.get_or_create(key=key)
+        with transaction.atomic():
+            # Serializes rank changes within the partition
+            partition = LeaderboardPartition.objects.select_for_update().get(key=key)
+            ranking = PartitionRanking(key, lower_is_better)
+
+            entry = ranking.rows.filter(athlete=athlete).first()
+            if entry and not ranking.is_better(score, entry.best_score):
+                # Not a new personal best; ranks are unchanged
+                if entry.total_points != athlete.total_points:
+                    entry.total_points = athlete.total_points
+                    entry.save(update_fields=['total_points', 'updated_at'])
+                continue
+
+            if entry is None:
+                partition.participants += 1
+                partition.save(update_fields=['participants', 'updated_at'])
+
+            rank = ranking.rank_of(score)
+            ranking.overtake(athlete, score, entry.best_score if entry else None)
+
+            Leaderboard.objects.update_or_create(
+                athlete=athlete,
+                partition_key=key,
+                defaults={
+                    'leaderboard_type': leaderboard_type,
+                    'fitness_test': fitness_test,
+                    'current_rank': rank,
+                    'previous_rank': entry.current_rank if entry else None,
+                    'best_score': score,
+                    'total_points': athlete.total_points,
+                    'age_group': age_group_for(athlete.age),
+                    'gender': athlete.gender,
+                    'state': athlete.state,
+                    'district': athlete.district,
+                }
+            )
@@ -0,0 +1,62 @@
+# renderers.py
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; falls back to the stock renderer
+    orjson = None
+
+
+def _has_ambiguous_float(data):
+    """True if data holds a float that orjson and json.dumps format differently
+
+    Both agree on floats in [1e-4, 1e16). Outside it json.dumps switches to
+    exponent notation and orjson writes 1e16 / 0.00001 where json.dumps
+    writes 1e+16 / 1e-05. NaN and infinity count as ambiguous too, so the
+    stock renderer raises for them as before.
+    """
+    stack = [data]
+    while stack:
+        items = stack.pop()
+        if isinstance(items, dict):
+            items = items.values()
+        for value in items:
+            # Subclasses too: serializer output is ReturnDict / ReturnList / OrderedDict
+            if isinstance(value, float):
+                if value and not 1e-4 <= abs(value) < 1e16:
+                    return True
+            elif isinstance(value, (dict, list, tuple)):
+                stack.append(value)
+    return False
+
+
+def _default(obj):
+    value = encoders.JSONEncoder().default(obj)
+    if isinstance(value, (float, list, tuple, dict)) and _has_ambiguous_float([value]):
+        raise TypeError('ambiguous float')
+    return value
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when its output is byte-identical
+
+    Non-JSON types go through DRF's encoder, as with the stock renderer.
+    Anything orjson cannot reproduce exactly is handed to JSONRenderer:
+    indented output, ASCII-only output, floats that need exponent notation,
+    over-wide ints and non-string keys.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+                or _has_ambiguous_float([data])):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except (TypeError, orjson.JSONEncodeError):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Same JavaScript-safety escaping as JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
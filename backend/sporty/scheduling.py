@@ -0,0 +1,241 @@
+# scheduling.py
+from collections import defaultdict, deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, Count, Exists, F, IntegerField, OuterRef, Q, Value, When, Window
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
+
+from .models import TestRecording
+from .stage_metrics import stage_throughput
+
+# Lanes, in order of precedence when flows are otherwise even
+PRIORITY, NORMAL, RETRY = 0, 1, 2
+LANE_NAMES = {PRIORITY: 'priority', NORMAL: 'normal', RETRY: 'retry'}
+
+# Quick tests that should not wait behind long clips
+SHORT_TESTS = {'height_weight'}
+
+# Rough analysis cost of each test relative to an average clip
+TEST_COSTS = {
+    'height_weight': 0.2,
+    'vertical_jump': 0.6,
+    'flexibility': 0.6,
+    'situps': 1.0,
+    'shuttle_run': 1.0,
+    'endurance_run': 2.0,
+}
+
+IN_FLIGHT_STATUSES = ['analyzing', 'cheat_checking']
+QUEUE_DEPTH_KEY = 'sporty:analysis_queue:depth'
+# Caches private to each process; pipeline metrics kept there only cover that process
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+# pg_advisory_xact_lock key held while dispatching
+DISPATCH_LOCK_ID = 0x5350_4f52_5459
+
+
+def lane_expression():
+    """SQL expression for a recording's lane"""
+    return Case(
+        When(retry_count__gt=0, then=Value(RETRY)),
+        When(fitness_test__name__in=SHORT_TESTS, then=Value(PRIORITY)),
+        # The last outstanding test of a fully uploaded session finishes the athlete's
+        # assessment (completed_tests counts uploads, not analyses)
+        When(
+            Q(session__completed_tests__gte=F('session__total_tests')) & ~Exists(
+                TestRecording.objects.filter(
+                    session=OuterRef('session'), processing_status__in=['streaming', 'uploaded', *IN_FLIGHT_STATUSES]
+                ).exclude(id=OuterRef('id'))
+            ),
+            then=Value(PRIORITY)
+        ),
+        default=Value(NORMAL),
+        output_field=IntegerField()
+    )
+
+
+class FairQueue:
+    """Weighted max-min fair choice among recordings waiting for analysis
+
+    Flows are lanes, then states, then districts within a state. Each
+    flow's load is the estimated cost of its recordings in flight. Every
+    free slot goes, level by level, to the backlogged flow with the least
+    load per unit of weight, so a district that floods the queue only gets
+    its share of the workers. Within a district, recordings run oldest
+    first.
+    """
+
+    def __init__(self, candidates, in_flight):
+        self.queues = defaultdict(deque)
+        for recording_id, lane, state, district, test_name, created_at in candidates:
+            self.queues[lane, state, district].append((created_at, recording_id, test_name))
+
+        self.loads = defaultdict(float)
+        for lane, state, district, test_name, count in in_flight:
+            self._charge(lane, state, district, test_name, count)
+
+    def _charge(self, lane, state, district, test_name, count=1):
+        cost = TEST_COSTS.get(test_name, 1.0) * count
+        self.loads['lane', lane] += cost
+        self.loads['state', state] += cost
+        self.loads['district', state, district] += cost
+
+    def _pick(self, options, load_key, weight, head):
+        return min(options, key=lambda option: (
+            self.loads[load_key(option)] / weight(option), head(option)
+        ))
+
+    def take(self, limit):
+        """Ids of up to limit recordings, fairest first"""
+        picked = []
+        while len(picked) < limit:
+            backlog = [key for key, queue in self.queues.items() if queue]
+            if not backlog:
+                break
+
+            def head(keys):
+                return min(self.queues[key][0][0] for key in keys)
+
+            lane = self._pick(
+                {key[0] for key in backlog}, lambda option: ('lane', option),
+                lambda option: settings.ANALYSIS_LANE_WEIGHTS[LANE_NAMES[option]],
+                lambda option: (option, head([key for key in backlog if key[0] == option]))
+            )
+            in_lane = [key for key in backlog if key[0] == lane]
+            state = self._pick(
+                {key[1] for key in in_lane}, lambda s: ('state', s),
+                lambda s: settings.ANALYSIS_FLOW_WEIGHTS.get(s, 1),
+                lambda s: head([key for key in in_lane if key[1] == s])
+            )
+            district = self._pick(
+                {key[2] for key in in_lane if key[1] == state}, lambda d: ('district', state, d),
+                lambda d: settings.ANALYSIS_FLOW_WEIGHTS.get(f"{state}/{d}", 1),
+                lambda d: self.queues[lane, state, d][0][0]
+            )
+
+            created_at, recording_id, test_name = self.queues[lane, state, district].popleft()
+            self._charge(lane, state, district, test_name)
+            picked.append(recording_id)
+        return picked
+
+
+def in_flight_count():
+    return TestRecording.objects.filter(processing_status__in=IN_FLIGHT_STATUSES).count()
+
+
+def claim(limit):
+    """Mark up to limit uploaded recordings as analyzing, fairest first, and return their ids"""
+    if limit <= 0:
+        return []
+
+    # Oldest few of each flow are enough to fill limit slots
+    candidates = TestRecording.objects.filter(processing_status='uploaded').annotate(
+        lane=lane_expression(),
+        position=Window(
+            RowNumber(),
+            partition_by=[F('lane'), F('athlete__state'), F('athlete__district')],
+            order_by=[F('created_at').asc(), F('id').asc()]
+        )
+    ).filter(position__lte=limit).values_list(
+        'id', 'lane', 'athlete__state', 'athlete__district', 'fitness_test__name', 'created_at'
+    )
+    in_flight = TestRecording.objects.filter(processing_status__in=IN_FLIGHT_STATUSES).annotate(
+        lane=lane_expression()
+    ).values_list('lane', 'athlete__state', 'athlete__district', 'fitness_test__name').annotate(
+        count=Count('id')
+    ).order_by()
+
+    claimed = []
+    for recording_id in FairQueue(candidates, in_flight).take(limit):
+        # Conditional update so concurrent workers never claim the same recording
+        if TestRecording.objects.filter(
+            id=recording_id, processing_status='uploaded'
+        ).update(processing_status='analyzing', dispatched_at=timezone.now(), stage_updated_at=timezone.now()):
+            claimed.append(recording_id)
+    return claimed
+
+
+def claim_free():
+    """Claim recordings for the slots free under ANALYSIS_MAX_IN_FLIGHT and return their ids
+
+    Dispatchers count and claim under one transaction-scoped advisory lock,
+    so two of them never fill the same free slots.
+    """
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_xact_lock(%s)', [DISPATCH_LOCK_ID])
+        return claim(settings.ANALYSIS_MAX_IN_FLIGHT - in_flight_count())
+
+
+def requeue_stalled():
+    """Put recordings with no stage progress for ANALYSIS_STALL_MINUTES back to 'uploaded'; returns how many
+
+    Progress is the stage_updated_at heartbeat each stage stamps as it is
+    queued, starts, finishes and every ANALYSIS_HEARTBEAT_SECONDS while it
+    runs, so a recording in a long pose pass, or waiting behind others in a
+    stage's queue, is not taken back while its task is still coming.
+    A 'streaming' recording whose upload process died is released the same way.
+    """
+    cutoff = timezone.now() - timedelta(minutes=settings.ANALYSIS_STALL_MINUTES)
+    return TestRecording.objects.filter(processing_status__in=['streaming', *IN_FLIGHT_STATUSES]).alias(
+        last_progress=Coalesce('stage_updated_at', 'dispatched_at', 'created_at')
+    ).filter(last_progress__lt=cutoff).update(
+        processing_status='uploaded', dispatched_at=None, stage_updated_at=None
+    )
+
+
+def admission(athlete):
+    """Analysis backlog as seen by a new upload, for clients to pace themselves
+
+    status is 'open', 'busy' or 'saturated' by the expected wait. A client
+    should hold further uploads for retry_after seconds once saturated.
+    Without a shared cache the throughput is unknown, so the wait is too
+    and the status stops at 'busy'. Counts are cached for a few seconds
+    since every upload asks.
+    """
+    depth = cache.get_or_set(
+        QUEUE_DEPTH_KEY,
+        lambda: TestRecording.objects.filter(processing_status='uploaded').count(),
+        settings.ANALYSIS_ADMISSION_CACHE_SECONDS
+    )
+    district_depth = cache.get_or_set(
+        f"{QUEUE_DEPTH_KEY}:{athlete.state}:{athlete.district}",
+        lambda: TestRecording.objects.filter(
+            processing_status='uploaded', athlete__state=athlete.state, athlete__district=athlete.district
+        ).count(),
+        settings.ANALYSIS_ADMISSION_CACHE_SECONDS
+    )
+
+    # Recordings finished per minute recently, from the pipeline's own counters
+    rate = 0
+    if settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS:
+        rate = stage_throughput()['scoring']['per_minute']
+    if rate:
+        wait = round(depth / rate * 60)
+    else:
+        # Idle if the queue fits in the workers, unknown if not
+        wait = 0 if depth <= settings.ANALYSIS_MAX_IN_FLIGHT else None
+
+    if wait is None:
+        level = 'busy'
+    elif wait >= settings.ANALYSIS_ADMISSION_SATURATED_SECONDS:
+        level = 'saturated'
+    elif wait >= settings.ANALYSIS_ADMISSION_BUSY_SECONDS:
+        level = 'busy'
+    else:
+        level = 'open'
+
+    return {
+        'status': level,
+        'queue_depth': depth,
+        'district_queue_depth': district_depth,
+        'estimated_wait_seconds': wait,
+        'retry_after': settings.ANALYSIS_ADMISSION_RETRY_SECONDS if level == 'saturated' else None,
+    }
@@ -0,0 +1,65 @@
+# scores.py
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import AssessmentSession, AthleteProfile
+from .percentiles import grade_for_score
+
+CENTS = Decimal('0.01')
+
+# Sessions past this point count towards the athlete's talent score
+FINISHED_STATUSES = ['completed', 'submitted_to_sai', 'verified_by_sai']
+
+
+def add_recording_score(recording, previous=None):
+    """Add a completed recording's points and percentile to its session's sums
+
+    previous is the (points_earned, percentile) a re-analysis replaces, so
+    only the difference is added; None for a first completion.
+    """
+    points, percentile = previous or (None, None)
+    AssessmentSession.objects.filter(id=recording.session_id).update(
+        scored_tests=F('scored_tests') + (0 if previous else 1),
+        points_total=F('points_total') + ((recording.points_earned or 0) - (points or 0)),
+        percentile_total=F('percentile_total') + (
+            Decimal(recording.percentile or 0) - Decimal(percentile or 0)
+        )
+    )
+
+
+def refresh_session_score(session_id):
+    """Recompute a finished session's score from its sums and pass the change to its athlete
+
+    Reads one session row and one athlete row however many recordings and
+    sessions the athlete has. The athlete's sums take the difference from
+    the session's previous score, so a rescored session is not counted twice.
+    """
+    with transaction.atomic():
+        session = AssessmentSession.objects.select_for_update().filter(
+            id=session_id, status__in=FINISHED_STATUSES, scored_tests__gt=0
+        ).first()
+        if session is None:
+            return
+
+        score = (Decimal(session.points_total) / session.scored_tests).quantize(CENTS)
+        AssessmentSession.objects.filter(id=session.id).update(
+            overall_score=score,
+            overall_grade=grade_for_score(score),
+            percentile_rank=(session.percentile_total / session.scored_tests).quantize(CENTS)
+        )
+
+        previous = session.overall_score
+        if session.athlete_id is None or previous == score:
+            return
+
+        # The UPDATE holds the athlete row until commit, so the read below sees these sums
+        athletes = AthleteProfile.objects.filter(id=session.athlete_id)
+        athletes.update(
+            scored_sessions=F('scored_sessions') + (1 if previous is None else 0),
+            session_score_total=F('session_score_total') + (score - (previous or 0))
+        )
+        count, total = athletes.values_list('scored_sessions', 'session_score_total').get()
+        talent_score = (Decimal(total) / count).quantize(CENTS)
+        athletes.update(overall_talent_score=talent_score, talent_grade=grade_for_score(talent_score))
@@ -1,13 +1,30 @@
 from rest_framework import serializers
+from django.conf import settings
 from .models import *
+from .query_planning import plan_queryset
 from datetime import date
 
-class AthleteProfileSerializer(serializers.ModelSerializer):
+class ChangedFieldsMixin:
+    """Saves only the fields a request sets
+
+    Score sums on athletes and sessions move through F() updates (scores.py)
+    while a request runs; a full save of the instance it loaded would write
+    them back stale.
+    """
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        auto_now = [field.name for field in instance._meta.concrete_fields if getattr(field, 'auto_now', False)]
+        instance.save(update_fields=[*validated_data, *auto_now])
+        return instance
+
+class AthleteProfileSerializer(ChangedFieldsMixin, serializers.ModelSerializer):
     age = serializers.SerializerMethodField()
     
     class Meta:
         model = AthleteProfile
-        fields = '__all__'
+        # Running sums maintained by scores.py
+        exclude = ('scored_sessions', 'session_score_total')
         read_only_fields = ('id', 'created_at', 'updated_at', 'overall_talent_score', 
                            'talent_grade', 'national_ranking', 'state_ranking')
     
@@ -29,14 +46,16 @@ class AgeBenchmarkSerializer(serializers.ModelSerializer):
         model = AgeBenchmark
         fields = '__all__'
 
-class AssessmentSessionSerializer(serializers.ModelSerializer):
+class AssessmentSessionSerializer(ChangedFieldsMixin, serializers.ModelSerializer):
     athlete_name = serializers.CharField(source='athlete.full_name', read_only=True)
     progress_percentage = serializers.SerializerMethodField()
     
     class Meta:
         model = AssessmentSession
-        fields = '__all__'
-        read_only_fields = ('id', 'created_at', 'completed_at', 'submitted_at')
+        # Running sums maintained by scores.py
+        exclude = ('scored_tests', 'points_total', 'percentile_total')
+        read_only_fields = ('id', 'created_at', 'completed_at', 'submitted_at', 'completed_tests',
+                           'overall_score', 'overall_grade', 'percentile_rank')
     
     def get_progress_percentage(self, obj):
         if obj.total_tests > 0:
@@ -49,7 +68,8 @@ class TestRecordingSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = TestRecording
-        fields = '__all__'
+        # Upload dedup and scheduler bookkeeping
+        exclude = ('video_sha256', 'dispatched_at', 'stage_updated_at')
         read_only_fields = ('id', 'created_at', 'processed_at')
 
 class VideoUploadSerializer(serializers.Serializer):
@@ -62,16 +82,44 @@ class VideoUploadSerializer(serializers.Serializer):
     device_analysis_data = serializers.JSONField(required=False)
     device_info = serializers.JSONField(required=False)
 
+class ChunkedUploadInitSerializer(serializers.Serializer):
+    """Serializer for starting a resumable video upload"""
+    session_id = serializers.UUIDField()
+    fitness_test_id = serializers.IntegerField()
+    file_name = serializers.CharField(max_length=255, default='video.mp4')
+    total_size = serializers.IntegerField(min_value=1)
+    device_analysis_score = serializers.DecimalField(max_digits=10, decimal_places=3, required=False)
+    device_analysis_confidence = serializers.DecimalField(max_digits=5, decimal_places=4, required=False)
+    device_analysis_data = serializers.JSONField(required=False)
+    device_info = serializers.JSONField(required=False)
+
+    def validate_total_size(self, value):
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"Video exceeds the maximum size of {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes"
+            )
+        return value
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    upload_id = serializers.UUIDField(source='id', read_only=True)
+    offset = serializers.IntegerField(source='received_size', read_only=True)
+    
+    class Meta:
+        model = ChunkedUpload
+        fields = ('upload_id', 'offset', 'total_size', 'status', 'recording')
+
 class LeaderboardSerializer(serializers.ModelSerializer):
     athlete_name = serializers.CharField(source='athlete.full_name', read_only=True)
     athlete_state = serializers.CharField(source='athlete.state', read_only=True)
     athlete_district = serializers.CharField(source='athlete.district', read_only=True)
     fitness_test_name = serializers.CharField(source='fitness_test.display_name', read_only=True)
+    total_participants = serializers.IntegerField(source='partition.participants', read_only=True)
     rank_change = serializers.SerializerMethodField()
     
     class Meta:
         model = Leaderboard
-        fields = '__all__'
+        # Internal lookup key; the rankings endpoints take test and state instead
+        exclude = ('partition_key',)
     
     def get_rank_change(self, obj):
         if obj.previous_rank:
@@ -113,22 +161,26 @@ class TalentSummarySerializer(serializers.ModelSerializer):
                  'best_performances', 'earned_badges', 'current_rankings')
     
     def get_recent_sessions(self, obj):
-        sessions = AssessmentSession.objects.filter(athlete=obj).order_by('-created_at')[:3]
+        sessions = plan_queryset(
+            AssessmentSession.objects.filter(athlete=obj), AssessmentSessionSerializer
+        ).order_by('-created_at')[:3]
         return AssessmentSessionSerializer(sessions, many=True).data
     
     def get_best_performances(self, obj):
-        recordings = TestRecording.objects.filter(
+        recordings = plan_queryset(TestRecording.objects.filter(
             athlete=obj, 
             processing_status='completed'
-        ).order_by('-percentile')[:5]
+        ), TestRecordingSerializer).order_by('-percentile')[:5]
         return TestRecordingSerializer(recordings, many=True).data
     
     def get_earned_badges(self, obj):
-        badges = AthleteBadge.objects.filter(athlete=obj).order_by('-earned_at')[:10]
+        badges = plan_queryset(
+            AthleteBadge.objects.filter(athlete=obj), AthleteBadgeSerializer
+        ).order_by('-earned_at')[:10]
         return AthleteBadgeSerializer(badges, many=True).data
     
     def get_current_rankings(self, obj):
-        rankings = Leaderboard.objects.filter(athlete=obj)
+        rankings = plan_queryset(Leaderboard.objects.filter(athlete=obj), LeaderboardSerializer)
         return LeaderboardSerializer(rankings, many=True).data
 
 class BenchmarkComparisonSerializer(serializers.Serializer):
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/3.1/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 from dotenv import load_dotenv
 
@@ -127,7 +128,130 @@ USE_L10N = True
 USE_TZ = True
 
 
+REST_FRAMEWORK = {
+    # Byte-identical to JSONRenderer; uses orjson when it is installed
+    'DEFAULT_RENDERER_CLASSES': [
+        'sporty.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = '/static/'
+
+# Video analysis
+# Extracted pose landmarks, keyed by video content hash and pose model version
+LANDMARK_CACHE_DIR = os.getenv('LANDMARK_CACHE_DIR', str(BASE_DIR / 'landmark_cache'))
+LANDMARK_CACHE_MAX_BYTES = int(os.getenv('LANDMARK_CACHE_MAX_MB', '2048')) * 1024 * 1024
+
+# 'celery' runs analysis as Celery tasks; 'pool' and 'batched' leave it to the
+# run_analysis_pool / run_batched_analysis management commands
+ANALYSIS_WORKER_MODE = os.getenv('ANALYSIS_WORKER_MODE', 'celery')
+ANALYSIS_POOL_PROCESSES = int(os.getenv('ANALYSIS_POOL_PROCESSES', os.cpu_count() or 1))
+ANALYSIS_POOL_MAX_JOBS_PER_PROCESS = int(os.getenv('ANALYSIS_POOL_MAX_JOBS_PER_PROCESS', '200'))
+ANALYSIS_POOL_MAX_PENDING = int(os.getenv('ANALYSIS_POOL_MAX_PENDING', '0')) or ANALYSIS_POOL_PROCESSES * 2
+
+# Batched TFLite pose inference shared by concurrent recordings (run_batched_analysis):
+# the BlazePose detector finds the body, the landmark model runs on the crop around it
+POSE_BATCH_MODEL_PATH = os.getenv('POSE_BATCH_MODEL_PATH', str(BASE_DIR / 'models' / 'pose_landmark_full.tflite'))
+POSE_BATCH_DETECTOR_PATH = os.getenv('POSE_BATCH_DETECTOR_PATH', str(BASE_DIR / 'models' / 'pose_detection.tflite'))
+POSE_BATCH_SIZE = int(os.getenv('POSE_BATCH_SIZE', '16'))
+POSE_BATCH_MAX_WAIT_MS = int(os.getenv('POSE_BATCH_MAX_WAIT_MS', '10'))
+ANALYSIS_BATCH_CONCURRENCY = int(os.getenv('ANALYSIS_BATCH_CONCURRENCY', '8'))
+
+# Pose extraction while an upload is still arriving (upload_video?fitness_test_id=...)
+STREAMING_ANALYSIS_ENABLED = os.getenv('STREAMING_ANALYSIS_ENABLED', 'true').lower() == 'true'
+STREAMING_ANALYSIS_MAX_CONCURRENT = int(os.getenv('STREAMING_ANALYSIS_MAX_CONCURRENT', '2'))
+STREAMING_SPOOL_DIR = os.getenv('STREAMING_SPOOL_DIR', os.path.join(tempfile.gettempdir(), 'sporty_uploads'))
+
+# Resumable chunked uploads (upload_init / uploads/<id> / finalize)
+CHUNKED_UPLOAD_DIR = os.getenv('CHUNKED_UPLOAD_DIR', str(BASE_DIR / 'chunked_uploads'))
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.getenv('CHUNKED_UPLOAD_CHUNK_SIZE', str(512 * 1024)))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.getenv('CHUNKED_UPLOAD_MAX_MB', '500')) * 1024 * 1024
+CHUNKED_UPLOAD_EXPIRY_HOURS = int(os.getenv('CHUNKED_UPLOAD_EXPIRY_HOURS', '48'))
+# A chunk write or finalize whose request died is taken over after this long
+CHUNKED_UPLOAD_CLAIM_SECONDS = int(os.getenv('CHUNKED_UPLOAD_CLAIM_SECONDS', '300'))
+
+# How often each process checks that its AgeBenchmark index is current
+BENCHMARK_INDEX_CHECK_SECONDS = int(os.getenv('BENCHMARK_INDEX_CHECK_SECONDS', '5'))
+
+# Shared cache; without REDIS_URL each process keeps its own
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+
+# Analysis scheduling (scheduling.py): recordings are started fairly across
+# lanes, states and districts. Weights are relative shares of the workers;
+# flow weights are keyed by state or 'state/district' and default to 1.
+ANALYSIS_MAX_IN_FLIGHT = int(os.getenv('ANALYSIS_MAX_IN_FLIGHT', '64'))
+ANALYSIS_LANE_WEIGHTS = {'priority': 4, 'normal': 2, 'retry': 1}
+ANALYSIS_FLOW_WEIGHTS = {}
+# Upload responses report the backlog; 'saturated' asks clients to hold off and
+# needs the shared cache (REDIS_URL) for the pipeline's throughput
+ANALYSIS_ADMISSION_BUSY_SECONDS = int(os.getenv('ANALYSIS_ADMISSION_BUSY_SECONDS', '120'))
+ANALYSIS_ADMISSION_SATURATED_SECONDS = int(os.getenv('ANALYSIS_ADMISSION_SATURATED_SECONDS', '900'))
+ANALYSIS_ADMISSION_RETRY_SECONDS = int(os.getenv('ANALYSIS_ADMISSION_RETRY_SECONDS', '300'))
+ANALYSIS_ADMISSION_CACHE_SECONDS = 5
+
+# Celery. Analysis runs as a pipeline of stages, each on its own queue so
+# workers can be sized per stage, e.g.:
+#   celery -A sporty worker -Q analysis.fetch -P threads -c 32   (downloads)
+#   celery -A sporty worker -Q analysis.pose -c <cores>           (pose estimation)
+#   celery -A sporty worker -Q analysis.scoring -c 4
+#   celery -A sporty worker -Q analysis.ranking -c 4              (database writes)
+# Pose and scoring workers hand landmarks over through LANDMARK_CACHE_DIR, and
+# fetch and pose workers videos through ANALYSIS_SCRATCH_DIR, so those must be
+# on storage both sides can reach.
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', os.getenv('REDIS_URL'))
+CELERY_TASK_ROUTES = {
+    'sporty.tasks.process_video_analysis': {'queue': 'analysis.fetch'},
+    'sporty.tasks.extract_pose': {'queue': 'analysis.pose'},
+    'sporty.tasks.score_recording': {'queue': 'analysis.scoring'},
+    'sporty.tasks.update_recording_rankings': {'queue': 'analysis.ranking'},
+}
+# Long tasks; a worker should not reserve work another idle worker could take
+CELERY_WORKER_PREFETCH_MULTIPLIER = 1
+# Acknowledge after the task ran, so a crashed worker's task is redelivered;
+# stages resume from their checkpoints (AnalysisCheckpoint) and are idempotent
+CELERY_TASK_ACKS_LATE = True
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+# Finished analyses trigger dispatch_analysis too; the schedule covers missed triggers
+CELERY_BEAT_SCHEDULE = {
+    'dispatch-analysis': {'task': 'sporty.tasks.dispatch_analysis', 'schedule': 5.0},
+    'requeue-stalled-analyses': {'task': 'sporty.tasks.requeue_stalled_analyses', 'schedule': 300.0},
+    'refresh-platform-stats': {'task': 'sporty.tasks.refresh_platform_stats', 'schedule': 300.0},
+    'cleanup-chunked-uploads': {'task': 'sporty.tasks.cleanup_chunked_uploads', 'schedule': 3600.0},
+}
+# Recordings with no stage heartbeat for this long are assumed lost
+# and requeued. Keep it above the broker's visibility timeout (an hour on
+# Redis), which redelivers a dead worker's task first, and above the longest
+# wait in a stage's queue.
+ANALYSIS_STALL_MINUTES = int(os.getenv('ANALYSIS_STALL_MINUTES', '90'))
+# A running stage stamps its heartbeat this often, however long it takes
+ANALYSIS_HEARTBEAT_SECONDS = int(os.getenv('ANALYSIS_HEARTBEAT_SECONDS', '60'))
+ANALYSIS_SCRATCH_DIR = os.getenv('ANALYSIS_SCRATCH_DIR') or None
+# Window of the per-stage throughput counters (manage.py pipeline_throughput)
+PIPELINE_METRICS_MINUTES = int(os.getenv('PIPELINE_METRICS_MINUTES', '5'))
+
+# Analysis status streams (asgi.py): pub/sub over Redis when set, otherwise in-process
+STATUS_CHANNEL_URL = os.getenv('STATUS_CHANNEL_URL', os.getenv('REDIS_URL'))
+STATUS_CHANNEL_TOKEN_SECONDS = 60 * 60
+STATUS_CHANNEL_HEARTBEAT_SECONDS = 15
+
+# platform_stats: rollups are recomputed by the refresh_platform_stats task
+# (CELERY_BEAT_SCHEDULE); responses are cached and served stale while being
+# rebuilt. Rollups older than PLATFORM_STATS_MAX_AGE_SECONDS, when the
+# scheduled refresh is not running, are recomputed on read.
+PLATFORM_STATS_MAX_AGE_SECONDS = int(os.getenv('PLATFORM_STATS_MAX_AGE_SECONDS', '900'))
+PLATFORM_STATS_FRESH_SECONDS = int(os.getenv('PLATFORM_STATS_FRESH_SECONDS', '30'))
+PLATFORM_STATS_STALE_SECONDS = int(os.getenv('PLATFORM_STATS_STALE_SECONDS', str(24 * 3600)))
+
+# How long paginated list totals (COUNT(*)) are cached
+PAGINATION_COUNT_CACHE_SECONDS = int(os.getenv('PAGINATION_COUNT_CACHE_SECONDS', '60'))
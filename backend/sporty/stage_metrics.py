@@ -0,0 +1,60 @@
+# stage_metrics.py
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Analysis stages in order. Celery runs each on its own queue (see
+# CELERY_TASK_ROUTES); analyze_recording runs them back to back.
+STAGES = ['fetch', 'pose', 'scoring', 'ranking']
+
+METRICS_KEY = 'sporty:pipeline:{stage}:{minute}:{field}'
+METRICS_FIELDS = ['count', 'failed', 'millis']
+
+
+def record_stage(stage, seconds, failed=False):
+    """Count one run of a stage in the current minute's bucket"""
+    minute = int(time.time() // 60)
+    for field, value in zip(METRICS_FIELDS, [1, int(failed), int(seconds * 1000)]):
+        key = METRICS_KEY.format(stage=stage, minute=minute, field=field)
+        cache.add(key, 0, settings.PIPELINE_METRICS_MINUTES * 60 + 60)
+        try:
+            cache.incr(key, value)
+        except ValueError:  # Expired between add and incr
+            cache.set(key, value, settings.PIPELINE_METRICS_MINUTES * 60 + 60)
+
+
+def stage_throughput(minutes=None):
+    """Per stage: runs per minute, failures and mean seconds over the last few minutes"""
+    minutes = minutes or settings.PIPELINE_METRICS_MINUTES
+    now = int(time.time() // 60)
+    keys = {
+        (stage, field): [METRICS_KEY.format(stage=stage, minute=minute, field=field)
+                         for minute in range(now - minutes + 1, now + 1)]
+        for stage in STAGES for field in METRICS_FIELDS
+    }
+    values = cache.get_many([key for bucket in keys.values() for key in bucket])
+    totals = {
+        name: sum(values.get(key, 0) for key in bucket) for name, bucket in keys.items()
+    }
+    return {
+        stage: {
+            'per_minute': round(totals[stage, 'count'] / minutes, 2),
+            'failed': totals[stage, 'failed'],
+            'mean_seconds': round(totals[stage, 'millis'] / totals[stage, 'count'] / 1000, 3)
+            if totals[stage, 'count'] else None,
+        }
+        for stage in STAGES
+    }
+
+
+@contextmanager
+def measured(stage):
+    start = time.monotonic()
+    failed = True
+    try:
+        yield
+        failed = False
+    finally:
+        record_stage(stage, time.monotonic() - start, failed)
@@ -0,0 +1,120 @@
+# stats.py
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Avg, F
+from django.utils import timezone
+
+from .models import AssessmentSession, AthleteProfile, PlatformStat, TestRecording
+
+CACHE_KEY = 'sporty:platform_stats'
+REVALIDATE_LOCK_KEY = 'sporty:platform_stats:revalidating'
+
+# Counters kept current on writes; the periodic refresh also recounts them
+COUNTERS = ['total_athletes', 'total_assessments', 'total_videos_analyzed']
+
+
+def increment(name, by=1):
+    """Bump a rollup counter without reading it"""
+    if not PlatformStat.objects.filter(name=name).update(value=F('value') + by):
+        PlatformStat.objects.get_or_create(name=name)
+        PlatformStat.objects.filter(name=name).update(value=F('value') + by)
+
+
+def count_new_athlete(sender, instance, created, **kwargs):
+    if created:
+        increment('total_athletes')
+
+
+def count_deleted_athlete(sender, instance, **kwargs):
+    increment('total_athletes', -1)
+
+
+def _float(value):
+    """Decimal averages as the JSON numbers the endpoint has always returned"""
+    return None if value is None else float(value)
+
+
+def refresh_platform_stats():
+    """Recompute every rollup from the source tables; run periodically"""
+    week_ago = timezone.now() - timedelta(days=7)
+    counters = {
+        'total_athletes': AthleteProfile.objects.count(),
+        'total_assessments': AssessmentSession.objects.filter(status='completed').count(),
+        'total_videos_analyzed': TestRecording.objects.filter(processing_status='completed').count(),
+    }
+    aggregates = {
+        'avg_talent_score': _float(AthleteProfile.objects.aggregate(
+            avg_score=Avg('overall_talent_score')
+        )['avg_score']),
+        'top_performing_states': [
+            dict(row, avg_score=_float(row['avg_score'])) for row in
+            AthleteProfile.objects.values('state')
+            .annotate(avg_score=Avg('overall_talent_score'))
+            .order_by('-avg_score')[:10]
+        ],
+        'recent_activity': {
+            'new_athletes_this_week': AthleteProfile.objects.filter(
+                created_at__gte=week_ago
+            ).count(),
+            'assessments_this_week': AssessmentSession.objects.filter(
+                created_at__gte=week_ago
+            ).count()
+        }
+    }
+
+    for name, value in counters.items():
+        PlatformStat.objects.update_or_create(name=name, defaults={'value': value})
+    PlatformStat.objects.update_or_create(name='aggregates', defaults={'data': aggregates})
+
+    return build_snapshot()
+
+
+def build_snapshot():
+    """Assemble the platform_stats response from the rollup table and cache it"""
+    rows = {stat.name: stat for stat in PlatformStat.objects.all()}
+    stale = timezone.now() - timedelta(seconds=settings.PLATFORM_STATS_MAX_AGE_SECONDS)
+    if 'aggregates' not in rows or rows['aggregates'].updated_at < stale:
+        # Nothing rolled up yet (fresh deployment), or the scheduled refresh is not running
+        return refresh_platform_stats()
+
+    stats = {name: rows[name].value if name in rows else 0 for name in COUNTERS}
+    stats.update(rows['aggregates'].data)
+
+    cache.set(
+        CACHE_KEY,
+        {'stats': stats, 'fresh_until': time.time() + settings.PLATFORM_STATS_FRESH_SECONDS},
+        settings.PLATFORM_STATS_STALE_SECONDS
+    )
+    return stats
+
+
+def _revalidate():
+    try:
+        build_snapshot()
+    except Exception as e:
+        logging.error(f"Platform stats revalidation failed: {e}")
+    finally:
+        cache.delete(REVALIDATE_LOCK_KEY)
+        connection.close()
+
+
+def cached_platform_stats():
+    """Cached platform stats with stale-while-revalidate
+
+    A fresh entry is served as is. A stale one is served immediately while
+    a single background thread rebuilds it. Only an empty cache makes the
+    request wait.
+    """
+    entry = cache.get(CACHE_KEY)
+    if entry is None:
+        return build_snapshot()
+
+    if entry['fresh_until'] < time.time() and cache.add(REVALIDATE_LOCK_KEY, True, 60):
+        threading.Thread(target=_revalidate, name='platform-stats', daemon=True).start()
+    return entry['stats']
@@ -0,0 +1,267 @@
+# status_channel.py
+import asyncio
+import json
+import logging
+import re
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.utils.encoders import JSONEncoder
+
+from .benchmarks import benchmark_comparison
+from .models import TestRecording
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:  # Only needed when STATUS_CHANNEL_URL is set
+    redis = None
+
+CHANNEL_PREFIX = 'sporty:recording:'
+TOKEN_SALT = 'sporty.status_channel'
+EVENTS_PATH = re.compile(r'^/api/v1/test-recordings/(?P<recording_id>[0-9a-f-]{36})/events/$')
+
+# Progress shown for each processing status
+PROGRESS = {
+    'streaming': 10,
+    'uploaded': 10,
+    'analyzing': 50,
+    'cheat_checking': 80,
+    'completed': 100,
+    'failed': 0,
+    'flagged': 100,
+    'manually_verified': 100
+}
+# No further transitions follow these, so the stream ends on them
+FINAL_STATUSES = {'completed', 'failed', 'flagged', 'manually_verified'}
+
+
+def status_payload(recording):
+    """Status and results of a recording, as polled from analysis_status and pushed to subscribers"""
+    payload = {
+        'recording_id': recording.id,
+        'processing_status': recording.processing_status,
+        'progress_percentage': PROGRESS.get(recording.processing_status, 0),
+    }
+
+    # Add results if analysis is complete
+    if recording.processing_status in ['completed', 'manually_verified']:
+        payload.update({
+            'final_score': recording.final_score,
+            'performance_grade': recording.performance_grade,
+            'percentile': recording.percentile,
+            'points_earned': recording.points_earned,
+            'ai_confidence': recording.ai_confidence,
+            'benchmark_comparison': benchmark_comparison(recording)
+        })
+
+    # Add cheat detection info
+    if recording.cheat_detection_score:
+        payload.update({
+            'cheat_detection_score': recording.cheat_detection_score,
+            'is_suspicious': recording.is_suspicious,
+            'cheat_flags': recording.cheat_flags
+        })
+
+    # Add error info if failed
+    if recording.processing_status == 'failed':
+        payload.update({
+            'error_message': recording.processing_error,
+            'retry_available': recording.retry_count < 3
+        })
+
+    return payload
+
+
+def events_url(recording_id):
+    """Path of the recording's status stream, with a signed token standing in for authentication
+
+    EventSource clients cannot send an Authorization header, so the URL is
+    handed out by the authenticated upload and analysis_status responses.
+    """
+    token = signing.dumps(str(recording_id), salt=TOKEN_SALT)
+    return f"/api/v1/test-recordings/{recording_id}/events/?token={token}"
+
+
+class InProcessBroker:
+    """Pub/sub between threads of one process; for tests and single-process setups
+
+    publish() may be called from any thread. Messages are handed to each
+    subscriber's asyncio queue on the subscriber's own event loop.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:  # Subscriber's loop has shut down
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._subscribers[channel].add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self._lock:
+                self._subscribers[channel].discard(subscriber)
+                if not self._subscribers[channel]:
+                    del self._subscribers[channel]
+
+
+class RedisBroker(InProcessBroker):
+    """Redis pub/sub across processes, fanned out locally
+
+    Each event loop keeps one pattern subscription to every recording
+    channel and hands messages to its local subscribers, so open streams
+    cost no Redis connections of their own.
+    """
+
+    def __init__(self, url):
+        super().__init__()
+        self.url = url
+        self._client = None
+        self._listeners = {}
+
+    def publish(self, channel, message):
+        if self._client is None:
+            self._client = redis.Redis.from_url(self.url)
+        self._client.publish(channel, message)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        loop = asyncio.get_running_loop()
+        listener = self._listeners.get(loop)
+        if listener is None or listener[0].done():
+            ready = asyncio.Event()
+            listener = (loop.create_task(self._listen(ready)), ready)
+            self._listeners[loop] = listener
+        async with super().subscribe(channel) as queue:
+            # Messages published before the pattern subscription is live would be missed
+            await asyncio.wait_for(listener[1].wait(), settings.STATUS_CHANNEL_HEARTBEAT_SECONDS)
+            yield queue
+
+    async def _listen(self, ready):
+        while True:
+            try:
+                client = redis_asyncio.Redis.from_url(self.url)
+                async with client.pubsub() as pubsub:
+                    await pubsub.psubscribe(CHANNEL_PREFIX + '*')
+                    ready.set()
+                    async for message in pubsub.listen():
+                        if message['type'] == 'pmessage':
+                            self.deliver(message['channel'].decode(), message['data'].decode())
+            except Exception as e:
+                logging.warning(f"Status channel listener reconnecting: {e}")
+                await asyncio.sleep(1)
+
+
+_broker = None
+
+def get_broker():
+    """Process-wide broker: Redis with STATUS_CHANNEL_URL, otherwise in-process"""
+    global _broker
+    if _broker is None:
+        url = settings.STATUS_CHANNEL_URL
+        if url and redis is None:
+            raise ImproperlyConfigured('STATUS_CHANNEL_URL needs the redis package')
+        _broker = RedisBroker(url) if url else InProcessBroker()
+    return _broker
+
+
+def publish_status(recording):
+    """Push a recording's current status to its subscribers; never fails the caller"""
+    try:
+        message = json.dumps(status_payload(recording), cls=JSONEncoder)
+        get_broker().publish(CHANNEL_PREFIX + str(recording.id), message)
+    except Exception as e:
+        logging.warning(f"Could not publish status of recording {recording.id}: {e}")
+
+
+def _current_status(recording_id):
+    recording = TestRecording.objects.select_related('athlete').filter(id=recording_id).first()
+    return None if recording is None else json.dumps(status_payload(recording), cls=JSONEncoder)
+
+
+async def _respond(send, status, data):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': [(b'content-type', b'application/json')]})
+    await send({'type': 'http.response.body', 'body': json.dumps(data).encode()})
+
+
+async def _disconnected(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def stream_status(scope, receive, send, recording_id):
+    """Server-Sent Events stream of a recording's status until it is final
+
+    The first event is the current status, read after subscribing so no
+    transition falls in between. Comments keep idle connections open
+    through proxies.
+    """
+    token = parse_qs(scope['query_string'].decode()).get('token', [''])[0]
+    try:
+        authorized = signing.loads(
+            token, salt=TOKEN_SALT, max_age=settings.STATUS_CHANNEL_TOKEN_SECONDS
+        ) == recording_id
+    except signing.BadSignature:
+        authorized = False
+    if not authorized:
+        return await _respond(send, 403, {'error': 'Invalid or expired token'})
+
+    async with get_broker().subscribe(CHANNEL_PREFIX + recording_id) as queue:
+        message = await sync_to_async(_current_status)(recording_id)
+        if message is None:
+            return await _respond(send, 404, {'error': 'Recording not found'})
+
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]})
+        disconnected = asyncio.ensure_future(_disconnected(receive))
+        getter = None
+        try:
+            while True:
+                await send({'type': 'http.response.body', 'body': f"data: {message}\n\n".encode(),
+                            'more_body': True})
+                if json.loads(message)['processing_status'] in FINAL_STATUSES:
+                    break
+                message = None
+                while message is None:
+                    getter = getter or asyncio.ensure_future(queue.get())
+                    done, _ = await asyncio.wait(
+                        {getter, disconnected}, timeout=settings.STATUS_CHANNEL_HEARTBEAT_SECONDS,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if disconnected in done:
+                        return
+                    if getter in done:
+                        message, getter = getter.result(), None
+                    else:
+                        await send({'type': 'http.response.body', 'body': b': keepalive\n\n',
+                                    'more_body': True})
+            await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            for task in (getter, disconnected):
+                if task is not None:
+                    task.cancel()
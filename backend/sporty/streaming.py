@@ -0,0 +1,279 @@
+# streaming.py
+import hashlib
+import logging
+import os
+import queue
+import tempfile
+import threading
+
+import cv2
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+from .ai_processor import (
+    HISTOGRAM_BINS, LANDMARK_DIMS, NUM_LANDMARKS, PoseSequence, SamplingPolicy, VideoAnalyzer,
+    frame_dhash, frame_histogram
+)
+from .landmark_cache import LandmarkCache
+from .models import TestRecording
+
+# Reopening the container is not free, so wait for this much new data first
+MIN_NEW_BYTES = 512 * 1024
+
+_stream_slots = threading.BoundedSemaphore(settings.STREAMING_ANALYSIS_MAX_CONCURRENT)
+# Warm analyzers handed from one upload to the next; building one loads the
+# MediaPipe graph. The slots above cap how many are ever created.
+_idle_analyzers = queue.SimpleQueue()
+
+
+def _take_analyzer():
+    try:
+        return _idle_analyzers.get_nowait()
+    except queue.Empty:
+        return VideoAnalyzer(cache=LandmarkCache())
+
+
+class StreamingAnalysis:
+    """Pose extraction that runs while the video is still being uploaded
+
+    Upload chunks are appended to a spool file. A background thread reopens
+    the file as it grows and decodes every frame that is readable so far,
+    which works for fragmented MP4. For a classic MP4 with the index at the
+    end, nothing decodes until the last byte arrives. When the upload is done
+    and every frame is processed, the landmarks are stored in the landmark
+    cache under the upload's content hash. Analysis is then enqueued, and the
+    worker scores the recording without downloading or decoding the video.
+    """
+
+    def __init__(self, test_name, config):
+        self.policy = SamplingPolicy.for_test(test_name, config)
+        # The tail decoder cannot seek back, so sample the whole clip at target fps;
+        # that is a superset of the frames a coarse-to-fine pass would pick
+        self.decode_policy = SamplingPolicy(**dict(vars(self.policy), coarse_to_fine=False))
+
+        spool_dir = settings.STREAMING_SPOOL_DIR
+        os.makedirs(spool_dir, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=spool_dir, suffix='.mp4')
+        self.file = os.fdopen(fd, 'wb')
+        self.digest = hashlib.sha256()
+        self.size = 0
+        self.content_hash = None
+
+        self._lock = threading.Condition()
+        self._upload_complete = False
+        self._cancelled = False
+        self._extracted = False
+        self._finished = False
+        self._recording_id = None
+        self._enqueued = False
+
+        self._thread = threading.Thread(target=self._run, name='streaming-analysis', daemon=True)
+        self._thread.start()
+
+    def write(self, chunk):
+        self.file.write(chunk)
+        self.file.flush()
+        self.digest.update(chunk)
+        with self._lock:
+            self.size += len(chunk)
+            self._lock.notify_all()
+
+    def complete(self):
+        """Called when the last byte of the upload has been written"""
+        self.file.close()
+        with self._lock:
+            self.content_hash = self.digest.hexdigest()
+            self._upload_complete = True
+            self._lock.notify_all()
+
+    def attach(self, recording_id):
+        """Enqueue analysis for recording_id once extraction has finished"""
+        with self._lock:
+            self._recording_id = recording_id
+        self._maybe_enqueue()
+
+    def cancel(self):
+        """The upload was rejected; stop decoding and drop the spool file"""
+        with self._lock:
+            self._cancelled = True
+            self._lock.notify_all()
+
+    def release(self):
+        """End of the upload request: cancel if no recording was attached"""
+        with self._lock:
+            attached = self._recording_id is not None
+        if not attached:
+            self.cancel()
+
+    def open_uploaded_file(self, name, content_type):
+        return UploadedFile(
+            file=open(self.path, 'rb'), name=name, content_type=content_type, size=self.size
+        )
+
+    def _maybe_enqueue(self):
+        """Enqueue once both the recording exists and extraction has ended"""
+        with self._lock:
+            if self._enqueued or self._recording_id is None or not self._finished:
+                return
+            self._enqueued = True
+            recording_id = self._recording_id
+            # Without cached landmarks the worker falls back to a full analysis
+            content_hash = self.content_hash if self._extracted else None
+
+        # Only now may the scheduler claim it
+        TestRecording.objects.filter(id=recording_id, processing_status='streaming').update(
+            processing_status='uploaded', stage_updated_at=None
+        )
+        if threading.current_thread() is self._thread:
+            connection.close()
+
+        from .tasks import enqueue_analysis
+        enqueue_analysis(recording_id, content_hash)
+
+    def _wait_for_data(self, seen):
+        """Block until enough new bytes arrive; returns (size, upload_complete)"""
+        with self._lock:
+            self._lock.wait_for(
+                lambda: self._cancelled or self._upload_complete or self.size >= seen + MIN_NEW_BYTES
+            )
+            return self.size, self._upload_complete
+
+    def _run(self):
+        acquired = _stream_slots.acquire(blocking=False)
+        try:
+            if acquired:
+                analyzer = _take_analyzer()
+                try:
+                    self._extract(analyzer)
+                finally:
+                    _idle_analyzers.put(analyzer)
+        except Exception as e:
+            logging.warning(f"Streaming analysis failed, falling back to full analysis: {e}")
+        finally:
+            if acquired:
+                _stream_slots.release()
+            # Wait for the upload to finish before removing the spool file
+            with self._lock:
+                self._lock.wait_for(lambda: self._cancelled or self._upload_complete)
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            with self._lock:
+                self._finished = True
+            self._maybe_enqueue()
+
+    def _extract(self, analyzer):
+        analyzer.reset()
+        policy = self.decode_policy
+
+        indices, timestamps, landmarks, histograms, hashes = [], [], [], [], []
+        next_frame = 0
+        seen = 0
+        fps = frame_size = stride = scale = None
+
+        while True:
+            seen, upload_complete = self._wait_for_data(seen)
+            if self._cancelled:
+                return
+
+            cap = cv2.VideoCapture(self.path)
+            if cap.isOpened():
+                if fps is None:
+                    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+                    frame_size = (
+                        int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                        int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+                    )
+                    stride = policy.stride_for(fps, policy.target_fps)
+                    scale = policy.scale_for(frame_size)
+                if next_frame:
+                    cap.set(cv2.CAP_PROP_POS_FRAMES, next_frame)
+
+                # Decode everything readable so far
+                while cap.grab():
+                    if next_frame % stride == 0:
+                        ret, frame = cap.retrieve()
+                        if not ret:
+                            break
+                        if scale < 1.0:
+                            frame = cv2.resize(
+                                frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+                            )
+                        indices.append(next_frame)
+                        timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+                        histograms.append(frame_histogram(frame))
+                        hashes.append(frame_dhash(frame))
+                        landmarks.append(analyzer._estimate(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)))
+                    next_frame += 1
+            cap.release()
+
+            # Only a pass over the complete file is guaranteed to have seen every frame
+            if upload_complete:
+                break
+
+        if fps is None:
+            raise ValueError('Uploaded video could not be decoded')
+
+        sequence = PoseSequence(
+            np.asarray(landmarks, dtype=np.float32).reshape(-1, NUM_LANDMARKS, LANDMARK_DIMS),
+            np.asarray(timestamps, dtype=np.float64),
+            fps,
+            frame_size,
+            frame_indices=np.asarray(indices, dtype=np.int64),
+            histograms=np.asarray(histograms, dtype=np.float32).reshape(-1, 3 * HISTOGRAM_BINS),
+            frame_hashes=np.asarray(hashes, dtype=np.uint64)
+        )
+        analyzer.store_landmarks(self.content_hash, self.policy, sequence)
+        with self._lock:
+            self._extracted = True
+
+
+class StreamingAnalysisUploadHandler(FileUploadHandler):
+    """Feeds an uploaded video into a StreamingAnalysis as chunks arrive
+
+    Needs the test up front, so it is only installed when the client passes
+    ?fitness_test_id= on the upload URL.
+    """
+
+    def __init__(self, request, fitness_test, field_name='video_file'):
+        super().__init__(request)
+        self.fitness_test = fitness_test
+        self.target_field = field_name
+        self.analysis = None
+
+    @classmethod
+    def install(cls, request, fitness_test):
+        """Put the handler in front of Django's default upload handlers"""
+        if not settings.STREAMING_ANALYSIS_ENABLED:
+            return None
+        handler = cls(request, fitness_test)
+        request.upload_handlers.insert(0, handler)
+        return handler
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        if field_name == self.target_field:
+            self.analysis = StreamingAnalysis(self.fitness_test.name, self.fitness_test.ai_model_config)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.analysis is None or self.field_name != self.target_field:
+            # Not our file; let the next handler store it
+            return raw_data
+        self.analysis.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if self.analysis is None or self.field_name != self.target_field:
+            return None
+        # Open before completing, since completion lets the spool file be removed
+        uploaded = self.analysis.open_uploaded_file(self.file_name, self.content_type)
+        self.analysis.complete()
+        return uploaded
+
+    def upload_interrupted(self):
+        if self.analysis is not None:
+            self.analysis.cancel()
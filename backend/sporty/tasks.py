@@ -1,51 +1,181 @@
 # tasks.py
 from celery import shared_task
-from .models import TestRecording
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+from datetime import timedelta
+from .models import ChunkedUpload, TestRecording
 from .ai_processor import VideoAnalyzer
+from .landmark_cache import LandmarkCache
+from .stage_metrics import measured
+from . import pipeline, scheduling, scores, stats
 import logging
+import os
+
+# One warm analyzer per worker process; building it loads the MediaPipe graph
+_analyzer = None
+# Fetch and scoring workers only read cached landmarks and need no pose graph
+_scorer = None
+
+def get_analyzer():
+    """Process-wide VideoAnalyzer, created on first use"""
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = VideoAnalyzer(cache=LandmarkCache())
+    return _analyzer
+
+def get_scorer():
+    """Process-wide VideoAnalyzer without a pose graph, for the fetch and scoring stages"""
+    global _scorer
+    if _scorer is None:
+        _scorer = VideoAnalyzer(cache=LandmarkCache(), pose=False)
+    return _scorer
+
+def enqueue_analysis(recording_id, content_hash=None):
+    """Hand a recording to the configured analysis worker
+
+    Recordings wait as 'uploaded' until the scheduler picks them, so a burst
+    from one district cannot push everyone else's uploads back.
+    """
+    if settings.ANALYSIS_WORKER_MODE in ('pool', 'batched'):
+        # run_analysis_pool / run_batched_analysis pick up 'uploaded' recordings on their own
+        return
+    dispatch_analysis.delay()
+
+def claim_uploaded_recordings(limit):
+    """Mark up to `limit` uploaded recordings as analyzing and return their ids, fairest first"""
+    return scheduling.claim(limit)
 
 @shared_task
-def process_video_analysis(recording_id):
-    """Background task to process video analysis"""
+def dispatch_analysis():
+    """Start analysis of waiting recordings while fewer than ANALYSIS_MAX_IN_FLIGHT are running"""
+    for recording_id in scheduling.claim_free():
+        process_video_analysis.delay(recording_id)
+
+# Analysis pipeline: each stage is a task on its own queue (CELERY_TASK_ROUTES)
+# and hands the recording to the next, so slow leaderboard writes never hold
+# a pose worker
+
+def hand_off(task, recording_id, *args):
+    """Queue the recording's next stage; the heartbeat covers its wait in that stage's queue"""
+    pipeline.heartbeat(recording_id)
+    task.delay(recording_id, *args)
+
+@shared_task
+def process_video_analysis(recording_id, content_hash=None):
+    """Fetch stage and entry point of the analysis pipeline"""
+    done = pipeline.completed_stages(recording_id)
+    if 'scoring' in done:
+        # Redelivered after scoring committed; at most the rankings are outstanding
+        if pipeline.restore_scored(recording_id):
+            dispatch_analysis.delay()
+        if 'ranking' not in done:
+            update_recording_rankings.delay(recording_id)
+        return
+    fetched = pipeline.run_stage('fetch', recording_id, pipeline.fetch, get_scorer(), content_hash)
+    if fetched is None:
+        # Failed recordings free their slot
+        dispatch_analysis.delay()
+        return
+    video_path, content_hash, is_temporary = fetched
+    if video_path is None:
+        hand_off(score_recording, recording_id, content_hash)
+    else:
+        hand_off(extract_pose, recording_id, video_path, content_hash, is_temporary)
+
+@shared_task
+def extract_pose(recording_id, video_path, content_hash, is_temporary):
+    """Pose stage; the landmarks reach the scoring stage through the landmark cache or their checkpoint"""
+    if pipeline.run_stage('pose', recording_id, pipeline.pose, get_analyzer(),
+                          video_path, content_hash, is_temporary) is not None:
+        hand_off(score_recording, recording_id, content_hash)
+    else:
+        dispatch_analysis.delay()
+
+@shared_task
+def score_recording(recording_id, content_hash=None):
+    """Scoring stage"""
+    if pipeline.run_stage('scoring', recording_id, pipeline.score, get_scorer(), content_hash) is not None:
+        update_recording_rankings.delay(recording_id)
+    # Completed or failed, the recording no longer holds an analysis slot
+    dispatch_analysis.delay()
+
+@shared_task(autoretry_for=(DatabaseError,), retry_backoff=True, max_retries=5)
+def update_recording_rankings(recording_id):
+    """Ranking stage; the recording is already completed, so failures are retried, not reported"""
+    with measured('ranking'):
+        pipeline.rank(recording_id)
+    logging.info(f"Successfully processed recording {recording_id}")
+
+def analyze_recording(recording_id, analyzer, content_hash=None):
+    """Run every pipeline stage in this process with an already loaded VideoAnalyzer
+
+    content_hash lets landmarks extracted during a streaming upload be used
+    without downloading the video again. Stages with a checkpoint from an
+    earlier attempt are skipped.
+    """
+    done = pipeline.completed_stages(recording_id)
+    if 'ranking' in done:
+        return
+
+    if 'scoring' in done:
+        pipeline.restore_scored(recording_id)
+    else:
+        fetched = pipeline.run_stage('fetch', recording_id, pipeline.fetch, analyzer, content_hash)
+        if fetched is None:
+            return
+        video_path, content_hash, is_temporary = fetched
+
+        sequence = None
+        if video_path is not None:
+            sequence = pipeline.run_stage('pose', recording_id, pipeline.pose, analyzer,
+                                          video_path, content_hash, is_temporary)
+            if sequence is None:
+                return
+
+        if pipeline.run_stage('scoring', recording_id, pipeline.score, analyzer, content_hash, sequence) is None:
+            return
+
     try:
-        recording = TestRecording.objects.get(id=recording_id)
-        recording.processing_status = 'processing'
-        recording.save()
-        
-        analyzer = VideoAnalyzer()
-        
-        # Determine analysis type based on test category
-        if recording.test_category.name == 'Vertical Jump':
-            results = analyzer.analyze_vertical_jump(recording.original_video_url)
-        elif recording.test_category.name == 'Sit-ups':
-            results = analyzer.analyze_situps(recording.original_video_url)
-        # Add other test types...
-        
-        # Update recording with results
-        recording.ai_raw_score = results['score']
-        recording.ai_confidence = results['confidence']
-        recording.ai_analysis_data = results['analysis_data']
-        recording.processing_status = 'completed'
-        
-        # Calculate grade and percentile
-        grade, percentile = calculate_performance_grade(
-            recording.ai_raw_score,
-            recording.test_category,
-            recording.user
-        )
-        recording.grade = grade
-        recording.percentile = percentile
-        recording.final_score = recording.ai_raw_score
-        
-        recording.save()
-        
-        # Update leaderboards
-        update_leaderboards(recording)
-        
+        with measured('ranking'):
+            pipeline.rank(recording_id)
         logging.info(f"Successfully processed recording {recording_id}")
-        
     except Exception as e:
-        recording.processing_status = 'failed'
-        recording.processing_error = str(e)
-        recording.save()
-        logging.error(f"Failed to process recording {recording_id}: {str(e)}")
\ No newline at end of file
+        logging.error(f"Failed to update rankings for recording {recording_id}: {e}")
+
+@shared_task
+def requeue_stalled_analyses():
+    """Periodic job returning recordings whose worker died mid-analysis to the queue
+
+    Their checkpoints survive, so the next attempt resumes after the last
+    finished stage.
+    """
+    requeued = scheduling.requeue_stalled()
+    if requeued:
+        logging.warning(f"Requeued {requeued} stalled analyses")
+        dispatch_analysis.delay()
+
+@shared_task
+def update_session_scores(session_id):
+    """Score a finished session and update its athlete's talent score"""
+    scores.refresh_session_score(session_id)
+
+@shared_task
+def refresh_platform_stats():
+    """Periodic job recomputing the platform_stats rollups"""
+    stats.refresh_platform_stats()
+
+@shared_task
+def cleanup_chunked_uploads():
+    """Expire resumable uploads that were abandoned and free their disk space"""
+    cutoff = timezone.now() - timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+    stale = ChunkedUpload.objects.filter(status='in_progress', updated_at__lt=cutoff)
+    
+    for upload in stale:
+        try:
+            os.remove(upload.file_path)
+        except FileNotFoundError:
+            pass
+    
+    expired = stale.update(status='expired')
+    logging.info(f"Expired {expired} abandoned chunked uploads")
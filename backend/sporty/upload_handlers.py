@@ -0,0 +1,37 @@
+# upload_handlers.py
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class ContentHashUploadHandler(FileUploadHandler):
+    """Hashes an uploaded file as it streams in and passes the data on unchanged"""
+
+    def __init__(self, request=None, field_name='video_file'):
+        super().__init__(request)
+        self.target_field = field_name
+        self.digest = None
+        self.content_hash = None
+
+    @classmethod
+    def install(cls, request):
+        """Put the handler first so it sees every chunk"""
+        handler = cls(request)
+        request.upload_handlers.insert(0, handler)
+        return handler
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        if field_name == self.target_field:
+            self.digest = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.digest is not None and self.field_name == self.target_field:
+            self.digest.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.digest is not None and self.field_name == self.target_field:
+            self.content_hash = self.digest.hexdigest()
+        # The handlers after this one build the actual file object
+        return None
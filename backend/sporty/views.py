@@ -2,18 +2,35 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
+from django.conf import settings
+from django.core.files import File
 from django.core.files.storage import default_storage
-from django.db.models import Q, Avg, Count, Max
+from django.http import UnreadablePostError
+from django.db import transaction
+from django.db.models import F, Q, Count, Max
 from django.utils import timezone
 from datetime import datetime, timedelta
 import uuid
 import json
+import os
 
 from sympy import Min
 
 from .models import *
 from .serializers import *
+from .benchmarks import benchmark_index
+from .landmark_cache import hash_file
+from .fast_serializers import fast_leaderboards, fast_recordings, fast_sessions
+from .pagination import KeysetPagination, RankPagination
+from .progress import count_uploaded_test
+from .percentiles import grade_for_score
+from .query_planning import QueryPlanningMixin, plan_queryset
+from .rankings import partition_key, partition_participants
+from .scheduling import admission
+from .stats import cached_platform_stats, increment
+from .status_channel import events_url, status_payload
+from .upload_handlers import ContentHashUploadHandler
 
 class AthleteProfileViewSet(viewsets.ModelViewSet):
     queryset = AthleteProfile.objects.all()
@@ -78,12 +95,7 @@ class FitnessTestViewSet(viewsets.ReadOnlyModelViewSet):
         age = request.query_params.get('age')
         gender = request.query_params.get('gender', 'male')
         
-        benchmark = AgeBenchmark.objects.filter(
-            fitness_test=test,
-            age_min__lte=age,
-            age_max__gte=age,
-            gender=gender
-        ).first()
+        benchmark = benchmark_index.lookup(test.id, age, gender)
         
         if benchmark:
             return Response(AgeBenchmarkSerializer(benchmark).data)
@@ -91,9 +103,10 @@ class FitnessTestViewSet(viewsets.ReadOnlyModelViewSet):
         return Response({'error': 'No benchmark found for this age/gender combination'}, 
                        status=status.HTTP_404_NOT_FOUND)
 
-class AssessmentSessionViewSet(viewsets.ModelViewSet):
+class AssessmentSessionViewSet(QueryPlanningMixin, viewsets.ModelViewSet):
     queryset = AssessmentSession.objects.all()
     serializer_class = AssessmentSessionSerializer
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         # Filter by athlete for regular users
@@ -101,6 +114,12 @@ class AssessmentSessionViewSet(viewsets.ModelViewSet):
             return AssessmentSession.objects.filter(athlete__auth_user_id=self.request.user.id)
         return AssessmentSession.objects.all()
     
+    def list(self, request, *args, **kwargs):
+        # Same output as AssessmentSessionSerializer, built from values() rows
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(fast_sessions.serialize(page))
+    
     @action(detail=False, methods=['post'])
     def start_assessment(self, request):
         """Start a new assessment session"""
@@ -168,7 +187,7 @@ class AssessmentSessionViewSet(viewsets.ModelViewSet):
         
         session.status = 'submitted_to_sai'
         session.submitted_at = timezone.now()
-        session.save()
+        session.save(update_fields=['status', 'submitted_at'])
         
         # Award submission badge
         self.award_submission_badge(session.athlete)
@@ -220,9 +239,10 @@ class AssessmentSessionViewSet(viewsets.ModelViewSet):
         except Badge.DoesNotExist:
             pass
 
-class TestRecordingViewSet(viewsets.ModelViewSet):
+class TestRecordingViewSet(QueryPlanningMixin, viewsets.ModelViewSet):
     queryset = TestRecording.objects.all()
     serializer_class = TestRecordingSerializer
+    pagination_class = KeysetPagination
     parser_classes = [MultiPartParser, FormParser]
     
     def get_queryset(self):
@@ -230,9 +250,47 @@ class TestRecordingViewSet(viewsets.ModelViewSet):
             return TestRecording.objects.filter(athlete__auth_user_id=self.request.user.id)
         return TestRecording.objects.all()
     
+    def list(self, request, *args, **kwargs):
+        # Same output as TestRecordingSerializer, built from values() rows
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(fast_recordings.serialize(page))
+    
+    def initialize_request(self, request, *args, **kwargs):
+        request = super().initialize_request(request, *args, **kwargs)
+        # Upload handlers must be in place before authentication: SessionAuthentication's
+        # CSRF check reads request.POST, which parses the body with the handlers installed then
+        self.streaming = self.hashing = None
+        if self.action == 'upload_video':
+            # Start pose analysis while the video is still arriving
+            self.streaming = self.install_streaming_handler(request)
+            # Installed last so it sits in front and hashes every chunk
+            self.hashing = ContentHashUploadHandler.install(request)
+        return request
+    
     @action(detail=False, methods=['post'])
     def upload_video(self, request):
         """Handle video upload and trigger AI analysis"""
+        try:
+            return self.process_video_upload(request, self.streaming, self.hashing)
+        finally:
+            if self.streaming is not None and self.streaming.analysis is not None:
+                self.streaming.analysis.release()
+    
+    def install_streaming_handler(self, request):
+        """Stream the upload into pose extraction when the client names the test up front"""
+        test_id = request.query_params.get('fitness_test_id')
+        if not test_id:
+            return None
+        try:
+            fitness_test = FitnessTest.objects.get(id=test_id)
+        except (FitnessTest.DoesNotExist, ValueError):
+            return None
+        
+        from .streaming import StreamingAnalysisUploadHandler
+        return StreamingAnalysisUploadHandler.install(request, fitness_test)
+    
+    def process_video_upload(self, request, streaming=None, hashing=None):
         serializer = VideoUploadSerializer(data=request.data)
         
         if not serializer.is_valid():
@@ -244,119 +302,304 @@ class TestRecordingViewSet(viewsets.ModelViewSet):
             fitness_test = FitnessTest.objects.get(id=serializer.validated_data['fitness_test_id'])
             video_file = serializer.validated_data['video_file']
             
-            # Check if test already completed for this session
-            existing_recording = TestRecording.objects.filter(
-                session=session,
-                fitness_test=fitness_test
-            ).first()
-            
-            if existing_recording and existing_recording.processing_status == 'completed':
-                return Response({
-                    'error': 'Test already completed for this session',
-                    'recording_id': existing_recording.id
-                }, status=status.HTTP_400_BAD_REQUEST)
+            return self.store_recording(
+                session, fitness_test, video_file, serializer.validated_data, streaming,
+                content_hash=hashing.content_hash if hashing else None
+            )
             
+        except AssessmentSession.DoesNotExist:
+            return Response({'error': 'Assessment session not found'}, status=status.HTTP_404_NOT_FOUND)
+        except FitnessTest.DoesNotExist:
+            return Response({'error': 'Fitness test not found'}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def store_recording(self, session, fitness_test, video_file, upload_data, streaming=None,
+                        content_hash=None):
+        """Store an uploaded video, create its TestRecording and queue analysis"""
+        # Check if test already completed for this session
+        existing_recording = TestRecording.objects.filter(
+            session=session,
+            fitness_test=fitness_test
+        ).first()
+        
+        if existing_recording and existing_recording.processing_status == 'completed':
+            return Response({
+                'error': 'Test already completed for this session',
+                'recording_id': existing_recording.id
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Same clip re-sent for a test that is still being analyzed: keep the running analysis
+        if (content_hash and existing_recording
+                and existing_recording.video_sha256 == content_hash
+                and existing_recording.processing_status != 'failed'):
+            return Response({
+                'recording_id': existing_recording.id,
+                'status': existing_recording.processing_status,
+                'message': 'This video was already uploaded. AI analysis in progress.',
+                'session_progress': f"{session.completed_tests}/{session.total_tests}",
+                'estimated_analysis_time': self.estimate_analysis_time(fitness_test.name)
+            })
+        
+        # Identical video this athlete already had analyzed for the test (a re-send after a
+        # network error): reuse its storage and analysis. Another athlete's identical clip is
+        # analyzed afresh so duplicate detection sees it.
+        duplicate = None
+        if content_hash:
+            duplicate = TestRecording.objects.filter(
+                video_sha256=content_hash,
+                fitness_test=fitness_test,
+                athlete=session.athlete,
+                processing_status='completed'
+            ).order_by('created_at').first()
+        
+        # Pose extraction ran during the upload; the recording is kept from the scheduler
+        # as 'streaming' until its landmarks are cached
+        streamed = streaming is not None and streaming.analysis is not None and not duplicate
+        
+        defaults = {
+            'video_duration': upload_data.get('video_duration'),
+            'video_size_mb': video_file.size / (1024 * 1024),  # Convert to MB
+            'video_sha256': content_hash,
+            'device_analysis_score': upload_data.get('device_analysis_score'),
+            'device_analysis_confidence': upload_data.get('device_analysis_confidence'),
+            'device_analysis_data': upload_data.get('device_analysis_data', {}),
+            'processing_status': 'streaming' if streamed else 'uploaded',
+            'processing_error': None,
+            'stage_updated_at': timezone.now() if streamed else None
+        }
+        if duplicate:
+            defaults.update({
+                'original_video_url': duplicate.original_video_url,
+                'ai_raw_score': duplicate.ai_raw_score,
+                'ai_confidence': duplicate.ai_confidence,
+                # Scoring still runs for this athlete; only the video analysis is reused
+                'ai_analysis_data': dict(duplicate.ai_analysis_data or {}, reused_from=str(duplicate.id)),
+            })
+        else:
             # Save video to Supabase Storage
-            video_url = self.save_to_supabase_storage(video_file)
-            
-            # Create or update test recording
+            defaults['original_video_url'] = self.save_to_supabase_storage(video_file)
+            # Nothing from a failed earlier video may carry over into this one's analysis
+            defaults.update({'ai_raw_score': None, 'ai_confidence': None, 'ai_analysis_data': {}})
+        
+        # Create or update test recording
+        with transaction.atomic():
             recording, created = TestRecording.objects.update_or_create(
                 session=session,
                 fitness_test=fitness_test,
                 athlete=session.athlete,
-                defaults={
-                    'original_video_url': video_url,
-                    'video_duration': serializer.validated_data.get('video_duration'),
-                    'video_size_mb': video_file.size / (1024 * 1024),  # Convert to MB
-                    'device_analysis_score': serializer.validated_data.get('device_analysis_score'),
-                    'device_analysis_confidence': serializer.validated_data.get('device_analysis_confidence'),
-                    'device_analysis_data': serializer.validated_data.get('device_analysis_data', {}),
-                    'processing_status': 'uploaded'
-                }
+                defaults=defaults
             )
-            
-            # Trigger AI analysis (async task)
-            from .tasks import process_video_analysis
-            process_video_analysis.delay(recording.id)
-            
-            # Update session progress
-            if created:
-                session.completed_tests += 1
-                if session.status == 'created':
-                    session.status = 'in_progress'
-                
-                # Check if all tests completed
-                if session.completed_tests >= session.total_tests:
-                    session.status = 'completed'
-                    session.completed_at = timezone.now()
-                    self.calculate_session_overall_score(session)
-                
-                session.save()
-            
-            return Response({
-                'recording_id': recording.id,
-                'status': 'uploaded',
-                'message': 'Video uploaded successfully. AI analysis in progress.',
-                'session_progress': f"{session.completed_tests}/{session.total_tests}",
-                'estimated_analysis_time': self.estimate_analysis_time(fitness_test.name)
-            })
-            
+            if not created:
+                # The stage checkpoints describe the previous video
+                AnalysisCheckpoint.objects.filter(recording_id=recording.id).delete()
+        
+        # Trigger AI analysis (async task)
+        if streamed:
+            # Analysis is queued once extraction finishes
+            streaming.analysis.attach(recording.id)
+        else:
+            from .tasks import enqueue_analysis
+            enqueue_analysis(recording.id, content_hash)
+        
+        # Update session progress
+        completed_tests, total_tests = session.completed_tests, session.total_tests
+        if created:
+            completed_tests, total_tests, completed_now = count_uploaded_test(session.id)
+            if completed_now:
+                increment('total_assessments')
+                # Scored off the request path from the session's running sums
+                from .tasks import update_session_scores
+                update_session_scores.delay(session.id)
+        
+        return Response({
+            'recording_id': recording.id,
+            'status': 'uploaded',
+            'message': 'Video uploaded successfully. AI analysis in progress.',
+            'session_progress': f"{completed_tests}/{total_tests}",
+            'estimated_analysis_time': self.estimate_analysis_time(fitness_test.name),
+            'events_url': events_url(recording.id),
+            'analysis_queue': admission(session.athlete)
+        })
+    
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, FormParser, MultiPartParser])
+    def upload_init(self, request):
+        """Start a resumable upload; chunks are then PUT to uploads/<upload_id>/"""
+        serializer = ChunkedUploadInitSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        data = dict(serializer.validated_data)
+        try:
+            session = AssessmentSession.objects.get(
+                id=data.pop('session_id'), athlete__auth_user_id=request.user.id
+            )
+            fitness_test = FitnessTest.objects.get(id=data.pop('fitness_test_id'))
         except AssessmentSession.DoesNotExist:
             return Response({'error': 'Assessment session not found'}, status=status.HTTP_404_NOT_FOUND)
         except FitnessTest.DoesNotExist:
             return Response({'error': 'Fitness test not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Turn uploads away before any bytes are sent while analysis is far behind
+        queue = admission(session.athlete)
+        if queue['status'] == 'saturated':
+            return Response(
+                {'error': 'Analysis queue is full, retry later', 'analysis_queue': queue},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': str(queue['retry_after'])}
+            )
+        
+        upload = ChunkedUpload.objects.create(
+            session=session,
+            fitness_test=fitness_test,
+            file_name=data.pop('file_name'),
+            total_size=data.pop('total_size'),
+            upload_data=data
+        )
+        
+        # Chunks are written in place, so the file exists from the start
+        os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+        open(upload.file_path, 'wb').close()
+        
+        response_data = ChunkedUploadSerializer(upload).data
+        response_data['chunk_size'] = settings.CHUNKED_UPLOAD_CHUNK_SIZE
+        response_data['analysis_queue'] = queue
+        return Response(response_data, status=status.HTTP_201_CREATED)
+    
+    def chunked_uploads(self, request):
+        """Uploads the requesting athlete started; only they may send chunks or finalize"""
+        return ChunkedUpload.objects.filter(session__athlete__auth_user_id=request.user.id)
+    
+    def claim_expired(self):
+        return timezone.now() - timedelta(seconds=settings.CHUNKED_UPLOAD_CLAIM_SECONDS)
+    
+    @action(detail=False, methods=['get', 'put'], parser_classes=[],
+            url_path=r'uploads/(?P<upload_id>[0-9a-f-]+)')
+    def upload_chunk(self, request, upload_id=None):
+        """GET the resume offset, or PUT raw bytes starting at ?offset= (or Upload-Offset)"""
+        try:
+            upload = self.chunked_uploads(request).get(id=upload_id)
+        except (ChunkedUpload.DoesNotExist, ValueError):
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        if request.method == 'GET' or upload.status != 'in_progress':
+            return Response(ChunkedUploadSerializer(upload).data,
+                           headers={'Upload-Offset': str(upload.received_size)})
+        
+        try:
+            offset = int(request.headers.get('Upload-Offset', request.query_params.get('offset', '')))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response({'error': 'Chunk offset and Content-Length are required'},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        if offset + length > upload.total_size:
+            return Response({'error': 'Chunk extends past the declared total size'},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        # Claim the offset before writing, so two requests racing on it cannot both
+        # write there. Chunks must continue exactly where the last one stopped.
+        writer = uuid.uuid4()
+        claimed = ChunkedUpload.objects.filter(
+            Q(writer__isnull=True) | Q(updated_at__lt=self.claim_expired()),
+            id=upload.id, status='in_progress', received_size=offset
+        ).update(writer=writer, updated_at=timezone.now())
+        if not claimed:
+            upload.refresh_from_db()
+            return Response({'error': 'Offset does not match bytes received, or a chunk is being written',
+                             'offset': upload.received_size}, status=status.HTTP_409_CONFLICT)
+        
+        written = self.write_chunk(request, upload.file_path, offset, length)
+        
+        # Release the claim; it only fails if this request stalled and was taken over
+        advanced = ChunkedUpload.objects.filter(id=upload.id, writer=writer).update(
+            received_size=offset + written,
+            writer=None,
+            updated_at=timezone.now()
+        )
+        if not advanced:
+            upload.refresh_from_db()
+            return Response({'error': 'Concurrent chunk upload', 'offset': upload.received_size},
+                           status=status.HTTP_409_CONFLICT)
+        
+        upload.received_size = offset + written
+        return Response(ChunkedUploadSerializer(upload).data,
+                       headers={'Upload-Offset': str(upload.received_size)})
+    
+    def write_chunk(self, request, path, offset, length):
+        """Copy the request body into the upload file without buffering it in memory"""
+        written = 0
+        with open(path, 'r+b') as f:
+            f.seek(offset)
+            while written < length:
+                try:
+                    data = request.stream.read(min(64 * 1024, length - written))
+                except (OSError, UnreadablePostError):
+                    # Connection dropped; keep what arrived so the client can resume from it
+                    break
+                if not data:
+                    break
+                f.write(data)
+                written += len(data)
+        return written
+    
+    @action(detail=False, methods=['post'], url_path=r'uploads/(?P<upload_id>[0-9a-f-]+)/finalize')
+    def upload_finalize(self, request, upload_id=None):
+        """Assemble a fully received upload into a TestRecording"""
+        uploads = self.chunked_uploads(request)
+        try:
+            upload = uploads.select_related('session', 'fitness_test').get(id=upload_id)
+        except (ChunkedUpload.DoesNotExist, ValueError):
+            return Response({'error': 'Upload not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        # Only one finalize may create the recording; one whose request died is taken over
+        claimed = uploads.filter(
+            Q(status='in_progress', writer__isnull=True) | Q(status='finalizing', updated_at__lt=self.claim_expired()),
+            id=upload.id, received_size=F('total_size')
+        ).update(status='finalizing', updated_at=timezone.now())
+        
+        if not claimed:
+            upload.refresh_from_db()
+            # Finalize is safe to repeat if the client missed the first response
+            if upload.status == 'completed':
+                return Response({'recording_id': upload.recording_id, 'status': 'uploaded'})
+            if upload.status == 'expired':
+                return Response({'error': 'Upload has expired'}, status=status.HTTP_410_GONE)
+            if upload.status == 'finalizing' or upload.writer:
+                return Response({'error': 'Upload is being processed, retry shortly'},
+                               status=status.HTTP_409_CONFLICT)
+            return Response({'error': 'Upload incomplete', 'offset': upload.received_size},
+                           status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            content_hash = hash_file(upload.file_path)
+            with open(upload.file_path, 'rb') as f:
+                response = self.store_recording(
+                    upload.session, upload.fitness_test, File(f, name=upload.file_name),
+                    upload.upload_data, content_hash=content_hash
+                )
         except Exception as e:
+            uploads.filter(id=upload.id, status='finalizing').update(status='in_progress')
             return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+        if response.status_code != status.HTTP_200_OK:
+            # Rejected (e.g. the test is already recorded); the client may retry
+            uploads.filter(id=upload.id, status='finalizing').update(status='in_progress')
+            return response
+        
+        uploads.filter(id=upload.id).update(
+            status='completed', recording_id=response.data['recording_id'], updated_at=timezone.now()
+        )
+        os.remove(upload.file_path)
+        return response
     
     @action(detail=True, methods=['get'])
     def analysis_status(self, request, pk=None):
         """Check analysis status and progress"""
         recording = self.get_object()
         
-        # Calculate progress percentage based on status
-        progress_map = {
-            'uploaded': 10,
-            'analyzing': 50,
-            'cheat_checking': 80,
-            'completed': 100,
-            'failed': 0,
-            'flagged': 100,
-            'manually_verified': 100
-        }
-        
-        response_data = {
-            'recording_id': recording.id,
-            'processing_status': recording.processing_status,
-            'progress_percentage': progress_map.get(recording.processing_status, 0),
-        }
-        
-        # Add results if analysis is complete
-        if recording.processing_status in ['completed', 'manually_verified']:
-            response_data.update({
-                'final_score': recording.final_score,
-                'performance_grade': recording.performance_grade,
-                'percentile': recording.percentile,
-                'points_earned': recording.points_earned,
-                'ai_confidence': recording.ai_confidence,
-                'benchmark_comparison': self.get_benchmark_comparison(recording)
-            })
-        
-        # Add cheat detection info
-        if recording.cheat_detection_score:
-            response_data.update({
-                'cheat_detection_score': recording.cheat_detection_score,
-                'is_suspicious': recording.is_suspicious,
-                'cheat_flags': recording.cheat_flags
-            })
-        
-        # Add error info if failed
-        if recording.processing_status == 'failed':
-            response_data.update({
-                'error_message': recording.processing_error,
-                'retry_available': recording.retry_count < 3
-            })
-        
-        return Response(response_data)
+        # Clients can switch to the pushed status stream at events_url
+        return Response(dict(status_payload(recording), events_url=events_url(recording.id)))
     
     @action(detail=True, methods=['post'])
     def retry_analysis(self, request, pk=None):
@@ -372,11 +615,15 @@ class TestRecordingViewSet(viewsets.ModelViewSet):
         recording.processing_status = 'uploaded'
         recording.retry_count += 1
         recording.processing_error = None
-        recording.save()
+        with transaction.atomic():
+            recording.save(update_fields=['processing_status', 'retry_count', 'processing_error'])
+            # Score again: the scoring and ranking keys would make the new attempt a no-op.
+            # Fetched and extracted landmarks are kept and reused.
+            AnalysisCheckpoint.objects.filter(recording_id=recording.id, stage__in=['scoring', 'ranking']).delete()
         
         # Trigger analysis again
-        from .tasks import process_video_analysis
-        process_video_analysis.delay(recording.id)
+        from .tasks import enqueue_analysis
+        enqueue_analysis(recording.id)
         
         return Response({
             'message': 'Analysis retry initiated',
@@ -402,92 +649,14 @@ class TestRecordingViewSet(viewsets.ModelViewSet):
         }
         return time_estimates.get(test_name, '1-2 minutes')
     
-    def calculate_session_overall_score(self, session):
-        """Calculate overall session score when all tests are complete"""
-        recordings = TestRecording.objects.filter(
-            session=session,
-            processing_status='completed'
-        )
-        
-        if recordings.exists():
-            # Calculate weighted average based on test importance
-            total_points = sum(rec.points_earned or 0 for rec in recordings)
-            avg_percentile = recordings.aggregate(avg_percentile=Avg('percentile'))['avg_percentile']
-            
-            session.overall_score = total_points / len(recordings) if recordings else 0
-            session.percentile_rank = avg_percentile
-            session.overall_grade = self.calculate_grade_from_score(session.overall_score)
-            session.save()
-            
-            # Update athlete's overall talent score
-            self.update_athlete_talent_score(session.athlete)
-    
     def calculate_grade_from_score(self, score):
         """Convert score to grade"""
-        if score >= 90: return 'A+'
-        elif score >= 80: return 'A'
-        elif score >= 70: return 'B+'
-        elif score >= 60: return 'B'
-        elif score >= 50: return 'C+'
-        else: return 'C'
-    
-    def update_athlete_talent_score(self, athlete):
-        """Update athlete's overall talent score"""
-        completed_sessions = AssessmentSession.objects.filter(
-            athlete=athlete,
-            status='completed'
-        )
-        
-        if completed_sessions.exists():
-            avg_score = completed_sessions.aggregate(
-                avg_score=Avg('overall_score')
-            )['avg_score']
-            
-            athlete.overall_talent_score = avg_score
-            athlete.talent_grade = self.calculate_grade_from_score(avg_score)
-            athlete.save()
+        return grade_for_score(score)
     
-    def get_benchmark_comparison(self, recording):
-        """Get benchmark comparison for the recording"""
-        try:
-            benchmark = AgeBenchmark.objects.filter(
-                fitness_test=recording.fitness_test,
-                age_min__lte=recording.athlete.age,
-                age_max__gte=recording.athlete.age,
-                gender=recording.athlete.gender
-            ).first()
-            
-            if benchmark and recording.final_score:
-                score = float(recording.final_score)
-                
-                # Determine performance category
-                if score >= benchmark.excellent_threshold:
-                    category = 'Excellent'
-                elif score >= benchmark.good_threshold:
-                    category = 'Good'
-                elif score >= benchmark.average_threshold:
-                    category = 'Average'
-                else:
-                    category = 'Below Average'
-                
-                return {
-                    'athlete_score': score,
-                    'benchmark_excellent': float(benchmark.excellent_threshold),
-                    'benchmark_good': float(benchmark.good_threshold),
-                    'benchmark_average': float(benchmark.average_threshold),
-                    'benchmark_below_average': float(benchmark.below_average_threshold),
-                    'performance_category': category,
-                    'percentile': recording.percentile,
-                    'points_earned': recording.points_earned
-                }
-        except Exception:
-            pass
-        
-        return None
-
-class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
+class LeaderboardViewSet(QueryPlanningMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Leaderboard.objects.all()
     serializer_class = LeaderboardSerializer
+    pagination_class = RankPagination
     
     @action(detail=False, methods=['get'])
     def national_rankings(self, request):
@@ -495,23 +664,31 @@ class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
         test_id = request.query_params.get('test_id')
         age_group = request.query_params.get('age_group')
         gender = request.query_params.get('gender')
-        limit = int(request.query_params.get('limit', 100))
-        
-        queryset = Leaderboard.objects.filter(leaderboard_type='national')
         
         if test_id:
-            queryset = queryset.filter(fitness_test_id=test_id)
+            # The test's national ranking partition
+            queryset = Leaderboard.objects.filter(partition_key=partition_key('national', test_id))
+        else:
+            queryset = Leaderboard.objects.filter(leaderboard_type='national')
         if age_group:
             queryset = queryset.filter(age_group=age_group)
         if gender:
             queryset = queryset.filter(gender=gender)
         
-        rankings = queryset.order_by('current_rank')[:limit]
-        serializer = LeaderboardSerializer(rankings, many=True)
+        paginator = RankPagination()
+        page = paginator.paginate_queryset(queryset, request, self)
+        rankings = paginator.get_page(fast_leaderboards.serialize(page))
+        
+        if test_id and not age_group and not gender:
+            # Exactly one ranking partition; its size is kept by the ranking engine
+            total_participants = partition_participants(partition_key('national', test_id))
+        else:
+            total_participants = paginator.get_total()
         
         return Response({
-            'rankings': serializer.data,
-            'total_participants': queryset.count(),
+            'rankings': rankings,
+            'next': paginator.get_next_link(),
+            'total_participants': total_participants,
             'filters_applied': {
                 'test_id': test_id,
                 'age_group': age_group,
@@ -528,23 +705,30 @@ class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
                            status=status.HTTP_400_BAD_REQUEST)
         
         test_id = request.query_params.get('test_id')
-        limit = int(request.query_params.get('limit', 50))
-        
-        queryset = Leaderboard.objects.filter(
-            leaderboard_type='state',
-            state=state
-        )
         
         if test_id:
-            queryset = queryset.filter(fitness_test_id=test_id)
+            queryset = Leaderboard.objects.filter(partition_key=partition_key('state', test_id, state))
+        else:
+            queryset = Leaderboard.objects.filter(
+                leaderboard_type='state',
+                state=state
+            )
+        
+        paginator = RankPagination()
+        paginator.page_size = 50
+        page = paginator.paginate_queryset(queryset, request, self)
+        rankings = paginator.get_page(fast_leaderboards.serialize(page))
         
-        rankings = queryset.order_by('current_rank')[:limit]
-        serializer = LeaderboardSerializer(rankings, many=True)
+        if test_id:
+            total_participants = partition_participants(partition_key('state', test_id, state))
+        else:
+            total_participants = paginator.get_total()
         
         return Response({
             'state': state,
-            'rankings': serializer.data,
-            'total_participants': queryset.count()
+            'rankings': rankings,
+            'next': paginator.get_next_link(),
+            'total_participants': total_participants
         })
     
     @action(detail=False, methods=['get'])
@@ -553,7 +737,7 @@ class LeaderboardViewSet(viewsets.ReadOnlyModelViewSet):
         try:
             athlete = AthleteProfile.objects.get(auth_user_id=request.user.id)
             rankings = Leaderboard.objects.filter(athlete=athlete)
-            serializer = LeaderboardSerializer(rankings, many=True)
+            serializer = LeaderboardSerializer(plan_queryset(rankings, LeaderboardSerializer), many=True)
             
             return Response({
                 'athlete_name': athlete.full_name,
@@ -595,7 +779,7 @@ class BadgeViewSet(viewsets.ReadOnlyModelViewSet):
             return Response({'error': 'Athlete profile not found'}, 
                            status=status.HTTP_404_NOT_FOUND)
 
-class SAISubmissionViewSet(viewsets.ReadOnlyModelViewSet):
+class SAISubmissionViewSet(QueryPlanningMixin, viewsets.ReadOnlyModelViewSet):
     queryset = SAISubmission.objects.all()
     serializer_class = SAISubmissionSerializer
     
@@ -627,7 +811,7 @@ class SAISubmissionViewSet(viewsets.ReadOnlyModelViewSet):
             athlete = submission.athlete
             athlete.is_verified = True
             athlete.verification_status = 'verified'
-            athlete.save()
+            athlete.save(update_fields=['is_verified', 'verification_status', 'updated_at'])
         
         return Response({
             'message': 'Review completed successfully',
@@ -642,29 +826,8 @@ class StatsViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'])
     def platform_stats(self, request):
         """Get overall platform statistics"""
-        stats = {
-            'total_athletes': AthleteProfile.objects.count(),
-            'total_assessments': AssessmentSession.objects.filter(status='completed').count(),
-            'total_videos_analyzed': TestRecording.objects.filter(processing_status='completed').count(),
-            'avg_talent_score': AthleteProfile.objects.aggregate(
-                avg_score=Avg('overall_talent_score')
-            )['avg_score'],
-            'top_performing_states': list(
-                AthleteProfile.objects.values('state')
-                .annotate(avg_score=Avg('overall_talent_score'))
-                .order_by('-avg_score')[:10]
-            ),
-            'recent_activity': {
-                'new_athletes_this_week': AthleteProfile.objects.filter(
-                    created_at__gte=timezone.now() - timedelta(days=7)
-                ).count(),
-                'assessments_this_week': AssessmentSession.objects.filter(
-                    created_at__gte=timezone.now() - timedelta(days=7)
-                ).count()
-            }
-        }
-        
-        return Response(stats)
+        # Served from the platform_stats rollup table, see stats.py
+        return Response(cached_platform_stats())
     
     @action(detail=False, methods=['get'])
     def athlete_stats(self, request):
@@ -696,7 +859,9 @@ class StatsViewSet(viewsets.ViewSet):
     
     def get_rank_improvements(self, athlete):
         """Calculate rank improvements over time"""
-        rankings = Leaderboard.objects.filter(athlete=athlete).exclude(previous_rank__isnull=True)
+        rankings = Leaderboard.objects.filter(athlete=athlete).exclude(
+            previous_rank__isnull=True
+        ).select_related('fitness_test')
         improvements = []
         
         for ranking in rankings: